@@ -103,6 +103,11 @@ class Client(Extensible):
                             To get list of available protcols call:
                             ``odoo_rpc_client.connection.get_connector_names()``
        :param float timeout: Connection timeout
+       :param ConnectorBase connection: connector to use. Could be shared
+                                        by many clients connected to same
+                                        server (see *ClientPool*).
+                                        If not passed, new connector
+                                        will be created
 
        any other keyword arguments will be directly passed to connector
 
@@ -119,13 +124,19 @@ class Client(Extensible):
     """
 
     def __init__(self, host, dbname=None, user=None, pwd=None, port=8069,
-                 protocol='xml-rpc', timeout=DEFAULT_TIMEOUT, **extra_args):
+                 protocol='xml-rpc', timeout=DEFAULT_TIMEOUT, connection=None,
+                 **extra_args):
         self._dbname = dbname
         self._username = user
         self._pwd = pwd
 
-        self._connection = get_connector(protocol)(
-            host, port, timeout, extra_args)
+        if connection is None:
+            connection = get_connector(protocol)(
+                host, port, timeout, extra_args)
+        self._connection = connection
+        self._metadata = None
+        self._metadata_factory = None
+        self._retry_policy = None
         self._services = ServiceManager(self)
         self._plugins = PluginManager(self)
 
@@ -214,6 +225,46 @@ class Client(Extensible):
         """
         return self._connection
 
+    @property
+    def metadata(self):
+        """ Storage of information about fields of models
+            (``{model: columns_info}``), that could be shared with
+            other clients (see *ClientPool*), or None.
+
+            Could be set to dictionary, or to function, that receives
+            client and returns dictionary. Function is called on first
+            access, and again after *clean_caches*
+        """
+        factory = self._metadata_factory
+        if self._metadata is None and factory is not None:
+            # Disable factory while it works, to avoid recursion
+            # (factory may need columns info of some models)
+            self._metadata_factory = None
+            try:
+                self._metadata = factory(self)
+            finally:
+                self._metadata_factory = factory
+        return self._metadata
+
+    @metadata.setter
+    def metadata(self, value):
+        if callable(value):
+            self._metadata, self._metadata_factory = None, value
+        else:
+            self._metadata, self._metadata_factory = value, None
+
+    @property
+    def retry_policy(self):
+        """ Policy of retrying calls of object service on transient
+            errors (instance of *odoo_rpc_client.retry.RetryPolicy*).
+            None by default (retries disabled)
+        """
+        return self._retry_policy
+
+    @retry_policy.setter
+    def retry_policy(self, policy):
+        self._retry_policy = policy
+
     @property
     def uid(self):
         """ Returns ID of current user. if one is None,
@@ -321,6 +372,11 @@ class Client(Extensible):
             init_kwargs = self.get_init_args()
             init_kwargs.update(kwargs)
 
+            # Reuse connector (and its connections), if only credentials
+            # or database changed
+            if not set(kwargs) - set(('dbname', 'user', 'pwd')):
+                init_kwargs['connection'] = self._connection
+
             return Client(**init_kwargs)
 
         # Get the uid
@@ -404,12 +460,16 @@ class Client(Extensible):
         except ValueError:
             raise ValueError(
                 "Fully qualified xmlid required! (Ex. 'module_name.xmlid'")
-        res = self['ir.model.data'].search_records(
+        if 'external_ids' in self.plugins:
+            # use index and preloaded xml_ids of external_ids plugin
+            return self.plugins.external_ids.get_record(xmlid)
+
+        res = self['ir.model.data'].search_read(
             [('module', '=', module), ('name', '=', name)],
-            limit=1)
+            ['model', 'res_id'], limit=1)
         if res:
             res = res[0]
-            return self[res.model].read_records(res.res_id)
+            return self[res['model']].read_records(res['res_id'])
 
         return False
 
@@ -488,6 +548,9 @@ class Client(Extensible):
         self._user_context = None
         self._user = None
         self._database_version_full = None
+        # fields could be changed (for example on module installation),
+        # so metadata will be requested from factory again (if any)
+        self._metadata = None
 
     def __str__(self):
         return u"Client: %s" % self.get_url()
@@ -7,16 +7,167 @@
 # file, You can obtain one at http://mozilla.org/MPL/2.0/.            #
 #######################################################################
 
+import os
 import six
+import base64
+import uuid
+import itertools
+import requests
 from extend_me import ExtensibleByHashType
 
+from .. import exceptions
+
 DEFAULT_TIMEOUT = None
 
-__all__ = ('get_connector', 'get_connector_names', 'ConnectorBase')
+#: Size of chunks, streamed responses are read by
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Max size of response to look for beginning of streamed value in
+_STREAM_HEADER_LIMIT = 64 * 1024
+
+__all__ = ('get_connector', 'get_connector_names', 'ConnectorBase',
+           'Base64Upload')
 
 ConnectorType = ExtensibleByHashType._('Connector', hashattr='name')
 
 
+def iter_string_value(response, start_re, end_marker, parse_body,
+                      chunk_size=STREAM_CHUNK_SIZE):
+    """ Find string value in body of streamed HTTP response and
+        return generator of its chunks.
+
+        Value starts after match of *start_re* regular expression
+        (that have to be found at beginning of body) and ends
+        before *end_marker*. If value is not found, then whole body
+        is passed to *parse_body* function, that have to parse it
+        and return value (or raise error).
+
+        :param requests.Response response: response opened with
+                                           ``stream=True``
+        :param start_re: compiled regular expression (for bytes)
+        :param bytes end_marker: marker of end of value
+        :param callable parse_body: function to parse non-standard
+                                    responses (like errors)
+        :param int chunk_size: size of chunks to read response by
+        :return: generator of chunks of value (bytes)
+        :raises ConnectorError: value returned by *parse_body*
+                                is not string
+    """
+    content = response.iter_content(chunk_size)
+    buf = b''
+    match = None
+    for chunk in content:
+        buf += chunk
+        match = start_re.search(buf)
+        if match is not None or len(buf) > _STREAM_HEADER_LIMIT:
+            break
+
+    if match is None:
+        value = parse_body(buf + b''.join(content))
+        if isinstance(value, six.text_type):
+            value = value.encode('utf-8')
+        if not isinstance(value, six.binary_type):
+            raise exceptions.ConnectorError(
+                "Expected string result, got: %r" % type(value))
+        return iter([value])
+
+    def iter_value(chunk):
+        try:
+            while True:
+                pos = chunk.find(end_marker)
+                if pos >= 0:
+                    if pos:
+                        yield chunk[:pos]
+                    return
+                if chunk:
+                    yield chunk
+                chunk = next(content, None)
+                if chunk is None:
+                    raise exceptions.ConnectorError(
+                        "Unexpected end of response")
+        finally:
+            response.close()
+
+    return iter_value(buf[match.end():])
+
+
+class Base64Upload(object):
+    """ Argument of RPC call, that is read from file-like object and sent
+        base64-encoded, encoding it on the fly (see
+        *ConnectorBase.call_upload*).
+
+        :param fileobj: file-like object opened in binary mode
+        :param int chunk_size: size of chunks file is read by
+    """
+
+    def __init__(self, fileobj, chunk_size=STREAM_CHUNK_SIZE):
+        self._fileobj = fileobj
+
+        # Only chunks of size multiple of 3 could be encoded separately
+        self._chunk_size = max(chunk_size - chunk_size % 3, 3)
+
+    @property
+    def size(self):
+        """ Size of base64-encoded data or None if it is unknown
+            (for example, for pipes)
+        """
+        try:
+            size = os.fstat(self._fileobj.fileno()).st_size
+            size -= self._fileobj.tell()
+        except (AttributeError, IOError, OSError, ValueError):
+            try:
+                pos = self._fileobj.tell()
+                self._fileobj.seek(0, os.SEEK_END)
+                size = self._fileobj.tell() - pos
+                self._fileobj.seek(pos)
+            except (AttributeError, IOError, OSError, ValueError):
+                return None
+        return (size + 2) // 3 * 4
+
+    def __iter__(self):
+        """ Iterate over chunks of base64-encoded data
+        """
+        buf = b''
+        while True:
+            data = self._fileobj.read(self._chunk_size)
+            if not data:
+                break
+            buf += data
+            size = len(buf) - len(buf) % 3
+            if size:
+                yield base64.b64encode(buf[:size])
+                buf = buf[size:]
+        if buf:
+            yield base64.b64encode(buf)
+
+
+class _StreamBody(object):
+    """ File-like request body, that reads data from iterator of chunks.
+        Has length, so it is sent with Content-Length header
+        (instead of chunked transfer encoding).
+    """
+
+    def __init__(self, chunks, size):
+        self._chunks = iter(chunks)
+        self._size = size
+        self._buf = b''
+
+    def __len__(self):
+        return self._size
+
+    def read(self, size=-1):
+        while size < 0 or len(self._buf) < size:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self._buf += chunk
+        if size < 0:
+            res, self._buf = self._buf, b''
+        else:
+            res, self._buf = self._buf[:size], self._buf[size:]
+        return res
+
+
 def get_connector(name):
     """ Return connector specified by it's name
     """
@@ -44,6 +195,7 @@ class ConnectorBase(six.with_metaclass(ConnectorType)):
         self._extra_args = {} if extra_args is None else extra_args
 
         self.__services = {}
+        self._session = None
 
     @property
     def host(self):
@@ -69,6 +221,16 @@ class ConnectorBase(six.with_metaclass(ConnectorType)):
         """
         return self._extra_args
 
+    @property
+    def session(self):
+        """ HTTP session (``requests.Session``) of this connector.
+            Keeps connections to server alive between requests,
+            so connector shared by many clients reuses same connections.
+        """
+        if self._session is None:
+            self._session = requests.Session()
+        return self._session
+
     def update_extra_args(self, **kwargs):
         """ Update extra args and clean service cache
         """
@@ -90,3 +252,95 @@ class ConnectorBase(six.with_metaclass(ConnectorType)):
             self.__services[name] = service
 
         return service
+
+    def get_http_url(self, path):  # pragma: no cover
+        """ Returns URL of specified *path* on server
+
+            :param str path: path on server (for example '/jsonrpc')
+            :rtype: str
+        """
+        raise NotImplementedError
+
+    def http_post(self, path, data, headers=None, stream=False):
+        """ Send HTTP POST request to server, without RPC wrapping.
+
+            :param str path: path on server to send request to
+            :param data: body of request (bytes or file-like object)
+            :param dict headers: extra headers of request
+            :param bool stream: if True, then response body
+                                will be read on demand
+            :rtype: requests.Response
+            :raises ConnectorError: on connection errors
+        """
+        url = self.get_http_url(path)
+        try:
+            response = self.session.post(
+                url, data=data, headers=headers, stream=stream,
+                verify=self.extra_args.get('ssl_verify', True),
+                timeout=self.timeout)
+            response.raise_for_status()
+        except requests.exceptions.RequestException as exc:
+            raise exceptions.ConnectorError(
+                "Cannot connect to url %s\n"
+                "Exception %s raised!" % (url, exc))
+        return response
+
+    def _prepare_rpc_request(self, service, method, args):  # pragma: no cover
+        """ Prepare HTTP request for RPC call
+
+            :return: tuple(path, body, headers)
+        """
+        raise NotImplementedError
+
+    def _parse_rpc_response(self, body):  # pragma: no cover
+        """ Parse body of response on RPC call
+
+            :return: result of RPC call
+        """
+        raise NotImplementedError
+
+    def call_upload(self, service, method, args):
+        """ Call RPC method, with one of arguments being *Base64Upload*
+            instance. Content of that argument is base64-encoded on
+            the fly while request is sent, so memory usage does not depend
+            on size of uploaded data.
+
+            :param str service: name of service (for example 'db')
+            :param str method: name of method to call
+            :param list args: arguments of method
+            :return: result of method
+        """
+        uploads = [a for a in args if isinstance(a, Base64Upload)]
+        if len(uploads) != 1:
+            raise ValueError("Exactly one Base64Upload argument expected")
+        upload = uploads[0]
+
+        # serialize request with placeholder in place of uploaded data
+        placeholder = 'upload-%s' % uuid.uuid4().hex
+        path, body, headers = self._prepare_rpc_request(
+            service, method,
+            [placeholder if a is upload else a for a in args])
+        prefix, suffix = body.split(placeholder.encode('ascii'))
+
+        data = itertools.chain([prefix], upload, [suffix])
+        size = upload.size
+        if size is not None:
+            data = _StreamBody(data, len(prefix) + size + len(suffix))
+        # otherwise size is unknown, so chunked transfer encoding is used
+        response = self.http_post(path, data, headers=headers)
+        return self._parse_rpc_response(response.content)
+
+    def call_stream(self, service, method, args,
+                    chunk_size=STREAM_CHUNK_SIZE):  # pragma: no cover
+        """ Call RPC method, that returns string (for example
+            base64-encoded data), and return generator of chunks
+            of that string. Response is read from network by chunks,
+            so whole result is never kept in memory.
+
+            :param str service: name of service (for example 'db')
+            :param str method: name of method to call
+            :param list args: arguments of method
+            :param int chunk_size: size of chunks to read response by
+            :return: generator of chunks of result (bytes)
+        """
+        raise NotImplementedError
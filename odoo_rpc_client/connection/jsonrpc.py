@@ -8,19 +8,26 @@
 #######################################################################
 
 # python imports
+import re
 import simplejson  # Standard json cannot dump bytes on py3
 import random
 import requests
 import logging
 
 # project imports
-from .connection import ConnectorBase, DEFAULT_TIMEOUT
+from .connection import (ConnectorBase,
+                         DEFAULT_TIMEOUT,
+                         STREAM_CHUNK_SIZE,
+                         iter_string_value)
 from .. import exceptions as exceptions
 from ..utils import ustr
 
 
 logger = logging.getLogger(__name__)
 
+# Beginning of string result in JSON-RPC response
+_RESULT_STRING_RE = re.compile(br'"result"\s*:\s*"')
+
 
 class JSONRPCError(exceptions.ConnectorError):
     """ JSON-RPC error wrapper
@@ -88,7 +95,7 @@ class JSONRPCMethod(object):
 
         # Call rpc
         try:
-            res = requests.post(
+            res = (self.__rpc_proxy.session or requests).post(
                 self.__url, data=data,
                 headers={"Content-Type": "application/json"},
                 verify=self.__rpc_proxy.ssl_verify,
@@ -111,23 +118,47 @@ class JSONRPCMethod(object):
                 "method_data": method_data,
             }
             logger.error("Cannot decode JSON")
-            raise JSONRPCError("Cannot decode JSON: %s" % info)
+            raise JSONRPCError("Cannot decode JSON: %s" % info,
+                               code=res.status_code)
+
+        return _get_result(result)
+
 
-        if result.get("error", None):
-            error = result['error']
-            raise JSONRPCError(error['message'],
-                               code=error.get('code', None),
-                               data=error.get('data', None))
-        # if 'result' is not present in response object, then it seems, that
-        # result is None
-        return result.get("result", None)
+def _get_result(result):
+    """ Returns result from decoded JSON-RPC response,
+        or raises JSONRPCError if response contains error
+    """
+    if result.get("error", None):
+        error = result['error']
+        raise JSONRPCError(error['message'],
+                           code=error.get('code', None),
+                           data=error.get('data', None))
+    # if 'result' is not present in response object, then it seems, that
+    # result is None
+    return result.get("result", None)
+
+
+def _unescape_chunks(chunks):
+    """ Unescape chunks of JSON string, that contains base64 data
+        (only escapes of line breaks and slashes could be there)
+    """
+    tail = b''
+    for chunk in chunks:
+        chunk = tail + chunk
+        tail = b''
+        if chunk.endswith(b'\\'):
+            # escape sequence is split between chunks
+            chunk, tail = chunk[:-1], b'\\'
+        yield chunk.replace(b'\\n', b'\n')\
+                   .replace(b'\\r', b'\r')\
+                   .replace(b'\\/', b'/')
 
 
 class JSONRPCProxy(object):
     """ Simple Odoo service proxy wrapper
     """
     def __init__(self, host, port, service, ssl=False, ssl_verify=True,
-                 timeout=DEFAULT_TIMEOUT):
+                 timeout=DEFAULT_TIMEOUT, session=None):
         self.host = host
         self.port = port
         self.service = service
@@ -140,6 +171,7 @@ class JSONRPCProxy(object):
         # request parametrs
         self.ssl_verify = ssl_verify
         self.timeout = timeout
+        self.session = session
 
         # variable to cach methods
         self._methods = {}
@@ -170,12 +202,43 @@ class ConnectorJSONRPC(ConnectorBase):
         super(ConnectorJSONRPC, self).__init__(*args, **kwargs)
         self.extra_args.pop('verbose', None)
 
+    def get_http_url(self, path):
+        addr = self.host
+        if self.port:
+            addr += ':%s' % self.port
+        proto = 'https' if self.Meta.use_ssl else 'http'
+        return '%s://%s%s' % (proto, addr, path)
+
+    def _prepare_rpc_request(self, service, method, args):
+        method_data = JSONRPCMethod(
+            None, None, service, method).prepare_method_data(*args)
+        return ('/jsonrpc',
+                simplejson.dumps(method_data).encode('utf-8'),
+                {"Content-Type": "application/json"})
+
+    def _parse_rpc_response(self, body):
+        try:
+            result = simplejson.loads(body)
+        except ValueError:
+            raise JSONRPCError("Cannot decode JSON: %r" % body[:2000])
+        return _get_result(result)
+
+    def call_stream(self, service, method, args,
+                    chunk_size=STREAM_CHUNK_SIZE):
+        path, body, headers = self._prepare_rpc_request(
+            service, method, args)
+        response = self.http_post(path, body, headers=headers, stream=True)
+        return _unescape_chunks(iter_string_value(
+            response, _RESULT_STRING_RE, b'"', self._parse_rpc_response,
+            chunk_size=chunk_size))
+
     def _get_service(self, name):
         return JSONRPCProxy(self.host,
                             self.port,
                             name,
                             ssl=self.Meta.use_ssl,
                             timeout=self.timeout,
+                            session=self.session,
                             **self.extra_args)
 
 
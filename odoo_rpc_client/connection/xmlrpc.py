@@ -8,16 +8,28 @@
 #######################################################################
 
 # python imports
+import re
 import six
+import base64
+import threading
 from six.moves import xmlrpc_client as xmlrpclib
 from six.moves import http_client as httplib
 
 # project imports
-from .connection import ConnectorBase, DEFAULT_TIMEOUT
+from .connection import (ConnectorBase,
+                         DEFAULT_TIMEOUT,
+                         STREAM_CHUNK_SIZE,
+                         iter_string_value)
 from ..utils import ustr
 from .. import exceptions as exceptions
 
 
+# Beginning of string result in XML-RPC response
+_RESULT_STRING_RE = re.compile(
+    br'<methodResponse>\s*<params>\s*<param>\s*<value>'
+    br'(?:<string>|<base64>)?(?=[^<])')
+
+
 class XMLRPCError(exceptions.ConnectorError):
     """ Exception raised on XMLRpc errors
 
@@ -59,8 +71,33 @@ class XMLRPCMethod(object):
         return res
 
 
+class _ThreadLocalConnectionMixIn(object):
+    """ Keep HTTP connection of XML-RPC transport separate for each thread.
+
+        Standard transport caches single HTTP connection in
+        ``self._connection`` attribute, which makes it impossible to call
+        RPC methods of same service from different threads.
+        This mix-in stores that attribute in thread-local storage,
+        thus each thread uses its own keep-alive connection.
+    """
+    def __get_local(self):
+        local = self.__dict__.get('_thread_local', None)
+        if local is None:
+            local = self.__dict__.setdefault('_thread_local',
+                                             threading.local())
+        return local
+
+    @property
+    def _connection(self):
+        return getattr(self.__get_local(), 'connection', (None, None))
+
+    @_connection.setter
+    def _connection(self, value):
+        self.__get_local().connection = value
+
+
 if six.PY2:
-    class _XMLRPCTransport(xmlrpclib.Transport):
+    class _XMLRPCTransport(_ThreadLocalConnectionMixIn, xmlrpclib.Transport):
         def __init__(self, timeout=DEFAULT_TIMEOUT,
                      ssl=False, *args, **kwargs):
             xmlrpclib.Transport.__init__(self, *args, **kwargs)
@@ -86,7 +123,7 @@ if six.PY2:
                     chost, timeout=self.timeout)
             return self._connection[1]
 elif six.PY3:
-    class _XMLRPCTransport(xmlrpclib.Transport):
+    class _XMLRPCTransport(_ThreadLocalConnectionMixIn, xmlrpclib.Transport):
         def __init__(self, timeout=DEFAULT_TIMEOUT,
                      ssl=False, *args, **kwargs):
             super(_XMLRPCTransport, self).__init__(*args, **kwargs)
@@ -142,12 +179,43 @@ class ConnectorXMLRPC(ConnectorBase):
         name = 'xml-rpc'
         ssl = False
 
-    def get_service_url(self, service_name):
+    def get_http_url(self, path):
         addr = self.host
         if self.port:
             addr += ':%s' % self.port
         proto = 'https' if self.Meta.ssl else 'http'
-        return '%s://%s/xmlrpc/%s' % (proto, addr, service_name)
+        return '%s://%s%s' % (proto, addr, path)
+
+    def get_service_url(self, service_name):
+        return self.get_http_url('/xmlrpc/%s' % service_name)
+
+    def _prepare_rpc_request(self, service, method, args):
+        body = xmlrpclib.dumps(tuple(args), method)
+        if isinstance(body, six.text_type):
+            body = body.encode('utf-8')
+        return ('/xmlrpc/%s' % service, body, {'Content-Type': 'text/xml'})
+
+    def _parse_rpc_response(self, body):
+        try:
+            result = xmlrpclib.loads(body)[0][0]
+        except xmlrpclib.Fault as fault:
+            raise XMLRPCError(fault)
+        return result
+
+    def call_stream(self, service, method, args,
+                    chunk_size=STREAM_CHUNK_SIZE):
+        path, body, headers = self._prepare_rpc_request(
+            service, method, args)
+        response = self.http_post(path, body, headers=headers, stream=True)
+
+        def parse_body(body):
+            result = self._parse_rpc_response(body)
+            if isinstance(result, xmlrpclib.Binary):
+                result = base64.b64encode(result.data)
+            return result
+
+        return iter_string_value(response, _RESULT_STRING_RE, b'<',
+                                 parse_body, chunk_size=chunk_size)
 
     def _get_service(self, name):
         return XMLRPCProxy(
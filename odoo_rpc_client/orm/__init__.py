@@ -13,5 +13,6 @@ from .object import (get_object,        # noqa
 from .record import (get_record,        # noqa
                      get_record_list,   # noqa
                      Record,            # noqa
-                     RecordList)        # noqa
+                     RecordList,        # noqa
+                     RecordGroup)       # noqa
 from .service import Service            # noqa
@@ -8,23 +8,41 @@
 #######################################################################
 
 import six
+import array
+import threading
 import collections
 
-__all__ = ('empty_cache', 'Cache', 'ObjectCache')
+from six.moves import collections_abc
+
+from ..utils import INT_TYPECODE
+
+__all__ = (
+    'empty_cache',
+    'Cache',
+    'ObjectCache',
+    'ThreadSafeCache',
+    'ThreadSafeObjectCache',
+    'CompactCache',
+    'CompactObjectCache',
+)
 
 
 class ObjectCache(dict):
     """ Cache for object / model data
 
         Automatically generates empty data dicts for records requested.
-        Also contains object context
+        Also contains object context and memoized related objects
+        (Records and RecordLists) of records (see *get_related*)
     """
-    __slots__ = ('_root_cache', '_object', '_context')
+    __slots__ = ('_root_cache', '_object', '_context', '_related')
 
     def __init__(self, root, obj, *args, **kwargs):
         self._root_cache = root
         self._object = obj
         self._context = kwargs.pop('context', None)
+
+        # id -> {field: (raw value, related object)}
+        self._related = {}
         super(ObjectCache, self).__init__(*args, **kwargs)
 
     @property
@@ -34,8 +52,7 @@ class ObjectCache(dict):
         return self._context
 
     def __missing__(self, key):
-        self[key] = {'id': key}
-        return self[key]
+        return self.setdefault(key, {'id': key})
 
     def update_keys(self, keys):
         """ Add new IDs to cache.
@@ -82,6 +99,84 @@ class ObjectCache(dict):
         return [key for key, val in six.viewitems(self)
                 if any(((field not in val) for field in fields))]
 
+    def get_related(self, rid, field, value, factory, cached=True):
+        """ Returns related object (Record or RecordList) for *field*
+            of record *rid*, created by *factory* from raw *value* of field.
+
+            Related objects are memoized per (id, field), so they are shared
+            by all Record instances of same record. Memoized object is
+            used only while raw value of field is not changed.
+
+            :param int rid: Record ID
+            :param str field: name of relational field
+            :param value: raw value of field
+            :param factory: callable to create related object from
+                            raw value
+            :param bool cached: if set to False, then related object will
+                                be created again
+        """
+        rel_data = self._related.get(rid, None)
+        if rel_data is None:
+            rel_data = self._related.setdefault(rid, {})
+
+        memo = rel_data.get(field, None)
+        if cached and memo is not None and \
+                (memo[0] is value or memo[0] == value):
+            return memo[1]
+
+        res = factory(value)
+        rel_data[field] = (value, res)
+        return res
+
+    def _get_related_ids(self, field, value):
+        """ Returns IDs of records referenced by raw *value* of *field*
+        """
+        if not value:
+            return []
+        if isinstance(value, six.integer_types):
+            return [value]
+        if self._object.columns_info[field]['type'] == 'many2one':
+            return [value[0]]
+        return list(value)
+
+    def refresh_ids(self, ids):
+        """ Clean cached data of records with specified *ids*.
+
+            Data of records related via memoized related objects (see
+            *get_related*) is cleaned too, so it will be read again on
+            next access.
+
+            :param list ids: IDs of records to clean data for
+            :return: self
+            :rtype: ObjectCache
+        """
+        related = collections.defaultdict(set)
+        for rid in ids:
+            for field, (value, __) in self._forget_record(rid).items():
+                relation = self._object.columns_info[field]['relation']
+                related[relation].update(
+                    self._get_related_ids(field, value))
+
+        for relation, rel_ids in related.items():
+            rcache = self._root_cache[relation]
+            for rid in rel_ids:
+                rcache._forget_record(rid)
+        return self
+
+    def _forget_record(self, rid):
+        """ Clean cached data and memoized related objects of record
+
+            :return: dictionary of memoized related objects of record
+                     ``{field: (raw value, related object)}``
+        """
+        self._clean_record(rid)
+        return self._related.pop(rid, {})
+
+    def _clean_record(self, rid):
+        data = self[rid]
+        data.clear()
+        data['id'] = rid
+
     def cache_field(self, rid, ftype, field_name, value):
         """ This method impelment additional caching functionality,
             like caching related fields, and so...
@@ -92,6 +187,11 @@ class ObjectCache(dict):
             :param value: value to cache for field
         """
         self[rid][field_name] = value
+        self._cache_related(ftype, field_name, value)
+
+    def _cache_related(self, ftype, field_name, value):
+        """ Add records related via *field_name* to caches of related objects
+        """
         if value and ftype == 'many2one':
             rcache = self._root_cache[self._object.
                                       columns_info[field_name]['relation']]
@@ -111,6 +211,52 @@ class ObjectCache(dict):
                                       columns_info[field_name]['relation']]
             rcache.update_keys(value)
 
+    def cache_data(self, data):
+        """ Store data (for example, result of *read* method) in cache.
+
+            Each item of *data* must be dictionary, that contains record's
+            *id* and values of fields to be cached for this record.
+            Related caches are filled too (see *cache_field* method)
+
+            :param list data: list of dictionaries with records data
+            :return: self
+            :rtype: ObjectCache
+        """
+        col_info = self._object.columns_info
+        for rdata in data:
+            rid = rdata['id']
+            for field, value in rdata.items():
+                # Fill related cache
+                ftype = col_info.get(field, {}).get('type', None)
+                self.cache_field(rid, ftype, field, value)
+        return self
+
+    def fetch_fields(self, fields, ids=None, context=None):
+        """ Read from server values of *fields* for records, that have no
+            at least one of them in cache, and store results in cache.
+
+            This is the single place where data of records is read,
+            so subclasses may override it to change the way data is fetched.
+
+            :param list fields: list of fields to read
+            :param list ids: IDs of records to check. if not passed,
+                             all records managed by this cache will be
+                             checked.
+            :param dict context: context to read data with
+            :return: self
+            :rtype: ObjectCache
+        """
+        if ids is None:
+            ids_to_read = self.get_ids_to_read(*fields)
+        else:
+            ids_to_read = [i for i in ids
+                           if any(f not in self[i] for f in fields)]
+
+        if ids_to_read:
+            self.cache_data(self._object.read(ids_to_read, list(fields),
+                                              context=context))
+        return self
+
     def parse_prefetch_fields(self, fields):
         """ Parse fields to be prefetched, sparating, cache's object fields
             and related fields.
@@ -153,14 +299,8 @@ class ObjectCache(dict):
         """
         to_prefetch, related = self.parse_prefetch_fields(fields)
 
-        col_info = self._object.columns_info
-        for data in self._object.read(self.get_ids_to_read(*to_prefetch),
-                                      to_prefetch):
-            for field, value in data.items():
-
-                # Fill related cache
-                ftype = col_info.get(field, {}).get('type', None)
-                self.cache_field(data['id'], ftype, field, value)
+        if to_prefetch:
+            self.fetch_fields(to_prefetch)
 
         if related:
             # TODO: think how to avoid infinite recursion and double reads
@@ -187,6 +327,15 @@ class Cache(dict):
         """
         return self._client
 
+    def _create_object_cache(self, obj):
+        """ Create cache for specified object.
+            Could be overridden to use another class for object caches
+
+            :param Object obj: object to create cache for
+            :rtype: ObjectCache
+        """
+        return ObjectCache(self, obj)
+
     def __missing__(self, key):
         try:
             obj = self._client.get_obj(key)
@@ -194,14 +343,472 @@ class Cache(dict):
             raise KeyError("There is no object with such name: %s" % key)
 
         # TODO: FIX: Object caches generated without context
-        self[key] = ObjectCache(self, obj)
-        return self[key]
+        return self.setdefault(key, self._create_object_cache(obj))
+
+
+class ThreadSafeObjectCache(ObjectCache):
+    """ Object cache, that could be safely shared between threads.
+
+        All changes of cache are guarded by lock (one per object/model).
+        Also reads of data are deduplicated: if some thread is already
+        reading field for some records, other threads, that need
+        same data, wait for that read instead of sending another one.
+    """
+    __slots__ = ('_lock', '_inflight')
+
+    def __init__(self, *args, **kwargs):
+        self._lock = threading.RLock()
+
+        # (field, id) -> threading.Event of read in progress
+        self._inflight = {}
+        super(ThreadSafeObjectCache, self).__init__(*args, **kwargs)
+
+    def update_keys(self, keys):
+        with self._lock:
+            return super(ThreadSafeObjectCache, self).update_keys(keys)
+
+    def update_context(self, new_context):
+        with self._lock:
+            return super(ThreadSafeObjectCache, self).update_context(
+                new_context)
+
+    def get_ids_to_read(self, *fields):
+        with self._lock:
+            return super(ThreadSafeObjectCache, self).get_ids_to_read(
+                *fields)
+
+    def get_related(self, rid, field, value, factory, cached=True):
+        with self._lock:
+            memo = self._related.get(rid, {}).get(field, None)
+        if cached and memo is not None and \
+                (memo[0] is value or memo[0] == value):
+            return memo[1]
+
+        # Factory may access other caches, so it is called without lock
+        res = factory(value)
+        with self._lock:
+            self._related.setdefault(rid, {})[field] = (value, res)
+        return res
+
+    def _forget_record(self, rid):
+        # Related caches are cleaned by refresh_ids after this lock
+        # is released (they use their own locks)
+        with self._lock:
+            return super(ThreadSafeObjectCache, self)._forget_record(rid)
+
+    def _clean_record(self, rid):
+        with self._lock:
+            # Replace data dictionary instead of clearing it, so
+            # concurrent readers never see record without 'id'
+            dict.__setitem__(self, rid, {'id': rid})
+
+    def cache_field(self, rid, ftype, field_name, value):
+        with self._lock:
+            self[rid][field_name] = value
+
+        # Related caches use their own locks. They are not acquired while
+        # this lock is held to avoid deadlocks
+        self._cache_related(ftype, field_name, value)
+
+    def _claim_ids_to_read(self, fields, ids, attempted, event):
+        """ Find IDs to be read by current thread and register them as
+            being read. Also find reads in progress in other threads,
+            current thread have to wait for.
+
+            :return: tuple(ids_to_read, events_to_wait)
+        """
+        with self._lock:
+            if ids is None:
+                candidates = list(six.viewitems(self))
+            else:
+                candidates = [(i, self[i]) for i in ids]
+
+            to_read, to_wait = [], set()
+            for rid, data in candidates:
+                if rid in attempted:
+                    continue
+                missing = [f for f in fields if f not in data]
+                if not missing:
+                    continue
+                events = [self._inflight.get((f, rid), None)
+                          for f in missing]
+                if all(events):
+                    to_wait.update(events)
+                else:
+                    to_read.append(rid)
+
+            for rid in to_read:
+                for field in fields:
+                    self._inflight.setdefault((field, rid), event)
+            return to_read, to_wait
+
+    def _release_ids(self, fields, ids, event):
+        with self._lock:
+            for rid in ids:
+                for field in fields:
+                    if self._inflight.get((field, rid), None) is event:
+                        del self._inflight[(field, rid)]
+        event.set()
+
+    def fetch_fields(self, fields, ids=None, context=None):
+        fields = list(fields)
+        attempted = set()
+        while True:
+            event = threading.Event()
+            to_read, to_wait = self._claim_ids_to_read(
+                fields, ids, attempted, event)
+            if not to_read and not to_wait:
+                return self
+
+            if to_read:
+                attempted.update(to_read)
+                try:
+                    self.cache_data(self._object.read(to_read, fields,
+                                                      context=context))
+                finally:
+                    self._release_ids(fields, to_read, event)
+
+            for other_event in to_wait:
+                other_event.wait()
+
+            if not to_wait:
+                return self
+            # Check again: reads we waited for may fail
+
+
+class ThreadSafeCache(Cache):
+    """ Cache, that could be safely shared between threads.
+        Uses *ThreadSafeObjectCache* for object caches.
+    """
+
+    def _create_object_cache(self, obj):
+        return ThreadSafeObjectCache(self, obj)
+
+
+class CompactColumn(object):
+    """ Values of single field for all records of compact object cache.
+
+        Values are stored by row offset in typed array (if field type
+        allows it) or in list. Presence of value for row is tracked
+        in bitmap. If value, that does not fit array's type is stored
+        (for example *False* in integer field), column is converted to list.
+
+        :param str typecode: typecode of array to store values in.
+                             if not set, values are stored in list
+    """
+    __slots__ = ('typecode', 'values', 'present')
+
+    # typecode -> exact type of values, that could be stored in array
+    _value_types = {
+        INT_TYPECODE: six.integer_types,
+        'd': (float,),
+        'b': (bool,),
+    }
+
+    def __init__(self, typecode=None):
+        self.typecode = typecode
+        self.values = array.array(typecode) if typecode else []
+        self.present = bytearray()
+
+    def has(self, row):
+        byte = row >> 3
+        return (byte < len(self.present) and
+                bool(self.present[byte] & (1 << (row & 7))))
+
+    def get(self, row):
+        if not self.has(row):
+            raise KeyError(row)
+        value = self.values[row]
+        if self.typecode == 'b':
+            return bool(value)
+        return value
+
+    def _to_list(self):
+        values = self.values
+        if self.typecode == 'b':
+            self.values = [bool(v) for v in values]
+        else:
+            self.values = values.tolist()
+        self.typecode = None
+
+    def _grow(self, row):
+        size = len(self.values)
+        if row >= size:
+            fill = 0 if self.typecode else None
+            self.values.extend([fill] * (row + 1 - size))
+        nbytes = (row >> 3) + 1
+        if nbytes > len(self.present):
+            self.present.extend(bytearray(nbytes - len(self.present)))
+
+    def set(self, row, value):
+        if self.typecode and \
+                type(value) not in self._value_types[self.typecode]:
+            self._to_list()
+        self._grow(row)
+        try:
+            self.values[row] = value
+        except OverflowError:
+            self._to_list()
+            self.values[row] = value
+        self.present[row >> 3] |= 1 << (row & 7)
+
+    def delete(self, row):
+        if not self.has(row):
+            raise KeyError(row)
+        self.present[row >> 3] &= ~(1 << (row & 7)) & 0xFF
+        if not self.typecode:
+            self.values[row] = None
+
+
+class Many2OneCompactColumn(CompactColumn):
+    """ Column for many2one fields: values like ``[id, name]`` are split
+        into array of IDs and list of names. Empty values are stored
+        as ID *0*.
+    """
+    __slots__ = ('names',)
+
+    def __init__(self):
+        super(Many2OneCompactColumn, self).__init__(INT_TYPECODE)
+        self.names = []
+
+    def get(self, row):
+        if self.typecode is None:
+            return super(Many2OneCompactColumn, self).get(row)
+        if not self.has(row):
+            raise KeyError(row)
+        rid = self.values[row]
+        if not rid:
+            return False
+        name = self.names[row]
+        return rid if name is None else [rid, name]
+
+    def _to_list(self):
+        self.values = [False if not rid else
+                       rid if name is None else [rid, name]
+                       for rid, name in zip(self.values, self.names)]
+        self.names = []
+        self.typecode = None
+
+    def _grow(self, row):
+        super(Many2OneCompactColumn, self)._grow(row)
+        if self.typecode and row >= len(self.names):
+            self.names.extend([None] * (row + 1 - len(self.names)))
+
+    def set(self, row, value):
+        if self.typecode is None:
+            return super(Many2OneCompactColumn, self).set(row, value)
+
+        if value is False:
+            rid, name = 0, None
+        elif type(value) in six.integer_types:
+            rid, name = value, None
+        elif isinstance(value, (list, tuple)) and len(value) == 2 and \
+                type(value[0]) in six.integer_types and value[0] and \
+                isinstance(value[1], six.string_types):
+            rid, name = value
+        else:
+            self._to_list()
+            return super(Many2OneCompactColumn, self).set(row, value)
+
+        self._grow(row)
+        self.values[row] = rid
+        self.names[row] = name
+        self.present[row >> 3] |= 1 << (row & 7)
+
+    def delete(self, row):
+        super(Many2OneCompactColumn, self).delete(row)
+        if self.typecode:
+            self.names[row] = None
+
+
+class CompactRow(collections_abc.MutableMapping):
+    """ Data of single record in compact object cache.
+
+        Light-weight view, that presents data stored in columns of
+        *CompactObjectCache* as dictionary. Views are created on each
+        access to cache, so they do not take memory.
+    """
+    __slots__ = ('_cache', '_id', '_row')
+
+    def __init__(self, cache, rid, row):
+        self._cache = cache
+        self._id = rid
+        self._row = row
+
+    def __getitem__(self, key):
+        if key == 'id':
+            return self._id
+        column = self._cache._columns.get(key, None)
+        if column is None:
+            raise KeyError(key)
+        try:
+            return column.get(self._row)
+        except KeyError:
+            raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key == 'id':
+            if value != self._id:
+                raise ValueError("ID of cached record could not be changed")
+            return
+        self._cache._get_column(key).set(self._row, value)
+
+    def __delitem__(self, key):
+        if key == 'id':
+            raise KeyError(key)
+        column = self._cache._columns.get(key, None)
+        if column is None or not column.has(self._row):
+            raise KeyError(key)
+        column.delete(self._row)
+
+    def __contains__(self, key):
+        if key == 'id':
+            return True
+        column = self._cache._columns.get(key, None)
+        return column is not None and column.has(self._row)
+
+    def __iter__(self):
+        yield 'id'
+        row = self._row
+        for key, column in list(self._cache._columns.items()):
+            if column.has(row):
+                yield key
+
+    def __len__(self):
+        return sum(1 for __ in self)
+
+    def clear(self):
+        """ Remove all cached values of record, except ID
+        """
+        for key in list(self):
+            if key != 'id':
+                del self[key]
+
+    def copy(self):
+        """ Returns data of record as dictionary
+        """
+        return dict(self)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+_dict_items = dict.iteritems if six.PY2 else dict.items
+
+
+class CompactObjectCache(ObjectCache):
+    """ Object cache, that stores data in columns instead of
+        separate dictionary for each record.
+
+        Cache itself maps IDs of records to row offsets. Values of
+        each field are stored in typed array (integer, float, boolean
+        and IDs of many2one fields) or list (other fields), and presence
+        of values is tracked by bitmap (see *CompactColumn*).
+
+        Data of records is accessible as usual (``cache[id][field]``),
+        via *CompactRow* views, so it could be used by *Record*
+        without any changes. For large amount of records this takes
+        about two times less memory, than dictionaries (more for
+        numeric and many2one fields, less for text fields).
+        See ``scripts/bench_cache_memory.py``.
+    """
+    __slots__ = ('_columns', '_nrows')
+
+    # field type -> typecode of array to store values in
+    _typecodes = {
+        'integer': INT_TYPECODE,
+        'float': 'd',
+        'monetary': 'd',
+        'boolean': 'b',
+    }
+
+    def __init__(self, *args, **kwargs):
+        self._columns = {}
+        self._nrows = 0
+        super(CompactObjectCache, self).__init__(*args, **kwargs)
+
+    def _get_column(self, field, ftype=None):
+        column = self._columns.get(field, None)
+        if column is None:
+            if ftype is None:
+                ftype = self._object.columns_info.get(
+                    field, {}).get('type', None)
+            if ftype == 'many2one':
+                column = Many2OneCompactColumn()
+            else:
+                column = CompactColumn(self._typecodes.get(ftype, None))
+            self._columns[field] = column
+        return column
+
+    def _add_row(self, key):
+        row = self._nrows
+        self._nrows += 1
+        dict.__setitem__(self, key, row)
+        return row
+
+    def __missing__(self, key):
+        return self._add_row(key)
+
+    def __getitem__(self, key):
+        # dict.__getitem__ calls __missing__ for new IDs
+        return CompactRow(self, key, dict.__getitem__(self, key))
+
+    def get(self, key, default=None):
+        if key in self:
+            return self[key]
+        return default
+
+    def iteritems(self):
+        for rid, row in _dict_items(self):
+            yield rid, CompactRow(self, rid, row)
+
+    def itervalues(self):
+        for rid, row in _dict_items(self):
+            yield CompactRow(self, rid, row)
+
+    items = viewitems = iteritems
+    values = viewvalues = itervalues
+
+    def update_keys(self, keys):
+        for key in keys:
+            if not dict.__contains__(self, key):
+                self._add_row(key)
+        return self
+
+    def get_ids_to_read(self, *fields):
+        columns = [self._columns.get(f, None)
+                   for f in fields if f != 'id']
+        if any(c is None for c in columns):
+            return list(self)
+        return [rid for rid, row in _dict_items(self)
+                if not all(c.has(row) for c in columns)]
+
+    def cache_field(self, rid, ftype, field_name, value):
+        if field_name != 'id':
+            self._get_column(field_name, ftype).set(
+                dict.__getitem__(self, rid), value)
+        self._cache_related(ftype, field_name, value)
+
+
+class CompactCache(Cache):
+    """ Cache, that uses *CompactObjectCache* for object caches.
+        Useful, when large amount of records have to be cached.
+    """
+
+    def _create_object_cache(self, obj):
+        return CompactObjectCache(self, obj)
 
 
-def empty_cache(client):
+def empty_cache(client, thread_safe=False, compact=False):
     """ Create instance of empty cache for Record
 
         :param Client client: instance of Client to create cache for
+        :param bool thread_safe: if set to True, then cache, that could be
+                                 shared between threads will be created
+                                 (instance of *ThreadSafeCache*)
+        :param bool compact: if set to True, then cache, that stores data
+                             in columns will be created
+                             (instance of *CompactCache*)
         :return: instance of Cache class
         :rtype: Cache
 
@@ -218,4 +825,10 @@ def empty_cache(client):
             }
 
     """
+    if thread_safe and compact:
+        raise ValueError("Compact cache could not be shared between threads")
+    if thread_safe:
+        return ThreadSafeCache(client)
+    if compact:
+        return CompactCache(client)
     return Cache(client)
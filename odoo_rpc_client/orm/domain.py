@@ -0,0 +1,418 @@
+# -*- coding: utf-8 -*-
+# Copyright © 2014-2018 Dmytro Katyukha <dmytro.katyukha@gmail.com>
+
+#######################################################################
+# This Source Code Form is subject to the terms of the Mozilla Public #
+# License, v. 2.0. If a copy of the MPL was not distributed with this #
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.            #
+#######################################################################
+
+""" Client-side evaluation of Odoo domains on cached data.
+
+Used by *RecordList.filtered_domain* method to filter records
+without sending list of their IDs to server.
+"""
+
+import re
+import six
+import operator
+
+from ..utils import ustr
+
+__all__ = ('normalize_domain', 'DomainEvaluator')
+
+TRUE_LEAF = (1, '=', 1)
+FALSE_LEAF = (0, '=', 1)
+
+DOMAIN_OPERATORS_ARITY = {
+    '!': 1,
+    '&': 2,
+    '|': 2,
+}
+
+# Negative operators are evaluated as complement of positive ones
+NEGATIVE_OPERATORS = {
+    '!=': '=',
+    '<>': '=',
+    'not in': 'in',
+    'not like': 'like',
+    'not ilike': 'ilike',
+}
+
+COMPARISON_OPERATORS = {
+    '<': operator.lt,
+    '>': operator.gt,
+    '<=': operator.le,
+    '>=': operator.ge,
+}
+
+LIKE_OPERATORS = ('like', 'ilike', '=like', '=ilike')
+
+X2MANY_TYPES = ('one2many', 'many2many')
+
+
+def normalize_domain(domain):
+    """ Returns normalized version of domain: all logical operators
+        are present explicitly (in prefix notation)
+
+        :param list domain: domain to normalize
+        :rtype: list
+    """
+    if not domain:
+        return [TRUE_LEAF]
+
+    result = []
+    expected = 1
+    for token in domain:
+        if expected == 0:
+            # more than expected, so add implicit '&'
+            result[0:0] = ['&']
+            expected = 1
+        if isinstance(token, (list, tuple)):
+            expected -= 1
+        else:
+            expected += DOMAIN_OPERATORS_ARITY.get(token, 0) - 1
+        result.append(token)
+    if expected != 0:
+        raise ValueError("Domain %r is syntactically incorrect" % (domain,))
+    return result
+
+
+def _like_regex(pattern, operator_name):
+    """ Compile regular expression for *like* operators.
+        '%' and '_' in pattern work as SQL wildcards.
+    """
+    regex = ''.join('.*' if c == '%' else '.' if c == '_' else re.escape(c)
+                    for c in pattern)
+    if not operator_name.startswith('='):
+        regex = '.*' + regex + '.*'
+    flags = re.DOTALL
+    if 'ilike' in operator_name:
+        flags |= re.IGNORECASE
+    return re.compile(regex + r'\Z', flags)
+
+
+def _as_list(value):
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return list(value)
+    return [value]
+
+
+class DomainEvaluator(object):
+    """ Evaluates domains on data stored in cache.
+
+        Missing field values are read from server in batches
+        (one *read* call per model and set of fields). Once data is
+        cached, evaluation does not require any calls to server.
+
+        Supported operators: ``=``, ``!=``, ``<``, ``>``, ``<=``, ``>=``,
+        ``=?``, ``in``, ``not in``, ``like``, ``ilike``, ``not like``,
+        ``not ilike``, ``=like``, ``=ilike`` and ``child_of``.
+        Dot-separated field paths are supported: leaf matches record
+        if it matches any of related records.
+
+        :param Cache cache: cache to take data from
+    """
+
+    def __init__(self, cache):
+        self._cache = cache
+
+    @property
+    def cache(self):
+        """ Cache this evaluator works on
+        """
+        return self._cache
+
+    def _get_object(self, name):
+        return self._cache.client.get_obj(name)
+
+    def fetch(self, obj, ids, fields):
+        """ Ensure that *fields* are cached for records with *ids*.
+            Missing data is read from server by single call.
+        """
+        lcache = self._cache[obj.name]
+        return lcache.fetch_fields(fields, ids=ids, context=lcache.context)
+
+    def prefetch(self, obj, domain):
+        """ Prefetch all fields used in *domain* (including related ones)
+            using batched prefetch of cache.
+        """
+        fields = set(leaf[0] for leaf in domain
+                     if isinstance(leaf, (list, tuple)) and
+                     isinstance(leaf[0], six.string_types) and
+                     leaf[0] != 'id')
+        if fields:
+            self._cache[obj.name].prefetch_fields(list(fields))
+
+    def filter_ids(self, obj, ids, domain):
+        """ Find which of *ids* match *domain*
+
+            :param Object obj: object (model) records belong to
+            :param list ids: IDs of records to check
+            :param list domain: domain to check records with
+            :return: set of IDs of matched records
+            :rtype: set
+        """
+        domain = normalize_domain(domain)
+        self.prefetch(obj, domain)
+
+        all_ids = set(ids)
+        stack = []
+        for token in reversed(domain):
+            if token == '&':
+                stack.append(stack.pop() & stack.pop())
+            elif token == '|':
+                stack.append(stack.pop() | stack.pop())
+            elif token == '!':
+                stack.append(all_ids - stack.pop())
+            else:
+                stack.append(self._eval_leaf(obj, all_ids, token))
+        return stack.pop()
+
+    def _eval_leaf(self, obj, ids, leaf):
+        path, op, value = leaf
+        if not isinstance(path, six.string_types):
+            # TRUE_LEAF or FALSE_LEAF
+            return set(ids) if path == value else set()
+
+        op = op.lower()
+        field, __, rest = path.partition('.')
+
+        if field == 'id' and not rest:
+            ftype, relation = 'integer', None
+        else:
+            finfo = obj.columns_info.get(field, None)
+            if finfo is None:
+                raise ValueError("Invalid field %r in leaf %r"
+                                 "" % (field, leaf))
+            ftype = finfo['type']
+            relation = finfo.get('relation', None)
+
+        if rest:
+            if not relation:
+                raise ValueError("Field %r is not relational (leaf: %r)"
+                                 "" % (field, leaf))
+            return self._eval_related(obj, ids, field, ftype,
+                                      self._get_object(relation),
+                                      (rest, op, value))
+
+        if op in NEGATIVE_OPERATORS:
+            return ids - self._eval_leaf(
+                obj, ids, (path, NEGATIVE_OPERATORS[op], value))
+
+        if op == 'child_of':
+            if field == 'id':
+                target, candidates = obj, ids
+            else:
+                target = self._get_object(relation)
+                candidates = self._get_related_ids(obj, ids, field, ftype)
+            parent_ids = _as_list(value)
+            if not all(isinstance(v, six.integer_types) for v in parent_ids):
+                raise ValueError("Only IDs are supported as value of "
+                                 "'child_of' operator (leaf: %r)" % (leaf,))
+            matched = self._child_of(target, parent_ids, candidates)
+            return self._match_ids(obj, ids, field, ftype,
+                                   matched.__contains__)
+
+        if field == 'id':
+            check = self._make_check(ftype, op, value)
+            return set(i for i in ids if check(i))
+
+        if ftype == 'many2one' or ftype in X2MANY_TYPES:
+            return self._eval_relational(obj, ids, field, ftype, op, value)
+
+        check = self._make_check(ftype, op, value)
+        lcache = self.fetch(obj, ids, [field])
+        return set(i for i in ids if check(lcache[i][field]))
+
+    def _make_check(self, ftype, op, value):
+        """ Build function, that checks raw (scalar) value
+        """
+        if op == '=?':
+            if value is None or value is False:
+                return lambda v: True
+            op = '='
+
+        if op == '=':
+            return lambda v: v == value
+        if op == 'in':
+            values = _as_list(value)
+            return lambda v: v in values
+        if op in COMPARISON_OPERATORS:
+            cmp_op = COMPARISON_OPERATORS[op]
+            if ftype == 'boolean':
+                return lambda v: cmp_op(v, value)
+            return lambda v: v is not False and cmp_op(v, value)
+        if op in LIKE_OPERATORS:
+            regex = _like_regex(ustr(value), op)
+            return lambda v: bool(v) and bool(regex.match(ustr(v)))
+        raise ValueError("Unsupported operator %r" % op)
+
+    def _match_ids(self, obj, ids, field, ftype, check_id):
+        """ Find records which (related) ids match *check_id* function.
+            For x2many fields any of related records should match.
+        """
+        if field == 'id':
+            return set(i for i in ids if check_id(i))
+
+        lcache = self.fetch(obj, ids, [field])
+        res = set()
+        for i in ids:
+            val = lcache[i][field]
+            if ftype == 'many2one':
+                if val and check_id(val[0] if isinstance(val, (list, tuple))
+                                    else val):
+                    res.add(i)
+            elif any(check_id(v) for v in val or []):
+                res.add(i)
+        return res
+
+    def _eval_relational(self, obj, ids, field, ftype, op, value):
+        """ Evaluate leaf on many2one or x2many field itself
+        """
+        if op == '=?':
+            if value is None or value is False:
+                return set(ids)
+            op = '='
+
+        values = _as_list(value) if op in ('=', 'in') else None
+        if values is not None and all(
+                v is False or isinstance(v, six.integer_types)
+                for v in values):
+            match_empty = False in values
+            id_values = set(v for v in values if v is not False)
+            lcache = self.fetch(obj, ids, [field])
+            res = set()
+            for i in ids:
+                val = lcache[i][field]
+                if not val:
+                    if match_empty:
+                        res.add(i)
+                elif ftype == 'many2one':
+                    rid = val[0] if isinstance(val, (list, tuple)) else val
+                    if rid in id_values:
+                        res.add(i)
+                elif id_values.intersection(val):
+                    res.add(i)
+            return res
+
+        if ftype != 'many2one':
+            raise ValueError("Unsupported operator %r for field %r "
+                             "of type %s" % (op, field, ftype))
+
+        # Comparison with integer is comparison of IDs (as in Odoo)
+        if op in COMPARISON_OPERATORS and \
+                isinstance(value, six.integer_types) and \
+                not isinstance(value, bool):
+            return self._match_ids(obj, ids, field, ftype,
+                                   self._make_check('integer', op, value))
+
+        # Search on name of related record (as Odoo does via name_search)
+        check = self._make_check('char', op, value)
+        names = self._get_names(obj, ids, field)
+        lcache = self._cache[obj.name]
+        res = set()
+        for i in ids:
+            val = lcache[i][field]
+            if not val:
+                continue
+            rid = val[0] if isinstance(val, (list, tuple)) else val
+            if check(names[rid]):
+                res.add(i)
+        return res
+
+    def _get_names(self, obj, ids, field):
+        """ Returns dictionary ``{id: name}`` for records related
+            to *ids* via many2one *field*.
+
+            Names are taken from cached values of field (``[id, name]``)
+            or from cache of related model. Names missing in cache
+            (for example, if field value is cached as bare ID)
+            are read by single *name_get* call.
+        """
+        lcache = self.fetch(obj, ids, [field])
+        rel_obj = self._get_object(obj.columns_info[field]['relation'])
+        rcache = self._cache[rel_obj.name]
+        names, to_read = {}, set()
+        for i in ids:
+            val = lcache[i][field]
+            if not val:
+                continue
+            if isinstance(val, (list, tuple)):
+                names[val[0]] = val[1]
+                continue
+            rdata = rcache[val]
+            if '__name_get_result' in rdata:
+                names[val] = rdata['__name_get_result']
+            else:
+                to_read.add(val)
+
+        if to_read:
+            for rid, name in rel_obj.name_get(sorted(to_read)):
+                rcache[rid]['__name_get_result'] = name
+                names[rid] = name
+        return names
+
+    def _get_related_ids(self, obj, ids, field, ftype):
+        """ Returns set of IDs of records related to *ids* via *field*
+        """
+        lcache = self.fetch(obj, ids, [field])
+        rel_ids = set()
+        for i in ids:
+            val = lcache[i][field]
+            if not val:
+                continue
+            if ftype == 'many2one':
+                rel_ids.add(val[0] if isinstance(val, (list, tuple))
+                            else val)
+            else:
+                rel_ids.update(val)
+        return rel_ids
+
+    def _eval_related(self, obj, ids, field, ftype, rel_obj, leaf):
+        """ Evaluate leaf with dot-separated path on related records
+        """
+        rel_ids = self._get_related_ids(obj, ids, field, ftype)
+        matched = self._eval_leaf(rel_obj, rel_ids, leaf) if rel_ids else set()
+        return self._match_ids(obj, ids, field, ftype, matched.__contains__)
+
+    def _child_of(self, obj, parent_ids, candidates):
+        """ Find which of *candidates* are children of *parent_ids*
+            (or *parent_ids* themselves).
+
+            Hierarchy is computed on cached *parent_id* field.
+            If model has no *parent_id* field, server is asked.
+        """
+        parent_ids = set(parent_ids)
+        parent_field = obj.columns_info.get('parent_id', None)
+        if not parent_field or parent_field.get('relation') != obj.name:
+            return set(obj.search([('id', 'child_of', list(parent_ids))]))
+
+        # Read whole hierarchy from cache, fetching missing parents
+        # level by level
+        lcache = self._cache[obj.name]
+        parents = {}
+        todo = set(candidates)
+        while todo:
+            self.fetch(obj, todo, ['parent_id'])
+            next_todo = set()
+            for i in todo:
+                val = lcache[i]['parent_id']
+                pid = (val[0] if isinstance(val, (list, tuple)) else val) \
+                    if val else False
+                parents[i] = pid
+                if pid and pid not in parents:
+                    next_todo.add(pid)
+            todo = next_todo - set(parents)
+
+        res = set()
+        for rid in candidates:
+            seen = set()
+            pid = rid
+            while pid and pid not in seen:
+                if pid in parent_ids:
+                    res.add(rid)
+                    break
+                seen.add(pid)
+                pid = parents.get(pid, False)
+        return res
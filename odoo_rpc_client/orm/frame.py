@@ -0,0 +1,293 @@
+# -*- coding: utf-8 -*-
+# Copyright © 2014-2018 Dmytro Katyukha <dmytro.katyukha@gmail.com>
+
+#######################################################################
+# This Source Code Form is subject to the terms of the Mozilla Public #
+# License, v. 2.0. If a copy of the MPL was not distributed with this #
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.            #
+#######################################################################
+
+""" Columnar export of records.
+
+Data is read from server page by page and appended directly to typed
+column buffers (``array.array``), without creating records
+or keeping list of dictionaries in memory.
+
+Result could be converted to NumPy arrays, pandas DataFrame or
+pyarrow Table (if these libraries are installed).
+
+Columns are named in same way as Odoo export does it:
+
+- ``id``: ID of record
+- ``<field>``: value of field (for many2one fields - name of related record)
+- ``<field>/.id``: ID of related record (for many2one fields only)
+"""
+
+import array
+import datetime
+import collections
+
+from ..utils import (chunks,
+                     INT_TYPECODE)
+
+
+__all__ = (
+    'read_columns',
+    'convert_columns',
+    'columns_to_numpy',
+    'columns_to_pandas',
+    'columns_to_arrow',
+)
+
+# Value used for empty dates in date / datetime columns (same as NumPy NaT)
+NAT = -(2 ** 63)
+
+_EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+
+
+def _parse_date(value):
+    """ Convert Odoo date string to number of days since epoch
+    """
+    if not value:
+        return NAT
+    return datetime.date(int(value[0:4]),
+                         int(value[5:7]),
+                         int(value[8:10])).toordinal() - _EPOCH_ORDINAL
+
+
+def _parse_datetime(value):
+    """ Convert Odoo datetime string to number of seconds since epoch
+    """
+    if not value:
+        return NAT
+    return (_parse_date(value) * 86400 +
+            int(value[11:13]) * 3600 +
+            int(value[14:16]) * 60 +
+            int(value[17:19]))
+
+
+class ColumnBuilder(object):
+    """ Accumulates values of single field in typed buffer
+
+        :param str field: name of field
+        :param str kind: kind of column: one of 'int', 'float', 'bool',
+                         'date', 'datetime' or 'object'
+    """
+    typecodes = {
+        'int': INT_TYPECODE,
+        'float': 'd',
+        'bool': 'b',
+        'date': INT_TYPECODE,
+        'datetime': INT_TYPECODE,
+    }
+
+    def __init__(self, field, kind):
+        self.field = field
+        self.kind = kind
+        if kind in self.typecodes:
+            self.data = array.array(self.typecodes[kind])
+        else:
+            self.data = []
+        self.convert = getattr(self, '_convert_%s' % kind)
+
+    @staticmethod
+    def _convert_int(value):
+        return value or 0
+
+    @staticmethod
+    def _convert_float(value):
+        return float('nan') if value is False else value
+
+    @staticmethod
+    def _convert_bool(value):
+        return bool(value)
+
+    @staticmethod
+    def _convert_object(value):
+        return None if value is False else value
+
+    _convert_date = staticmethod(_parse_date)
+    _convert_datetime = staticmethod(_parse_datetime)
+
+    def append(self, value):
+        self.data.append(self.convert(value))
+
+    def columns(self):
+        """ List of tuples (column name, kind, buffer)
+        """
+        return [(self.field, self.kind, self.data)]
+
+
+class Many2OneColumnBuilder(object):
+    """ Splits many2one values into ``<field>/.id`` and ``<field>`` columns
+    """
+
+    def __init__(self, field):
+        self.field = field
+        self.ids = array.array(INT_TYPECODE)
+        self.names = []
+
+    def append(self, value):
+        if value:
+            self.ids.append(value[0])
+            self.names.append(value[1])
+        else:
+            self.ids.append(0)
+            self.names.append(None)
+
+    def columns(self):
+        return [('%s/.id' % self.field, 'int', self.ids),
+                (self.field, 'object', self.names)]
+
+
+_FIELD_KINDS = {
+    'integer': 'int',
+    'float': 'float',
+    'monetary': 'float',
+    'boolean': 'bool',
+    'date': 'date',
+    'datetime': 'datetime',
+}
+
+
+def _get_builder(field, field_info):
+    ftype = field_info.get('type', None)
+    if ftype == 'many2one':
+        return Many2OneColumnBuilder(field)
+    return ColumnBuilder(field, _FIELD_KINDS.get(ftype, 'object'))
+
+
+def read_columns(obj, ids, fields, page_size=1000, context=None):
+    """ Read *fields* of records with specified *ids* into
+        typed column buffers.
+
+        Data is read from server by pages of *page_size* records.
+
+        Numeric columns are represented by ``array.array`` instances.
+        Empty floats are *nan*, empty integers and many2one IDs are *0*.
+        Dates are stored as number of days since epoch and datetimes
+        as number of seconds since epoch (empty values are *NAT*).
+        Other columns are represented by lists (empty values are *None*).
+
+        :param Object obj: object to read data from
+        :param list ids: list of IDs of records to read
+        :param list fields: list of names of fields to read
+        :param int page_size: number of records to read by single call
+        :param dict context: context to read data with
+        :return: ordered dictionary *column name -> (kind, buffer)*
+        :rtype: collections.OrderedDict
+    """
+    fields = [f for f in fields if f != 'id']
+    columns_info = obj.columns_info
+    builders = [_get_builder(f, columns_info[f]) for f in fields]
+    id_column = array.array(INT_TYPECODE)
+
+    for page in chunks(ids, page_size):
+        data = obj.read(page, fields, context=context)
+        index = dict((row['id'], row) for row in data)
+        for rid in page:
+            row = index.get(rid, None)
+            if row is None:
+                continue
+            id_column.append(rid)
+            for builder in builders:
+                builder.append(row[builder.field])
+        del data, index
+
+    result = collections.OrderedDict([('id', ('int', id_column))])
+    for builder in builders:
+        for name, kind, data in builder.columns():
+            result[name] = (kind, data)
+    return result
+
+
+_NUMPY_DTYPES = {
+    'int': 'int64',
+    'float': 'float64',
+    'bool': 'int8',
+    'date': 'int64',
+    'datetime': 'int64',
+}
+_NUMPY_VIEWS = {
+    'bool': 'bool',
+    'date': 'datetime64[D]',
+    'datetime': 'datetime64[s]',
+}
+
+
+def columns_to_numpy(columns):
+    """ Convert result of *read_columns* to ordered dictionary of
+        NumPy arrays. Numeric buffers are not copied.
+
+        Requires *numpy* to be installed.
+
+        :rtype: collections.OrderedDict
+    """
+    import numpy
+
+    result = collections.OrderedDict()
+    for name, (kind, data) in columns.items():
+        if kind == 'object':
+            column = numpy.empty(len(data), dtype=object)
+            column[:] = data
+        else:
+            column = numpy.frombuffer(data, dtype=_NUMPY_DTYPES[kind])
+            if kind in _NUMPY_VIEWS:
+                column = column.view(_NUMPY_VIEWS[kind])
+        result[name] = column
+    return result
+
+
+def columns_to_pandas(columns):
+    """ Convert result of *read_columns* to pandas DataFrame
+
+        Requires *pandas* to be installed.
+
+        :rtype: pandas.DataFrame
+    """
+    import pandas
+
+    arrays = columns_to_numpy(columns)
+    return pandas.DataFrame(arrays, columns=list(arrays))
+
+
+def columns_to_arrow(columns):
+    """ Convert result of *read_columns* to pyarrow Table.
+        Empty values (nan, NaT, None) are converted to nulls.
+
+        Requires *pyarrow* to be installed.
+
+        :rtype: pyarrow.Table
+    """
+    import pyarrow
+
+    arrays = columns_to_numpy(columns)
+    return pyarrow.Table.from_arrays(
+        [pyarrow.array(a, from_pandas=True) for a in arrays.values()],
+        names=list(arrays))
+
+
+_CONVERTERS = {
+    'numpy': columns_to_numpy,
+    'pandas': columns_to_pandas,
+    'arrow': columns_to_arrow,
+}
+
+
+def convert_columns(columns, output):
+    """ Convert result of *read_columns* to requested *output* format
+
+        :param str output: one of:
+
+            - 'array': ordered dictionary *name -> buffer*
+              (``array.array`` or list), no extra dependencies required
+            - 'numpy': ordered dictionary *name -> numpy.ndarray*
+            - 'pandas': pandas DataFrame
+            - 'arrow': pyarrow Table
+    """
+    if output == 'array':
+        return collections.OrderedDict(
+            (name, data) for name, (__, data) in columns.items())
+    if output not in _CONVERTERS:
+        raise ValueError("Unsupported output format: %r" % output)
+    return _CONVERTERS[output](columns)
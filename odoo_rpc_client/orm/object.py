@@ -125,8 +125,18 @@ class Object(six.with_metaclass(ObjectType, DirMixIn)):
 
     def _get_columns_info(self):
         """ Calculates columns info
+
+            If client has shared metadata storage (see *Client.metadata*),
+            then columns info is taken from (or saved to) it
         """
-        return AttrDict(self.fields_get())
+        metadata = self.client.metadata
+        if metadata is None:
+            return AttrDict(self.fields_get())
+
+        columns_info = metadata.get(self.name, None)
+        if columns_info is None:
+            columns_info = metadata[self.name] = AttrDict(self.fields_get())
+        return columns_info
 
     @property
     def columns_info(self):
@@ -299,6 +309,47 @@ class Object(six.with_metaclass(ObjectType, DirMixIn)):
             index = dict((r['id'], r) for r in read)
             return [index[x] for x in ids if x in index]
 
+    def read_group(self, domain, fields, groupby, offset=0, limit=None,
+                   orderby=None, lazy=True, context=None):
+        """ Get list of records grouped by *groupby* fields
+            with aggregated values of *fields*.
+
+            Aggregation is performed on server side (in database)
+
+            Also look at `Odoo documentation <https://www.odoo.com/documentation/9.0/reference/orm.html#openerp.models.Model.read_group>`__
+
+            :param list domain: search domain to filter records to group
+            :param list fields: list of fields to read/aggregate
+            :param groupby: field or list of fields to group records by
+            :type groupby: str|list
+            :param int offset: number of groups to skip
+            :param int limit: max number of groups to return
+            :param str orderby: order of groups
+            :param bool lazy: if set to True (default) records are grouped
+                              only by first field in *groupby*, and
+                              other fields are placed in
+                              ``__context['group_by']`` of each group.
+                              (only Odoo 8.0+. Older versions
+                              always work in lazy mode)
+            :param dict context: context dictionary
+            :return: list of dictionaries (one per group)
+            :rtype: list
+        """  # noqa
+        if isinstance(groupby, six.string_types):
+            groupby = [groupby]
+
+        if self.client.server_version < parse_version('8.0'):
+            # There is no 'lazy' argument in OpenERP 7.0
+            lazy = None
+
+        args, kwargs = preprocess_args(domain, fields, groupby,
+                                       offset=offset or None,
+                                       limit=limit,
+                                       orderby=orderby,
+                                       lazy=lazy,
+                                       context=context)
+        return self.service.execute(self.name, 'read_group', *args, **kwargs)
+
     def search_count(self, domain=None, context=None):
         """ Returns the number of records matching the provided domain.
 
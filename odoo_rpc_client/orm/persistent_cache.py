@@ -0,0 +1,275 @@
+# -*- coding: utf-8 -*-
+# Copyright © 2014-2018 Dmytro Katyukha <dmytro.katyukha@gmail.com>
+
+#######################################################################
+# This Source Code Form is subject to the terms of the Mozilla Public #
+# License, v. 2.0. If a copy of the MPL was not distributed with this #
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.            #
+#######################################################################
+
+""" Cache, that persists data of records on disk (in SQLite database)
+
+Useful for short-lived scripts, that read mostly same data on each run.
+Values stored on disk are validated by *write_date* of records, so
+on warm start only *write_date* is read for records, and only changed
+records are read completely.
+
+Example::
+
+    from odoo_rpc_client.orm.persistent_cache import PersistentCache
+
+    cache = PersistentCache(client, '/var/cache/my-script.sqlite')
+    products = client['product.product'].search_records([], cache=cache)
+    products.prefetch('name', 'default_code')
+    ...
+    print(cache.report())
+    cache.close()
+"""
+
+import json
+import sqlite3
+import threading
+import collections
+
+from ..utils import chunks
+from .cache import (Cache,
+                    ObjectCache)
+
+__all__ = (
+    'SQLiteStorage',
+    'PersistentCache',
+    'PersistentObjectCache',
+)
+
+
+class SQLiteStorage(object):
+    """ Storage of field values in SQLite database.
+
+        Values are keyed by URL (includes user and database),
+        database name, language, model, record ID and field name,
+        and stored with *write_date* of record they were read for.
+
+        :param str path: path to SQLite database file
+    """
+    #: Max number of IDs to be passed to single query
+    query_batch_size = 500
+
+    def __init__(self, path):
+        self._path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS record_field ("
+                "    url TEXT NOT NULL,"
+                "    dbname TEXT NOT NULL,"
+                "    lang TEXT NOT NULL,"
+                "    model TEXT NOT NULL,"
+                "    rid INTEGER NOT NULL,"
+                "    field TEXT NOT NULL,"
+                "    value TEXT,"
+                "    write_date TEXT,"
+                "    PRIMARY KEY (url, dbname, lang, model, rid, field))")
+
+    @property
+    def path(self):
+        """ Path to database file
+        """
+        return self._path
+
+    def load(self, key, model, ids, fields):
+        """ Load stored values
+
+            :param tuple key: tuple (url, dbname, lang)
+            :param str model: name of model
+            :param list ids: list of IDs of records to load values for
+            :param list fields: list of fields to load
+            :return: dictionary ``{id: {field: (value, write_date)}}``
+        """
+        res = collections.defaultdict(dict)
+        fields = list(fields)
+        for batch in chunks(ids, self.query_batch_size):
+            query = (
+                "SELECT rid, field, value, write_date FROM record_field "
+                "WHERE url = ? AND dbname = ? AND lang = ? AND model = ? "
+                "AND rid IN (%s) AND field IN (%s)"
+                "" % (','.join('?' * len(batch)),
+                      ','.join('?' * len(fields))))
+            with self._lock:
+                rows = self._conn.execute(
+                    query, list(key) + [model] + batch + fields).fetchall()
+            for rid, field, value, write_date in rows:
+                res[rid][field] = (json.loads(value), write_date)
+        return res
+
+    def save(self, key, model, data, fields):
+        """ Save values of *fields* from *data*
+
+            :param tuple key: tuple (url, dbname, lang)
+            :param str model: name of model
+            :param list data: list of dictionaries (result of *read*)
+            :param list fields: list of fields to save
+        """
+        rows = [tuple(key) + (model, rdata['id'], field,
+                              json.dumps(rdata[field]),
+                              rdata.get('write_date', None))
+                for rdata in data
+                for field in fields
+                if field in rdata]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO record_field "
+                "(url, dbname, lang, model, rid, field, value, write_date) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def clear(self):
+        """ Remove all stored data
+        """
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM record_field")
+
+    def close(self):
+        """ Close database connection
+        """
+        with self._lock:
+            self._conn.close()
+
+
+class PersistentObjectCache(ObjectCache):
+    """ Object cache, that takes values of fields from persistent storage,
+        if *write_date* of record was not changed since they were saved.
+
+        Objects (models) without *write_date* field are cached only
+        in memory.
+    """
+    __slots__ = ()
+
+    def _storage_key(self, context):
+        client = self._root_cache.client
+        lang = (context or self.context or {}).get('lang', None) or ''
+        return (client.get_url(), client.dbname, lang)
+
+    def fetch_fields(self, fields, ids=None, context=None):
+        root = self._root_cache
+        if 'write_date' not in self._object.columns_info:
+            return super(PersistentObjectCache, self).fetch_fields(
+                fields, ids=ids, context=context)
+
+        fields = [f for f in fields if f != 'write_date']
+        if not fields:
+            return super(PersistentObjectCache, self).fetch_fields(
+                ['write_date'], ids=ids, context=context)
+
+        if ids is None:
+            ids_to_read = self.get_ids_to_read(*fields)
+        else:
+            ids_to_read = [i for i in ids
+                           if any(f not in self[i] for f in fields)]
+        if not ids_to_read:
+            return self
+
+        # Read actual write_date for records, that have no it in cache
+        super(PersistentObjectCache, self).fetch_fields(
+            ['write_date'], ids=ids_to_read, context=context)
+
+        # Take values that are up to date from storage
+        key = self._storage_key(context)
+        col_info = self._object.columns_info
+        stored = root.storage.load(key, self._object.name,
+                                   ids_to_read, fields)
+        hits = 0
+        for rid, rstored in stored.items():
+            rdata = self[rid]
+            for field, (value, write_date) in rstored.items():
+                if field not in rdata and \
+                        write_date == rdata.get('write_date', None):
+                    self.cache_field(rid, col_info[field]['type'],
+                                     field, value)
+                    hits += 1
+
+        # Read rest of data from server and save it
+        to_read = [i for i in ids_to_read
+                   if any(f not in self[i] for f in fields)]
+        if to_read:
+            data = self._object.read(to_read, fields + ['write_date'],
+                                     context=context)
+            self.cache_data(data)
+            root.storage.save(key, self._object.name, data, fields)
+
+        root._count(self._object.name,
+                    hits=hits,
+                    misses=len(ids_to_read) * len(fields) - hits)
+        return self
+
+
+class PersistentCache(Cache):
+    """ Cache, that persists values of fields on disk.
+
+        Also collects statistics of hits (values taken from disk)
+        and misses (values read from server).
+
+        :param Client client: instance of Client to create cache for
+        :param storage: path to SQLite database file or storage instance
+                        (for example *SQLiteStorage*)
+    """
+    __slots__ = ('_storage', '_stats')
+
+    def __init__(self, client, storage, *args, **kwargs):
+        if not isinstance(storage, SQLiteStorage):
+            storage = SQLiteStorage(storage)
+        self._storage = storage
+        self._stats = collections.defaultdict(lambda: [0, 0])
+        super(PersistentCache, self).__init__(client, *args, **kwargs)
+
+    @property
+    def storage(self):
+        """ Storage used by this cache
+        """
+        return self._storage
+
+    def _create_object_cache(self, obj):
+        return PersistentObjectCache(self, obj)
+
+    def _count(self, model, hits=0, misses=0):
+        stat = self._stats[model]
+        stat[0] += hits
+        stat[1] += misses
+
+    @property
+    def stats(self):
+        """ Statistics of cache usage:
+            dictionary ``{model: (hits, misses)}``, where hits is number of
+            field values taken from disk, and misses is number of
+            field values read from server.
+        """
+        return dict((model, tuple(stat))
+                    for model, stat in self._stats.items())
+
+    @property
+    def hit_ratio(self):
+        """ Ratio of field values taken from disk to all values requested
+            (from 0.0 to 1.0)
+        """
+        hits = sum(s[0] for s in self._stats.values())
+        total = hits + sum(s[1] for s in self._stats.values())
+        return float(hits) / total if total else 0.0
+
+    def report(self):
+        """ Text report of cache usage (hits, misses and hit ratio per model)
+
+            :rtype: str
+        """
+        lines = ["%-40s %10s %10s %8s" % ('Model', 'Hits',
+                                          'Misses', 'Ratio')]
+        for model, (hits, misses) in sorted(self.stats.items()):
+            total = hits + misses
+            lines.append("%-40s %10d %10d %7.1f%%" % (
+                model, hits, misses,
+                100.0 * hits / total if total else 0.0))
+        lines.append("Total hit ratio: %.1f%%" % (100.0 * self.hit_ratio))
+        return "\n".join(lines)
+
+    def close(self):
+        """ Close storage
+        """
+        self._storage.close()
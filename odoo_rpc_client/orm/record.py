@@ -12,33 +12,65 @@
 import six
 import abc
 import numbers
+import operator
 import functools
 import collections
 from extend_me import (ExtensibleType,
                        ExtensibleByHashType)
+from pkg_resources import parse_version
 from six.moves import collections_abc
 
 
 from ..utils import (wpartial,
                      normalizeSField,
                      preprocess_args,
+                     parallel_map,
+                     chunks,
                      ustr,
                      DirMixIn)
 from .object import Object
 from .cache import (empty_cache,
                     Cache)
+from .frame import (read_columns,
+                    convert_columns)
+from .domain import DomainEvaluator
+
+try:
+    # single placeholder instance used in SField stacks
+    from anyfield import PlaceHolder as SFieldPlaceHolder
+except ImportError:  # pragma: no cover
+    SFieldPlaceHolder = None
 
 
 __all__ = (
     'Record',
     'ObjectRecords',
     'RecordList',
+    'RecordGroup',
     'get_record',
+    'get_records',
     'get_record_list',
 )
 
 
-RecordMeta = ExtensibleByHashType._('Record', hashattr='object_name')
+class RecordRegistryType(type):
+    """ Metaclass mixed into *RecordMeta* to track registration of
+        Record extensions.
+
+        *generation* is incremented each time new Record extension
+        is defined, so memoized Record classes could be checked
+        for being outdated.
+    """
+    generation = 0
+
+    def __init__(cls, name, bases, attrs):
+        super(RecordRegistryType, cls).__init__(name, bases, attrs)
+        if not attrs.get('_generated', False):
+            RecordRegistryType.generation += 1
+
+
+RecordMeta = ExtensibleByHashType._('Record', hashattr='object_name',
+                                    with_meta=RecordRegistryType)
 
 
 def get_record(obj, rid, cache=None, context=None):
@@ -57,10 +89,71 @@ def get_record(obj, rid, cache=None, context=None):
             :return: created Record instance
             :rtype: Record
     """
-    cls = RecordMeta.get_class(obj.name, default=True)
+    cls = _get_record_class(obj)
     return cls(obj, rid, cache=cache, context=context)
 
 
+def _get_record_class(obj):
+    """ Returns Record class for object *obj*.
+
+        Resolved class is memoized on object, and resolved again only
+        if new Record extensions were registered since.
+    """
+    generation = RecordRegistryType.generation
+    cls = getattr(obj, '_record_class', None)
+    if cls is None or \
+            getattr(obj, '_record_class_generation', None) != generation:
+        cls = RecordMeta.get_class(obj.name, default=True)
+        try:
+            obj._record_class = cls
+            obj._record_class_generation = generation
+        except AttributeError:  # pragma: no cover
+            # object without ObjectRecords extension
+            pass
+    return cls
+
+
+def get_records(obj, ids, cache=None, context=None):
+    """ Creates list of Record instances for all *ids* at once.
+
+        Faster than calling *get_record* for each ID: Record class and
+        object cache are resolved only once, and all IDs are added
+        to cache by single call. If Record extensions do not override
+        ``__init__``, records are created bypassing it.
+
+            :param Object obj: instance of Object records are related to
+            :param list ids: IDs of records to create
+            :param cache: Cache instance. (usualy generated by
+                          function empty_cache()
+            :type cache: Cache
+            :param dict context: if specified, then cache's context
+                                 will be updated
+            :return: list of created Record instances
+            :rtype: list
+    """
+    cls = _get_record_class(obj)
+    cache = empty_cache(obj.client) if cache is None else cache
+    if six.get_unbound_function(cls.__init__) is not _record_init:
+        return [cls(obj, rid, cache=cache, context=context) for rid in ids]
+
+    lcache = cache[obj.name]
+    if context is not None:
+        lcache.update_context(context)
+    lcache.update_keys(ids)
+
+    new = cls.__new__
+    records = []
+    append = records.append
+    for rid in ids:
+        record = new(cls)
+        record._id = rid
+        record._object = obj
+        record._cache = cache
+        record._lcache = lcache
+        append(record)
+    return records
+
+
 @six.python_2_unicode_compatible
 class Record(six.with_metaclass(RecordMeta, DirMixIn)):
     """ Base class for all Records
@@ -123,7 +216,7 @@ class Record(six.with_metaclass(RecordMeta, DirMixIn)):
         Note, to create instance of cache call *empty_cache*
     """
 
-    __slots__ = ['_object', '_cache', '_lcache', '_id', '_related_objects']
+    __slots__ = ['_object', '_cache', '_lcache', '_id']
 
     def __init__(self, obj, rid, cache=None, context=None):
         assert isinstance(obj, Object), "obj should be Object"
@@ -133,7 +226,6 @@ class Record(six.with_metaclass(RecordMeta, DirMixIn)):
         self._object = obj
         self._cache = empty_cache(obj.client) if cache is None else cache
         self._lcache = self._cache[obj.name]
-        self._related_objects = {}
 
         self._lcache[self._id]  # ensure that ID of this record is in cache.
         if context is not None:
@@ -242,35 +334,37 @@ class Record(six.with_metaclass(RecordMeta, DirMixIn)):
         """ Method used to fetch related object by name of field
             that points to it
         """
-        if name not in self._related_objects or not cached:
-            if rel_data:
-                # Do not forged about relations in form [id, name]
-                rel_id = (rel_data[0]
-                          if isinstance(rel_data, collections_abc.Iterable)
-                          else rel_data)
-
-                rel_obj = self._service.get_obj(
-                    self._columns_info[name]['relation'])
-                self._related_objects[name] = get_record(rel_obj,
-                                                         rel_id,
-                                                         cache=self._cache,
-                                                         context=self.context)
-            else:
-                self._related_objects[name] = False
-        return self._related_objects[name]
+        def make_record(rel_data):
+            if not rel_data:
+                return False
+
+            # Do not forged about relations in form [id, name]
+            rel_id = (rel_data[0]
+                      if isinstance(rel_data, collections_abc.Iterable)
+                      else rel_data)
+
+            rel_obj = self._service.get_obj(
+                self._columns_info[name]['relation'])
+            return get_record(rel_obj, rel_id,
+                              cache=self._cache,
+                              context=self.context)
+
+        return self._lcache.get_related(self._id, name, rel_data,
+                                        make_record, cached=cached)
 
     def _get_one2many_rel_obj(self, name, rel_ids, cached=True, limit=None):
         """ Method used to fetch related objects by name of field
             that points to them using one2many relation
         """
-        if name not in self._related_objects or not cached:
+        def make_record_list(rel_ids):
             rel_obj = self._service.get_obj(
                 self._columns_info[name]['relation'])
-            self._related_objects[name] = get_record_list(rel_obj,
-                                                          rel_ids,
-                                                          cache=self._cache,
-                                                          context=self.context)
-        return self._related_objects[name]
+            return get_record_list(rel_obj, rel_ids,
+                                   cache=self._cache,
+                                   context=self.context)
+
+        return self._lcache.get_related(self._id, name, rel_ids,
+                                        make_record_list, cached=cached)
 
     def _get_field(self, ftype, name):
         """ Returns value for field 'name' of type 'type'
@@ -282,15 +376,8 @@ class Record(six.with_metaclass(RecordMeta, DirMixIn)):
             for diferent field values
         """
         if name not in self._data:
-            # save 'cache_field' function before for loop
-            cache_field = self._lcache.cache_field
-
-            # get list of ids in cache, that have not read requested field
-            for data in self._object.read(self._lcache.get_ids_to_read(name),
-                                          [name],
-                                          context=self.context):
-                # write each row of data to cache
-                cache_field(data['id'], ftype, name, data[name])
+            # read field for all records in cache, that have not read it yet
+            self._lcache.fetch_fields([name], context=self.context)
 
         # relational fields
         if ftype == 'many2one':
@@ -333,19 +420,8 @@ class Record(six.with_metaclass(RecordMeta, DirMixIn)):
            :returns: self
            :rtype: Record
         """
-        self._data.clear()
-        self._data['id'] = self._id
-
-        # Update related objects cache
-        rel_objects = self._related_objects
-        self._related_objects = {}  # cleanup related_objects cache
-
-        # recursively cleanup related records
-        for rel in rel_objects.values():
-            if isinstance(rel, (Record, RecordList)):
-                # both, Record and RecordList objects have *refresh* method
-                rel.refresh()
-
+        # Cleans data of this record and of related records
+        self._lcache.refresh_ids([self._id])
         return self
 
     def read(self, fields=None, context=None, multi=False):
@@ -430,10 +506,66 @@ class Record(six.with_metaclass(RecordMeta, DirMixIn)):
         return res
 
 
+# Used by *get_records* to check if extensions override Record.__init__
+_record_init = six.get_unbound_function(Record.__init__)
+
+
 RecordListMeta = ExtensibleType._('RecordList', with_meta=abc.ABCMeta)
 
 
-def get_record_list(obj, ids=None, fields=None, cache=None, context=None):
+# Operators, that could be applied to cached values in *RecordList.filter*
+_SIMPLE_KEY_OPERATORS = (
+    operator.eq,
+    operator.ne,
+    operator.lt,
+    operator.le,
+    operator.gt,
+    operator.ge,
+)
+
+
+def _parse_simple_key(key):
+    """ Check if *key* (passed to filter, sort or group_by methods of
+        RecordList) is simple enough to be computed directly on cached data.
+
+        Simple keys are field names and anyfield.SField instances like
+        ``F.state``, ``~F.active`` or ``F.state == 'done'``
+
+        :return: tuple ``(field, operator, argument)`` or None if key is
+                 not simple. For field names and simple SFields
+                 operator and argument will be None
+    """
+    if isinstance(key, six.string_types):
+        return key, None, None
+
+    stack = getattr(key, '__sf_stack__', None)
+    if SFieldPlaceHolder is None or not stack or len(stack) > 2:
+        return None
+
+    fn, args, kwargs = stack[0]
+    if (fn is not getattr or kwargs or len(args) != 2 or
+            args[0] is not SFieldPlaceHolder or
+            not isinstance(args[1], six.string_types)):
+        return None
+
+    if len(stack) == 1:
+        return args[1], None, None
+
+    op, op_args, op_kwargs = stack[1]
+    if op_kwargs or not op_args or \
+            op_args[0] is not SFieldPlaceHolder:
+        return None
+    if op is operator.not_ and len(op_args) == 1:
+        return args[1], op, None
+    if (op in _SIMPLE_KEY_OPERATORS and len(op_args) == 2 and
+            op_args[1] is not SFieldPlaceHolder and
+            getattr(op_args[1], '__sf_stack__', None) is None):
+        return args[1], op, op_args[1]
+    return None
+
+
+def get_record_list(obj, ids=None, fields=None, cache=None, context=None,
+                    domain=None, order=None):
     """ Returns new instance of RecordList object.
 
         :param obj: instance of Object to make this list related to
@@ -448,12 +580,17 @@ def get_record_list(obj, ids=None, fields=None, cache=None, context=None):
         :param context: context to be passed automatically to methods
                         called from this list (not used yet)
         :type context: dict
+        :param list domain: domain this list is based on.
+                            (look at *RecordList* for details)
+        :param str order: order of records in domain-based list
     """
     return RecordListMeta.get_object(obj,
                                      ids,
                                      fields=fields,
                                      cache=cache,
-                                     context=context)
+                                     context=context,
+                                     domain=domain,
+                                     order=order)
 
 
 # TODO: implement correct bechavior of cache when adding new records to record
@@ -476,37 +613,117 @@ class RecordList(six.with_metaclass(RecordListMeta,
         :param context: context to be passed automatically to methods
                         called from this list (not used yet)
         :type context: dict
-
+        :param list domain: domain records of this list match.
+                            If passed, derived searches (*search*,
+                            *search_records*, *search_count*) combine
+                            domains instead of sending IDs of records
+                            to server. If *ids* are not passed, then
+                            list is lazy: IDs are searched page by page
+                            (by *lazy_page_size* records), only
+                            when records are accessed.
+        :type domain: list
+        :param str order: order of records in lazy list (default: 'id')
+
+        Domain is dropped when records are added to or removed from list.
     """
-    __slots__ = ('_object', '_cache', '_lcache', '_records')
+    __slots__ = ('_object', '_cache', '_lcache', '_record_list',
+                 '_domain', '_order', '_pending', '_lazy_fields', '_count')
+
+    #: Number of IDs to search by single call for lazy lists
+    lazy_page_size = 1000
 
-    def __init__(self, obj, ids=None, fields=None, cache=None, context=None):
+    def __init__(self, obj, ids=None, fields=None, cache=None, context=None,
+                 domain=None, order=None):
         """
         """
         self._object = obj
         self._cache = empty_cache(obj.client) if cache is None else cache
         self._lcache = self._cache[obj.name]
+        self._domain = None if domain is None else list(domain)
+        self._order = order
+
+        # Lazy list: ids will be searched on demand
+        self._pending = domain is not None and ids is None
+        self._lazy_fields = fields if self._pending else None
+
+        # Memoized number of records of lazy list (see *length*)
+        self._count = None
 
         if context is not None:
             self._lcache.update_context(context)
 
         ids = [] if ids is None else ids
 
-        # We need to add these ids to cache to make prefetching and data
-        # reading work correctly. if some of ids will not be present in cache,
-        # then, on access to field of record with such id, data will not be
-        # read from database.
+        # *get_records* adds these ids to cache, which is required to make
+        # prefetching and data reading work correctly. if some of ids will
+        # not be present in cache, then, on access to field of record with
+        # such id, data will not be read from database.
         # Look into *Record._get_field* method for more info
-        self._lcache.update_keys(ids)
-
-        _cache = self._cache  # before loop, save cache in separate variable
-        self._records = [get_record(obj, id_, cache=_cache)
-                         for id_ in ids]
+        self._record_list = get_records(obj, ids, cache=self._cache)
 
         # if there some fields prefetching was requested, do it
-        if fields is not None:
+        if fields is not None and not self._pending:
             self.prefetch(*fields)
 
+    @property
+    def _records(self):
+        """ List of records. For lazy lists all pending IDs are loaded
+        """
+        while self._pending:
+            self._load_page()
+        return self._record_list
+
+    @_records.setter
+    def _records(self, records):
+        self._record_list = records
+
+    def _load_page(self):
+        """ Search next page of IDs for lazy (domain-based) list.
+
+            :return: number of records loaded
+        """
+        ids = self._object.search(self._domain,
+                                  offset=len(self._record_list) or None,
+                                  limit=self.lazy_page_size,
+                                  order=self._order or 'id',
+                                  context=self.context)
+        if len(ids) < self.lazy_page_size:
+            self._pending = False
+
+        self._record_list.extend(
+            get_records(self._object, ids, cache=self._cache))
+
+        if ids and self._lazy_fields:
+            self.prefetch(*self._lazy_fields)
+        return len(ids)
+
+    def _iter_lazy(self):
+        """ Iterate over records of lazy list, loading them page by page
+        """
+        index = 0
+        while True:
+            records = self._record_list
+            while index < len(records):
+                yield records[index]
+                index += 1
+
+            if not self._pending or not self._load_page():
+                return
+
+    @property
+    def domain(self):
+        """ Domain records of this list are matched by (if any).
+            For lists, that are not based on domain, returns None
+        """
+        return None if self._domain is None else list(self._domain)
+
+    def _get_search_domain(self):
+        """ Domain, that selects records of this list
+        """
+        if self._domain is not None:
+            return list(self._domain)
+        return [('id', 'in', self.ids)]
+
     def __dir__(self):
         res = super(RecordList, self).__dir__()
         res.extend(self._object.stdcall_methods)
@@ -539,8 +756,17 @@ class RecordList(six.with_metaclass(RecordListMeta,
     @property
     def length(self):
         """ Returns length of this record list
+
+            For lazy lists, which IDs are not loaded yet,
+            number of records is computed on server (via *search_count*)
+            once, and memoized until list is changed or refreshed
         """
-        return len(self._records)
+        if self._pending:
+            if self._count is None:
+                self._count = self._object.search_count(
+                    self._domain, context=self.context)
+            return self._count
+        return len(self._record_list)
 
     def _new_context(self, new_context=None):
         """ Create new context which is combination of *self.context*
@@ -567,25 +793,46 @@ class RecordList(six.with_metaclass(RecordListMeta,
             return get_record_list(self.object,
                                    ids=[r.id for r in self._records[index]],
                                    cache=self._cache)
+
+        # For lazy lists load only pages needed to get item
+        if isinstance(index, numbers.Integral) and index >= 0:
+            while self._pending and index >= len(self._record_list):
+                if not self._load_page():
+                    break
+            return self._record_list[index]
         return self._records[index]
 
     def __setitem__(self, index, value):
         if isinstance(value, Record):
             self._records[index] = value
+            self._domain = None
+            self._count = None
         else:
             raise ValueError("In 'RecordList[index] = value' operation, "
                              "value must be instance of Record")
 
     def __delitem__(self, index):
         del self._records[index]
+        self._domain = None
+        self._count = None
 
     def __iter__(self):
-        return iter(self._records)
+        if self._pending:
+            return self._iter_lazy()
+        return iter(self._record_list)
 
     def __len__(self):
         return self.length
 
     def __contains__(self, item):
+        if self._pending:
+            # check on server instead of loading all IDs
+            if isinstance(item, Record) and item._object == self._object:
+                item = item.id
+            if isinstance(item, numbers.Integral):
+                return bool(self._object.search_count(
+                    self._domain + [('id', '=', item)],
+                    context=self.context))
         if isinstance(item, numbers.Integral):
             return item in self.ids
         if isinstance(item, Record):
@@ -627,10 +874,16 @@ class RecordList(six.with_metaclass(RecordListMeta,
         else:
             self._records.insert(index, self._object.read_records(
                 item, cache=self._cache))
+        self._domain = None
+        self._count = None
         return self
 
     # Overridden to make ability to call methods of object on list of IDs
-    # present in this RecordList
+    # present in this RecordList.
+    # Note, that for lazy (domain-based) lists all IDs are loaded (page by
+    # page) and sent to server, because such methods (write, unlink, etc)
+    # accept only IDs. Methods, that accept domain (search, search_count,
+    # search_read, read_group) are overridden below to pass domain instead
     def __getattr__(self, name):
         method = getattr(self.object, name)
         kwargs = {} if self.context is None else {'context': self.context}
@@ -650,24 +903,166 @@ class RecordList(six.with_metaclass(RecordListMeta,
            :returns: self
            :rtype: instance of RecordList
         """
-        for record in self.records:
-            record.refresh()
+        self._count = None
+        self._lcache.refresh_ids(self.ids)
         return self
 
+    def _get_field_type(self, field):
+        """ Returns type of field or None if there is no such field
+        """
+        if field == 'id':
+            return 'integer'
+        return self._object.columns_info.get(field, {}).get('type', None)
+
+    def _get_cached_values(self, field, fetch=False):
+        """ Returns list of raw values of *field* (as they are stored
+            in cache) for each record in this list, or None if
+            value of field is not cached for some records.
+
+            Used to compute filter, sort and group_by results without
+            accessing each record's fields.
+
+            :param bool fetch: if True, then values missing in cache are
+                               prefetched first (so None is returned only
+                               if records of list use different caches)
+        """
+        if field == 'id':
+            return self.ids
+
+        try:
+            return [record._lcache[record._id][field]
+                    for record in self._records]
+        except KeyError:
+            if not fetch:
+                return None
+        self.prefetch(field)
+        return self._get_cached_values(field)
+
+    def _get_many2one_names(self, field, values):
+        """ Returns list of names of records referenced by raw *values*
+            of many2one *field* (False for empty values).
+
+            Values cached as ``[id, name]`` already contain name.
+            For values cached as bare IDs (for example by *create_many*
+            or compact cache) names are taken from cache of related
+            model, or read by single *name_get* call.
+        """
+        rel_obj = self._object.client[
+            self._object.columns_info[field]['relation']]
+        rcache = self._cache[rel_obj.name]
+        to_read = set(v for v in values
+                      if v and not isinstance(v, (list, tuple)) and
+                      '__name_get_result' not in rcache[v])
+        if to_read:
+            for rid, name in rel_obj.name_get(sorted(to_read)):
+                rcache[rid]['__name_get_result'] = name
+
+        return [False if not v else
+                v[1] if isinstance(v, (list, tuple)) else
+                rcache[v]['__name_get_result']
+                for v in values]
+
+    def _fast_sort_keys(self, key):
+        """ Returns list of pairs *(is_empty, sort_key)* computed on cached
+            data, or None if fast path is not applicable for *key*.
+
+            Values of field missing in cache are prefetched first,
+            so result does not depend on state of cache.
+        """
+        simple = _parse_simple_key(key)
+        if simple is None or simple[1] is not None:
+            return None
+
+        field = simple[0]
+        ftype = self._get_field_type(field)
+        if ftype is None or ftype in ('one2many', 'many2many'):
+            return None
+
+        values = self._get_cached_values(field, fetch=True)
+        if values is None:
+            return None
+
+        if ftype == 'many2one':
+            return [(False, name) if name is not False else (True, None)
+                    for name in self._get_many2one_names(field, values)]
+        if ftype in ('integer', 'float', 'monetary', 'boolean'):
+            return [(False, v) for v in values]
+        return [(v is False, v) for v in values]
+
     def sort(self, key=None, reverse=False):
         """ sort(key=None, reverse=False) -- inplace sort
 
             anyfield.SField instances may be safely passed as 'key' arguments.
             no need to convert them to function explicitly
 
+            If key is field name or simple SField (like ``F.name``),
+            then values of this field are prefetched (if they are not
+            cached yet) and sorting is done directly on cached data.
+            In this case, empty values are always placed after non-empty
+            ones (also when *reverse* is True), and many2one fields are
+            sorted by name of related record.
+
+            Other keys (callables, complex SFields) are applied
+            to records as is.
+
             :return: self
         """
-        if callable(key):
+        if key is not None:
+            keys = self._fast_sort_keys(key)
+            if keys is not None:
+                records = self._records
+                indexes = six.moves.range(len(keys))
+                filled = sorted((i for i in indexes if not keys[i][0]),
+                                key=lambda i: keys[i][1],
+                                reverse=reverse)
+                empty = [i for i in indexes if keys[i][0]]
+                self._records[:] = [records[i] for i in filled + empty]
+                return self
+
+        if isinstance(key, six.string_types):
+            key = operator.itemgetter(key)
+        elif callable(key):
             key = normalizeSField(key)
 
         self._records.sort(key=key, reverse=reverse)
         return self
 
+    def _fast_group_by(self, grouper):
+        """ Groups records by values of field in cache.
+            Returns list of pairs *(key, records)* or None
+            if fast path is not applicable for *grouper*
+        """
+        simple = _parse_simple_key(grouper)
+        if simple is None or simple[1] is not None:
+            return None
+
+        field = simple[0]
+        ftype = self._get_field_type(field)
+        if ftype is None or ftype in ('one2many', 'many2many'):
+            return None
+
+        values = self._get_cached_values(field, fetch=True)
+        if values is None:
+            return None
+
+        if ftype != 'many2one':
+            groups = collections.OrderedDict()
+            for record, value in zip(self._records, values):
+                groups.setdefault(value, []).append(record)
+            return list(groups.items())
+
+        groups = collections.OrderedDict()
+        for record, value in zip(self._records, values):
+            if value and isinstance(value, (list, tuple)):
+                value = value[0]
+            groups.setdefault(value or False, []).append(record)
+
+        rel_obj = self._object.client[
+            self._object.columns_info[field]['relation']]
+        return [(get_record(rel_obj, rid, cache=self._cache,
+                            context=self.context) if rid else False, records)
+                for rid, records in groups.items()]
+
     def group_by(self, grouper):
         """ Groups all records in list by specifed grouper.
 
@@ -708,15 +1103,25 @@ class RecordList(six.with_metaclass(RecordListMeta,
                   # Print state and amount of items with such state
                   print letter, rlist.length
 
+            If grouper is field name or simple SField (like ``F.state``),
+            then values of this field are prefetched (if they are not
+            cached yet) and records are grouped directly by cached data.
         """
-        if callable(grouper):
-            grouper = normalizeSField(grouper)
-
         cls_init = functools.partial(get_record_list,
                                      self.object,
                                      ids=[],
                                      cache=self._cache)
         res = collections.defaultdict(cls_init)
+
+        groups = self._fast_group_by(grouper)
+        if groups is not None:
+            for key, records in groups:
+                res[key].records.extend(records)
+            return res
+
+        if callable(grouper):
+            grouper = normalizeSField(grouper)
+
         for record in self.records:
             if isinstance(grouper, six.string_types):
                 key = record[grouper]
@@ -726,18 +1131,62 @@ class RecordList(six.with_metaclass(RecordListMeta,
             res[key].append(record)
         return res
 
+    def _fast_filter(self, func):
+        """ Returns IDs of records, that match *func* computed on cached
+            data, or None if fast path is not applicable for *func*
+        """
+        simple = _parse_simple_key(func)
+        if simple is None:
+            return None
+
+        field, op, arg = simple
+        ftype = self._get_field_type(field)
+        if ftype is None:
+            return None
+
+        # Relational fields could be checked only for emptiness
+        if op not in (None, operator.not_) and \
+                ftype in ('many2one', 'one2many', 'many2many'):
+            return None
+
+        values = self._get_cached_values(field, fetch=True)
+        if values is None:
+            return None
+
+        if op is None:
+            check = bool
+        elif op is operator.not_:
+            check = op
+        else:
+            check = functools.partial(lambda o, a, v: o(v, a), op, arg)
+
+        return [record._id
+                for record, value in zip(self._records, values)
+                if check(value)]
+
     def filter(self, func):
         """ Filters items using *func*.
 
+            If *func* is field name or simple SField (like ``F.active`` or
+            ``F.state == 'done'``), then values of this field are
+            prefetched (if they are not cached yet) and filtering is done
+            directly on cached data.
+
             :param func: callable to check if record should be included
                          in result.
-            :type func: callable(record)->bool|anyfield.SField
+            :type func: callable(record)->bool|anyfield.SField|str
             :return: RecordList which contains records that matches results
             :rtype: RecordList
         """
-        func = normalizeSField(func)
+        ids = self._fast_filter(func)
+        if ids is None:
+            if isinstance(func, six.string_types):
+                func = operator.itemgetter(func)
+            else:
+                func = normalizeSField(func)
+            ids = [r.id for r in self.records if func(r)]
         return get_record_list(self.object,
-                               ids=[r.id for r in self.records if func(r)],
+                               ids=ids,
                                cache=self._cache)
 
     def mapped(self, field):
@@ -824,10 +1273,20 @@ class RecordList(six.with_metaclass(RecordListMeta,
             raise ValueError("Wrong value for parametr 'new_cache': %r"
                              "" % (new_cache,))
 
+        if self._pending:
+            # keep copy of lazy list lazy
+            return get_record_list(self.object,
+                                   cache=cache,
+                                   context=context,
+                                   domain=self._domain,
+                                   order=self._order)
+
         return get_record_list(self.object,
                                ids=self.ids,
                                cache=cache,
-                               context=context)
+                               context=context,
+                               domain=self._domain,
+                               order=self._order)
 
     def existing(self, uniqify=True):
         """ Filters this list with only existing items
@@ -870,6 +1329,7 @@ class RecordList(six.with_metaclass(RecordListMeta,
     # remote method overrides
     def search(self, domain, *args, **kwargs):
         """ Performs normal search, but adds ``('id', 'in', self.ids)``
+            (or domain of this list, if it is domain-based)
             to search domain
 
             :returns: list of IDs found
@@ -880,13 +1340,14 @@ class RecordList(six.with_metaclass(RecordListMeta,
         if ctx is not None:
             kwargs['context'] = ctx
 
-        return self.object.search([('id', 'in', self.ids)] + domain,
+        return self.object.search(self._get_search_domain() + domain,
                                   *args,
                                   **kwargs)
 
     def search_records(self, domain, *args, **kwargs):
         """ Performs normal search_records, but adds
             ``('id', 'in', self.ids)`` to domain
+            (or domain of this list, if it is domain-based)
 
             :returns: RecordList of records found
             :rtype: RecordList instance
@@ -896,10 +1357,80 @@ class RecordList(six.with_metaclass(RecordListMeta,
         if ctx is not None:
             kwargs['context'] = ctx
 
-        return self.object.search_records([('id', 'in', self.ids)] + domain,
+        return self.object.search_records(self._get_search_domain() + domain,
                                           *args,
                                           **kwargs)
 
+    def search_count(self, domain=None, context=None):
+        """ Count records of this list, that match *domain*
+
+            :return: number of records
+            :rtype: int
+        """
+        return self.object.search_count(
+            self._get_search_domain() + (domain or []),
+            context=self._new_context(context))
+
+    def search_read(self, domain=None, fields=None, *args, **kwargs):
+        """ Performs normal search_read, but adds
+            ``('id', 'in', self.ids)`` to domain
+            (or domain of this list, if it is domain-based)
+
+            :return: list of dictionaries with data had been read
+            :rtype: list
+        """
+        kwargs['context'] = self._new_context(kwargs.get('context', None))
+        return self.object.search_read(
+            self._get_search_domain() + (domain or []), fields,
+            *args, **kwargs)
+
+    def read_group(self, domain, fields, groupby, *args, **kwargs):
+        """ Performs normal read_group, but adds
+            ``('id', 'in', self.ids)`` to domain
+            (or domain of this list, if it is domain-based)
+
+            :return: list of dictionaries with grouped data
+            :rtype: list
+        """
+        kwargs['context'] = self._new_context(kwargs.get('context', None))
+        return self.object.read_group(
+            self._get_search_domain() + (domain or []), fields, groupby,
+            *args, **kwargs)
+
+    def filtered_domain(self, domain):
+        """ Filter records of this list by *domain* on client side.
+
+            Unlike *search* and *search_records* methods, this method
+            does not send IDs of records to server. Domain is evaluated on
+            cached data, and values of fields used in domain, that are not
+            cached yet, are prefetched in batches. Thus repeated filtering
+            of same list costs no extra calls to server.
+
+            Order of records is preserved.
+
+            :param list domain: Odoo domain to filter records by.
+                                Look at *odoo_rpc_client.orm.domain.DomainEvaluator*
+                                for list of supported operators
+            :return: RecordList with records, that match domain
+            :rtype: RecordList
+
+            For example:
+
+            .. code:: python
+
+                >>> partners = db['res.partner'].search_records([])
+                >>> companies = partners.filtered_domain(
+                ...     [('is_company', '=', True)])
+                >>> us_companies = companies.filtered_domain(
+                ...     [('country_id.code', '=', 'US')])
+        """  # noqa
+        matched = DomainEvaluator(self._cache).filter_ids(
+            self.object, self.ids, domain)
+        return get_record_list(self.object,
+                               ids=[r.id for r in self._records
+                                    if r.id in matched],
+                               cache=self._cache)
+
     def read(self, fields=None, context=None):
         """ Read wrapper. Takes care about adding RecordList's context to
             object's read method.
@@ -910,6 +1441,149 @@ class RecordList(six.with_metaclass(RecordListMeta,
         args, kwargs = preprocess_args(fields, context=ctx)
         return self.object.read(self.ids, *args, **kwargs)
 
+    def to_columns(self, fields, page_size=1000, output='numpy'):
+        """ Read *fields* of records in this list into columns.
+
+            Data is read from server by pages of *page_size* records
+            and appended directly to typed column buffers, so
+            memory usage stays close to size of result.
+            Cache of this list is not used and not updated.
+
+            Many2one fields are split into two columns:
+            ``<field>/.id`` (ID of related record) and
+            ``<field>`` (name of related record).
+
+            :param list fields: list of field names to read
+            :param int page_size: number of records to read by single call
+            :param str output: format of result: 'numpy' (default),
+                               'pandas', 'arrow' or 'array'
+                               (look at
+                               *odoo_rpc_client.orm.frame.convert_columns*)
+            :return: columns of data in requested format
+
+            For example:
+
+            .. code:: python
+
+                >>> orders = db['sale.order'].search_records([])
+                >>> df = orders.to_columns(['partner_id', 'amount_total'],
+                ...                        output='pandas')
+        """
+        columns = read_columns(self.object, self.ids, fields,
+                               page_size=page_size,
+                               context=self.context)
+        return convert_columns(columns, output)
+
+
+@six.python_2_unicode_compatible
+class RecordGroup(DirMixIn):
+    """ Group of records, result of *read_group* call.
+        Use *ObjectRecords.group_records* method to get instances
+        of this class.
+
+        Provides access to aggregated values of group via dictionary syntax,
+        and lazy access to records of group via *records* property.
+
+        :param Object obj: instance of Object this group is related to
+        :param dict data: data of group, returned by *read_group*
+        :param list groupby: list of fields records are grouped by
+        :param list fields: list of fields that was aggregated
+        :param Cache cache: cache to be used for records of group
+        :param dict context: context to be used to fetch records of group
+    """
+
+    def __init__(self, obj, data, groupby, fields, cache=None, context=None):
+        self._object = obj
+        self._data = data
+        self._groupby = groupby
+        self._fields = fields
+        self._cache = empty_cache(obj.client) if cache is None else cache
+        self._context = context
+        self._records = None
+
+    @property
+    def object(self):
+        """ Object this group is related to
+        """
+        return self._object
+
+    @property
+    def data(self):
+        """ Raw data of group (as returned by *read_group*)
+
+            :rtype: dict
+        """
+        return self._data
+
+    @property
+    def key(self):
+        """ Value of field records are grouped by.
+            If records are grouped by few fields,
+            then tuple of values is returned
+        """
+        if len(self._groupby) == 1:
+            return self._data[self._groupby[0]]
+        return tuple(self._data[g] for g in self._groupby)
+
+    @property
+    def domain(self):
+        """ Domain to search records of this group
+        """
+        return self._data.get('__domain', [])
+
+    @property
+    def count(self):
+        """ Number of records in this group
+        """
+        if '__count' in self._data:
+            return self._data['__count']
+        return self._data.get(
+            '%s_count' % self._groupby[0].split(':')[0], None)
+
+    @property
+    def records(self):
+        """ Records of this group. Read from server on first access.
+
+            :rtype: RecordList
+        """
+        if self._records is None:
+            self._records = self._object.search_records(
+                self.domain, cache=self._cache, context=self._context)
+        return self._records
+
+    def subgroups(self, fields=None):
+        """ Group records of this group by next level of fields from
+            *groupby* (only for groups read in lazy mode)
+
+            :param list fields: fields to aggregate. if not specified,
+                                then fields of this group will be used
+            :return: list of subgroups
+            :rtype: list of RecordGroup
+        """
+        groupby = self._data.get('__context', {}).get('group_by', None)
+        if not groupby:
+            return []
+        return self._object.group_records(
+            self.domain,
+            self._fields if fields is None else fields,
+            groupby,
+            context=self._context,
+            cache=self._cache)
+
+    def __getitem__(self, name):
+        return self._data[name]
+
+    def __contains__(self, name):
+        return name in self._data
+
+    def __str__(self):
+        return u"RecordGroup(%s): %s, count=%s" % (self._object.name,
+                                                   ustr(self.key),
+                                                   self.count)
+
+    def __repr__(self):
+        return str(self)
+
 
 class ObjectRecords(Object):
     """ Adds support to use records from Object classes
@@ -919,6 +1593,11 @@ class ObjectRecords(Object):
         super(ObjectRecords, self).__init__(*args, **kwargs)
         self._model = None
 
+        # Record class for this object (memoized by *get_record*)
+        # and generation of Record extensions it was resolved for
+        self._record_class = None
+        self._record_class_generation = None
+
     @property
     def model(self):
         """ Returns Record instance of model related to this object.
@@ -974,6 +1653,13 @@ class ObjectRecords(Object):
             :param read_fields: optional. specifies list of fields to read.
             :type read_fields: list of strings
             :param Cache cache: cache to be used for records and recordlists
+            :param bool lazy: if set to True, then no search performed
+                              immediately. Instead, domain-based RecordList
+                              returned, that searches IDs page by page
+                              when records are accessed, and combines
+                              domains in derived searches.
+                              Only *order* and *context* arguments
+                              are supported in this mode.
             :return: RecordList contains records found, or integer
                      that represents amount of records found (if count=True)
             :rtype: RecordList|int
@@ -991,8 +1677,21 @@ class ObjectRecords(Object):
         # TODO: use search_read for odoo versions >= 8.0
         read_fields = kwargs.pop('read_fields', None)
         cache = kwargs.pop('cache', None)
+        lazy = kwargs.pop('lazy', False)
         context = kwargs.get('context', None)
 
+        if lazy:
+            domain = args[0] if args else kwargs.pop('domain', [])
+            if len(args) > 1 or set(kwargs) - set(['order', 'context']):
+                raise ValueError("Only 'order' and 'context' arguments are "
+                                 "supported for lazy search_records")
+            return get_record_list(self,
+                                   fields=read_fields,
+                                   context=context,
+                                   cache=cache,
+                                   domain=domain,
+                                   order=kwargs.get('order', None))
+
         if kwargs.get('count', False):
             return self.search(*args, **kwargs)
 
@@ -1011,6 +1710,108 @@ class ObjectRecords(Object):
                                      cache=cache)
         return self.read_records(res, context=context, cache=cache)
 
+    def search_frame(self, domain, fields, page_size=1000, output='pandas',
+                     offset=0, limit=None, order=None, context=None):
+        """ Search records and read their *fields* into columnar
+            structure (pandas DataFrame by default).
+
+            No Record instances are created, data is read by pages
+            of *page_size* records directly to typed column buffers.
+
+            :param list domain: search domain
+            :param list fields: list of field names to read
+            :param int page_size: number of records to read by single call
+            :param str output: format of result: 'pandas' (default),
+                               'numpy', 'arrow' or 'array'
+            :param int offset: number of records to skip
+            :param int limit: max number of records to read
+            :param str order: order of records
+            :param dict context: context to search and read data with
+            :return: columns of data in requested format
+
+            For more info look at *RecordList.to_columns*
+        """
+        ids = self.search(domain,
+                          offset=offset or None,
+                          limit=limit,
+                          order=order,
+                          context=context)
+        columns = read_columns(self, ids, fields,
+                               page_size=page_size,
+                               context=context)
+        return convert_columns(columns, output)
+
+    def group_records(self, domain, fields, groupby, offset=0, limit=None,
+                      orderby=None, lazy=True, context=None, cache=None):
+        """ Same as *read_group*, but returns list of RecordGroup instances,
+            that allow to access records of each group.
+
+            Records of groups are fetched only when requested
+            (via *RecordGroup.records* property)
+
+            :param Cache cache: cache to be used for records of groups
+            :return: list of groups
+            :rtype: list of RecordGroup
+
+            For other arguments look at *read_group* method
+
+            For example:
+
+            .. code:: python
+
+                >>> so_obj = db['sale.order']
+                >>> for group in so_obj.group_records(
+                ...         [], ['amount_total'], 'partner_id'):
+                ...     print(group.key, group['amount_total'], group.count)
+        """
+        if isinstance(groupby, six.string_types):
+            groupby = [groupby]
+
+        if lazy or self.client.server_version < parse_version('8.0'):
+            applied_groupby = groupby[:1]
+        else:
+            applied_groupby = groupby
+
+        cache = empty_cache(self.client) if cache is None else cache
+        return [RecordGroup(self, data, applied_groupby, fields,
+                            cache=cache, context=context)
+                for data in self.read_group(domain, fields, groupby,
+                                            offset=offset,
+                                            limit=limit,
+                                            orderby=orderby,
+                                            lazy=lazy,
+                                            context=context)]
+
+    def iter_group_records(self, domain, fields, groupby, page_size=1000,
+                           orderby=None, lazy=True, context=None, cache=None):
+        """ Iterate over groups page by page.
+
+            Same as *group_records*, but requests groups from server
+            by pages of *page_size* groups. Useful for groupings that produce
+            large number of groups.
+
+            :param int page_size: number of groups to fetch by single call
+            :return: generator of RecordGroup instances
+
+            For other arguments look at *group_records* method
+        """
+        cache = empty_cache(self.client) if cache is None else cache
+        offset = 0
+        while True:
+            groups = self.group_records(domain, fields, groupby,
+                                        offset=offset,
+                                        limit=page_size,
+                                        orderby=orderby,
+                                        lazy=lazy,
+                                        context=context,
+                                        cache=cache)
+            for group in groups:
+                yield group
+
+            if len(groups) < page_size:
+                break
+            offset += page_size
+
     def read_records(self, ids, fields=None, context=None, cache=None):
         """ Return instance or RecordList class,
             making available to work with data simpler
@@ -1070,6 +1871,74 @@ class ObjectRecords(Object):
         record_id = self.create(vals, context=context)
         return self.read_records(record_id, context=context, cache=cache)
 
+    def create_many(self, vals_list, chunk_size=100, parallel=None,
+                    context=None, cache=None):
+        """ Create many records at once and return RecordList instance.
+
+            On Odoo 12.0+ records are created by chunks, using single *create*
+            call for each chunk. On older versions, records are created
+            one by one, so in this case it is recommended to use *parallel*
+            argument to speed things up.
+
+            Values passed in *vals_list* are stored in cache of
+            resulting RecordList, so no extra *read* calls are required to
+            access them. Note, that *one2many* and *many2many* values are not
+            cached, because they are passed as list of commands.
+
+            :param vals_list: iterable of dictionaries with values
+                              for new records
+            :param int chunk_size: max number of records to be created
+                                   by single RPC call (Odoo 12.0+) or
+                                   by single worker in parallel mode
+                                   (default: 100)
+            :param int parallel: number of threads to create chunks of
+                                 records concurrently. if not set,
+                                 then records will be created sequentialy
+            :param dict context: extra context to pass to *create* method
+            :param Cache cache: cache to add created records to.
+                                if None is passed, then new cache
+                                will be created.
+            :return: RecordList instance of created records
+                     (in same order as *vals_list*)
+            :rtype: odoo_rpc_client.orm.record.RecordList
+
+            For example:
+
+            .. code:: python
+
+                >>> partner_obj = db['res.partner']
+                >>> partners = partner_obj.create_many(
+                ...     ({'name': 'Partner %s' % i} for i in range(10000)),
+                ...     chunk_size=500, parallel=4)
+                >>> partners[0].name
+                Partner 0
+        """
+        if self.client.server_version >= parse_version('12.0'):
+            def create_chunk(chunk):
+                return chunk, self.create(chunk, context=context)
+        else:
+            def create_chunk(chunk):
+                return chunk, [self.create(vals, context=context)
+                               for vals in chunk]
+
+        cache = empty_cache(self.client) if cache is None else cache
+        lcache = cache[self.name]
+        col_info = self.columns_info
+
+        ids = []
+        for chunk, chunk_ids in parallel_map(create_chunk,
+                                             chunks(vals_list, chunk_size),
+                                             workers=parallel):
+            ids.extend(chunk_ids)
+            for rid, vals in zip(chunk_ids, chunk):
+                for field, value in six.iteritems(vals):
+                    ftype = col_info.get(field, {}).get('type', None)
+                    if ftype is None or ftype in ('one2many', 'many2many'):
+                        continue
+                    lcache.cache_field(rid, ftype, field, value)
+
+        return get_record_list(self, ids, cache=cache, context=context)
+
     def browse(self, *args, **kwargs):
         """ Aliase to *read_records* method.
             In most cases same as serverside *browse*
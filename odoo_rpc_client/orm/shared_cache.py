@@ -0,0 +1,424 @@
+# -*- coding: utf-8 -*-
+# Copyright © 2014-2018 Dmytro Katyukha <dmytro.katyukha@gmail.com>
+
+#######################################################################
+# This Source Code Form is subject to the terms of the Mozilla Public #
+# License, v. 2.0. If a copy of the MPL was not distributed with this #
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.            #
+#######################################################################
+
+""" Cache backed by memory-mapped snapshot file.
+
+Snapshot of cache could be saved to file by one process (usualy parent
+process, after prefetching reference data) and then opened by other
+processes (for example forked workers). Snapshot file is memory-mapped,
+so its pages are shared between processes by operating system.
+
+Data of records is not copied into processes: records are represented
+by read-only views (*SnapshotRow*) over mapped file, and value of field
+is decoded only when it is accessed (and is not kept by view).
+Values written by process (or cleaned by *refresh*) are kept in small
+per-record overlay, private for process (copy-on-write).
+
+Example::
+
+    from odoo_rpc_client.orm.shared_cache import dump_cache, SharedCache
+
+    # in parent process
+    products = client['product.product'].search_records(
+        [], read_fields=['name', 'default_code', 'uom_id'])
+    dump_cache(products._cache, '/tmp/products.cache')
+
+    # in worker process
+    cache = SharedCache(client, '/tmp/products.cache')
+    products = client['product.product'].read_records(ids, cache=cache)
+    products[0].name  # no RPC here
+
+Snapshot layout (columnar, per model):
+
+- header: magic bytes and offset of index
+- for each model and field: serialized (via *marshal*) values of field
+  in order of rows, followed by array of offsets of values
+  (``nrows + 1`` items; empty range means, that record has no value
+  for field)
+- for each model: sorted array of record IDs (row number is position
+  of ID in this array)
+- index: ``{model: (nrows, ids offset, {field: offsets offset})}``
+
+Arrays are accessed directly in mapped file, so only index is loaded
+into memory of process.
+
+Note, that snapshot files are readable only by same version of Python
+they were written by.
+"""
+
+import os
+import six
+import mmap
+import array
+import struct
+import bisect
+import marshal
+
+from six.moves import collections_abc
+
+from .cache import (Cache,
+                    ObjectCache)
+from ..utils import INT_TYPECODE
+
+__all__ = (
+    'dump_cache',
+    'CacheSnapshot',
+    'SnapshotRow',
+    'SharedCache',
+    'SharedObjectCache',
+)
+
+
+SNAPSHOT_MAGIC = b'ORPCSC02'
+_HEADER = struct.Struct('<Q')
+_INT = struct.Struct(INT_TYPECODE)
+
+
+def _array_to_bytes(arr):
+    return arr.tobytes() if six.PY3 else arr.tostring()
+
+
+class _MappedArray(object):
+    """ Read-only sequence of integers stored in mapped file.
+        Items are unpacked on access, so nothing is copied.
+    """
+    __slots__ = ('_buf', '_offset', '_len')
+
+    def __init__(self, buf, offset, length):
+        self._buf = buf
+        self._offset = offset
+        self._len = length
+
+    def __len__(self):
+        return self._len
+
+    def __getitem__(self, index):
+        if not 0 <= index < self._len:
+            raise IndexError(index)
+        return _INT.unpack_from(self._buf,
+                                self._offset + index * _INT.size)[0]
+
+    def __iter__(self):
+        for index in six.moves.range(self._len):
+            yield self[index]
+
+
+def dump_cache(cache, path, models=None):
+    """ Save snapshot of cache to file
+
+        Only records, that have some fields cached are saved.
+        File is written atomically (to temporary file, which then
+        renamed to *path*)
+
+        :param Cache cache: cache to save
+        :param str path: path to file to save snapshot to
+        :param list models: list of names of models to save.
+                            by default all models are saved
+        :return: path to saved snapshot
+    """
+    tmp_path = '%s.tmp.%s' % (path, os.getpid())
+    index = {}
+    with open(tmp_path, 'wb') as f:
+        f.write(SNAPSHOT_MAGIC)
+        f.write(_HEADER.pack(0))
+
+        for model, obj_cache in six.iteritems(cache):
+            if models is not None and model not in models:
+                continue
+
+            records = sorted((rid, data)
+                             for rid, data in six.iteritems(obj_cache)
+                             if len(data) > 1)
+            fields = set()
+            for __, data in records:
+                fields.update(data)
+            fields.discard('id')
+
+            field_offsets = {}
+            for field in sorted(fields):
+                offsets = array.array(INT_TYPECODE, [f.tell()])
+                for __, data in records:
+                    if field in data:
+                        f.write(marshal.dumps(data[field]))
+                    offsets.append(f.tell())
+                field_offsets[field] = f.tell()
+                f.write(_array_to_bytes(offsets))
+
+            ids_offset = f.tell()
+            f.write(_array_to_bytes(
+                array.array(INT_TYPECODE, [rid for rid, __ in records])))
+            index[model] = (len(records), ids_offset, field_offsets)
+
+        index_offset = f.tell()
+        f.write(marshal.dumps(index))
+        f.seek(len(SNAPSHOT_MAGIC))
+        f.write(_HEADER.pack(index_offset))
+
+    if os.name == 'nt' and os.path.exists(path):  # pragma: no cover
+        os.remove(path)
+    os.rename(tmp_path, path)
+    return path
+
+
+class CacheSnapshot(object):
+    """ Read-only access to cache snapshot saved by *dump_cache*
+
+        :param str path: path to snapshot file
+    """
+
+    def __init__(self, path):
+        self._path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        header_size = len(SNAPSHOT_MAGIC) + _HEADER.size
+        if self._mmap[:len(SNAPSHOT_MAGIC)] != SNAPSHOT_MAGIC:
+            self._mmap.close()
+            raise ValueError("File %s is not cache snapshot" % path)
+
+        index_offset, = _HEADER.unpack(
+            self._mmap[len(SNAPSHOT_MAGIC):header_size])
+        index = marshal.loads(self._mmap[index_offset:])
+
+        # model -> (ids, {field: offsets})
+        self._index = dict(
+            (model, (_MappedArray(self._mmap, ids_offset, nrows),
+                     dict((field, _MappedArray(self._mmap, offset,
+                                               nrows + 1))
+                          for field, offset in six.iteritems(fields))))
+            for model, (nrows, ids_offset, fields) in six.iteritems(index))
+
+    @property
+    def path(self):
+        """ Path to snapshot file
+        """
+        return self._path
+
+    @property
+    def models(self):
+        """ List of names of models present in snapshot
+        """
+        return list(self._index)
+
+    def get_ids(self, model):
+        """ Returns list of IDs of records of *model* saved in snapshot
+        """
+        if model not in self._index:
+            return []
+        return list(self._index[model][0])
+
+    def get_fields(self, model):
+        """ Returns list of fields of *model* saved in snapshot
+        """
+        if model not in self._index:
+            return []
+        return list(self._index[model][1])
+
+    def get_row(self, model, rid):
+        """ Returns row number of record with ID *rid* of *model*
+            or None, if record is not present in snapshot
+        """
+        if model not in self._index:
+            return None
+        ids = self._index[model][0]
+        pos = bisect.bisect_left(ids, rid)
+        if pos >= len(ids) or ids[pos] != rid:
+            return None
+        return pos
+
+    def _get_range(self, model, row, field):
+        offsets = self._index[model][1].get(field, None)
+        if offsets is None:
+            return None
+        start, end = offsets[row], offsets[row + 1]
+        return (start, end) if end > start else None
+
+    def has_value(self, model, row, field):
+        """ Check if value of *field* is saved for record in *row*
+        """
+        return self._get_range(model, row, field) is not None
+
+    def get_value(self, model, row, field):
+        """ Decode value of *field* for record in *row*
+
+            :raises KeyError: if there is no value saved for field
+        """
+        rng = self._get_range(model, row, field)
+        if rng is None:
+            raise KeyError(field)
+        return marshal.loads(self._mmap[rng[0]:rng[1]])
+
+    def get(self, model, rid):
+        """ Decode data of record with ID *rid* of *model*
+
+            :return: dictionary with data of record or None,
+                     if record is not present in snapshot
+        """
+        row = self.get_row(model, rid)
+        if row is None:
+            return None
+        data = {'id': rid}
+        for field in self._index[model][1]:
+            if self.has_value(model, row, field):
+                data[field] = self.get_value(model, row, field)
+        return data
+
+    def close(self):
+        """ Close snapshot (unmap file)
+        """
+        self._mmap.close()
+
+
+class SnapshotRow(collections_abc.MutableMapping):
+    """ Data of single record, saved in snapshot.
+
+        Values are decoded from snapshot on each access, so they are not
+        copied into memory of process. Changes (set or deleted values,
+        *clear* on refresh) are kept in private overlay of this row,
+        snapshot itself is never changed.
+    """
+    __slots__ = ('_snapshot', '_model', '_id', '_row', '_local', '_hidden')
+
+    def __init__(self, snapshot, model, rid, row):
+        self._snapshot = snapshot
+        self._model = model
+        self._id = rid
+        self._row = row
+        # values set in this process
+        self._local = None
+        # fields of snapshot deleted in this process
+        # (True means, that all fields are deleted)
+        self._hidden = None
+
+    def _in_snapshot(self, key):
+        hidden = self._hidden
+        if hidden is True or (hidden is not None and key in hidden):
+            return False
+        return self._snapshot.has_value(self._model, self._row, key)
+
+    def __getitem__(self, key):
+        if key == 'id':
+            return self._id
+        if self._local is not None and key in self._local:
+            return self._local[key]
+        if not self._in_snapshot(key):
+            raise KeyError(key)
+        return self._snapshot.get_value(self._model, self._row, key)
+
+    def __setitem__(self, key, value):
+        if key == 'id':
+            if value != self._id:
+                raise ValueError("ID of cached record could not be changed")
+            return
+        if self._local is None:
+            self._local = {}
+        self._local[key] = value
+
+    def __delitem__(self, key):
+        if key == 'id':
+            raise KeyError(key)
+        found = False
+        if self._local is not None and key in self._local:
+            del self._local[key]
+            found = True
+        if self._in_snapshot(key):
+            if self._hidden is None:
+                self._hidden = set()
+            self._hidden.add(key)
+            found = True
+        if not found:
+            raise KeyError(key)
+
+    def __contains__(self, key):
+        return (key == 'id' or
+                (self._local is not None and key in self._local) or
+                self._in_snapshot(key))
+
+    def __iter__(self):
+        yield 'id'
+        local = self._local or {}
+        for key in local:
+            yield key
+        for key in self._snapshot.get_fields(self._model):
+            if key not in local and self._in_snapshot(key):
+                yield key
+
+    def __len__(self):
+        return sum(1 for __ in self)
+
+    def clear(self):
+        """ Remove all cached values of record, except ID
+        """
+        self._local = None
+        self._hidden = True
+
+    def copy(self):
+        """ Returns data of record as dictionary
+        """
+        return dict(self)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+class SharedObjectCache(ObjectCache):
+    """ Object cache, that takes data of records from snapshot.
+
+        Records present in snapshot are represented by *SnapshotRow*
+        views, so their data is read directly from mapped file.
+        Other records are stored in usual dictionaries.
+    """
+    __slots__ = ('_snapshot',)
+
+    def __init__(self, root, obj, *args, **kwargs):
+        self._snapshot = kwargs.pop('snapshot')
+        super(SharedObjectCache, self).__init__(root, obj, *args, **kwargs)
+
+    def __missing__(self, key):
+        model = self._object.name
+        row = self._snapshot.get_row(model, key)
+        if row is None:
+            return self.setdefault(key, {'id': key})
+        return self.setdefault(
+            key, SnapshotRow(self._snapshot, model, key, row))
+
+    def update_keys(self, keys):
+        for key in keys:
+            if key not in self:
+                self.__missing__(key)
+        return self
+
+
+class SharedCache(Cache):
+    """ Cache, that uses snapshot saved by *dump_cache* as source of data.
+
+        Data present in snapshot will be used without RPC calls,
+        and data missing in snapshot will be read from server as usual.
+
+        :param Client client: instance of Client to create cache for
+        :param snapshot: path to snapshot file or *CacheSnapshot* instance
+    """
+    __slots__ = ('_snapshot',)
+
+    def __init__(self, client, snapshot, *args, **kwargs):
+        if not isinstance(snapshot, CacheSnapshot):
+            snapshot = CacheSnapshot(snapshot)
+        self._snapshot = snapshot
+        super(SharedCache, self).__init__(client, *args, **kwargs)
+
+    @property
+    def snapshot(self):
+        """ Snapshot used by this cache
+
+            :rtype: CacheSnapshot
+        """
+        return self._snapshot
+
+    def _create_object_cache(self, obj):
+        return SharedObjectCache(self, obj, snapshot=self._snapshot)
@@ -0,0 +1,272 @@
+# -*- coding: utf-8 -*-
+# Copyright © 2014-2018 Dmytro Katyukha <dmytro.katyukha@gmail.com>
+
+#######################################################################
+# This Source Code Form is subject to the terms of the Mozilla Public #
+# License, v. 2.0. If a copy of the MPL was not distributed with this #
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.            #
+#######################################################################
+
+""" Bulk import of data via model's *load* method.
+
+*load* method is the same method used by Odoo's import wizard,
+so it handles external IDs (``id`` column and ``<field>/id`` columns),
+one2many subrecords and type conversions on server side.
+
+Example::
+
+    import odoo_rpc_client.plugins.bulk_import  # noqa
+
+    res = client.plugins.bulk_import.load_csv(
+        'res.partner', 'partners.csv', chunk_size=1000, parallel=4)
+    print("%s rows imported (%.1f rows/sec)" % (res.rows,
+                                               res.rows_per_second))
+    for error in res.errors:
+        print("row %(row)s: %(message)s" % error)
+"""
+
+import io
+import csv
+import time
+import six
+
+from ..plugin import Plugin
+from ..exceptions import Error
+from ..utils import (AttrDict,
+                     ustr,
+                     parallel_map)
+
+
+__all__ = ('BulkImport', 'ImportResult')
+
+
+@six.python_2_unicode_compatible
+class ImportResult(object):
+    """ Result of bulk import
+
+        Contains IDs of imported records, lists of errors and warnings
+        and some statistics.
+
+        Each error (or warning) is *AttrDict* with following keys:
+
+        - ``row``: index of first row (in rows passed to import)
+          error is related to
+        - ``row_to``: index of last row error is related to
+        - ``type``: type of message (usualy *'error'*)
+        - ``message``: error message
+        - ``field``: name of field error is related to (or None)
+
+        *errors* contains only messages of type *'error'*, all other
+        messages returned by *load* (for example *'warning'*) are placed
+        to *warnings*, and do not make import unsuccessful.
+
+        *failed_rows* is number of rows in chunks rejected by server.
+    """
+
+    def __init__(self):
+        self.ids = []
+        self.errors = []
+        self.warnings = []
+        self.rows = 0
+        self.failed_rows = 0
+        self.elapsed = 0.0
+
+    @property
+    def rows_per_second(self):
+        """ Import speed in rows per second
+
+            :rtype: float
+        """
+        if not self.elapsed:
+            return 0.0
+        return self.rows / self.elapsed
+
+    @property
+    def success(self):
+        """ True if there were no errors during import
+        """
+        return not self.errors
+
+    def __str__(self):
+        return (u"ImportResult: rows=%s, records=%s, errors=%s, "
+                u"warnings=%s, speed=%.1f rows/sec" % (
+                    self.rows,
+                    len(self.ids),
+                    len(self.errors),
+                    len(self.warnings),
+                    self.rows_per_second))
+
+    def __repr__(self):
+        return str(self)
+
+
+def _is_main_field(field):
+    """ Check if field (in *load* format) belongs to main record,
+        not to one2many subrecord.
+
+        For example: ``name``, ``id``, ``country_id/id`` are main fields,
+        but ``child_ids/name`` is not.
+    """
+    path = field.split('/')
+    return len(path) == 1 or (len(path) == 2 and path[1] in ('id', '.id'))
+
+
+def split_rows(fields, rows, chunk_size):
+    """ Split rows to chunks to be passed to *load* method
+
+        Rows that continue one2many data of previous record (all main
+        fields are empty) are never separated from that record,
+        so chunk could be bit larger than *chunk_size*.
+
+        :param list fields: list of fields (columns) to import
+        :param rows: iterable of rows (lists of values)
+        :param int chunk_size: desired number of rows in chunk
+        :return: generator of tuples ``(offset, chunk)``,
+                 where offset is index of first row of chunk.
+    """
+    main_idx = [i for i, f in enumerate(fields) if _is_main_field(f)]
+    check_continuation = len(main_idx) < len(fields)
+
+    offset = 0
+    chunk = []
+    for row in rows:
+        row = list(row)
+        if len(chunk) >= chunk_size and not (
+                check_continuation and
+                not any(row[i] for i in main_idx if i < len(row))):
+            yield offset, chunk
+            offset += len(chunk)
+            chunk = []
+        chunk.append(row)
+    if chunk:
+        yield offset, chunk
+
+
+class BulkImport(Plugin):
+    """ Plugin to import large amounts of data via model's *load* method.
+
+        Rows are sent to server by chunks, and each chunk is
+        imported in separate *load* call (and in separate transaction
+        on server side). Optionaly chunks could be loaded in parallel.
+
+        Note, that if Odoo finds error in some row of chunk,
+        then whole chunk will not be imported.
+    """
+
+    class Meta:
+        name = "bulk_import"
+
+    def _load_chunk(self, model, fields, offset, chunk, context=None):
+        """ Load single chunk of rows.
+
+            :return: tuple ``(ids, messages)``
+        """
+        kwargs = {} if context is None else {'context': context}
+        try:
+            res = self.client[model].load(fields, chunk, **kwargs)
+        except Error as exc:
+            return [], [AttrDict(row=offset,
+                                 row_to=offset + len(chunk) - 1,
+                                 type='error',
+                                 message=ustr(exc),
+                                 field=None)]
+
+        messages = []
+        for msg in res.get('messages', None) or []:
+            rows = msg.get('rows', None) or {}
+            row_from = rows.get('from', 0)
+            messages.append(AttrDict(
+                row=offset + row_from,
+                row_to=offset + rows.get('to', row_from),
+                type=msg.get('type', 'error'),
+                message=msg.get('message', ''),
+                field=msg.get('field', None)))
+        return res.get('ids', None) or [], messages
+
+    def load(self, model, fields, rows, chunk_size=500, parallel=None,
+             context=None):
+        """ Import *rows* to *model* via *load* method
+
+            :param str model: name of model to import data to
+            :param list fields: list of fields to import (in *load* format,
+                                for example: ``['id', 'name',
+                                'country_id/id']``)
+            :param rows: iterable (may be generator) of rows to import.
+                         each row is list of values in same order as *fields*
+            :param int chunk_size: number of rows to send to server
+                                   in single *load* call. default: 500
+            :param int parallel: number of threads to load chunks in.
+                                 by default chunks are loaded sequentialy.
+            :param dict context: context to pass to *load* method
+            :return: result of import
+            :rtype: ImportResult
+        """
+        fields = list(fields)
+        result = ImportResult()
+        start = time.time()
+
+        def load_chunk(chunk_info):
+            offset, chunk = chunk_info
+            ids, messages = self._load_chunk(model, fields, offset, chunk,
+                                             context=context)
+            return len(chunk), ids, messages
+
+        for row_count, ids, messages in parallel_map(
+                load_chunk,
+                split_rows(fields, rows, chunk_size),
+                workers=parallel):
+            result.rows += row_count
+            result.ids.extend(ids)
+            errors = [m for m in messages if m.type == 'error']
+            result.warnings.extend(m for m in messages if m.type != 'error')
+            if errors:
+                result.errors.extend(errors)
+                if not ids:
+                    result.failed_rows += row_count
+
+        result.errors.sort(key=lambda e: e.row)
+        result.warnings.sort(key=lambda e: e.row)
+        result.elapsed = time.time() - start
+        return result
+
+    def load_csv(self, model, csv_file, chunk_size=500, parallel=None,
+                 context=None, encoding='utf-8', **csv_kwargs):
+        """ Import CSV file to *model* via *load* method.
+
+            First line of file must contain names of fields to import.
+            Row numbers in errors are counted from first line after header.
+
+            :param str model: name of model to import data to
+            :param csv_file: path to CSV file or file-like object
+                             (opened in text mode on Python 3)
+            :param str encoding: encoding of file (used only if path passed)
+            :param csv_kwargs: extra arguments for ``csv.reader``
+            :return: result of import
+            :rtype: ImportResult
+
+            For other arguments look at *load* method
+        """
+        if isinstance(csv_file, six.string_types):
+            if six.PY2:
+                fileobj = open(csv_file, 'rb')
+            else:
+                fileobj = io.open(csv_file, 'rt',
+                                  encoding=encoding, newline='')
+        else:
+            fileobj = None
+
+        try:
+            reader = csv.reader(fileobj or csv_file, **csv_kwargs)
+            if six.PY2:
+                reader = ([cell.decode(encoding) for cell in row]
+                          for row in reader)
+            fields = next(reader, None)
+            if fields is None:
+                return ImportResult()
+            return self.load(model, fields, reader,
+                             chunk_size=chunk_size,
+                             parallel=parallel,
+                             context=context)
+        finally:
+            if fileobj is not None:
+                fileobj.close()
@@ -7,16 +7,231 @@
 # file, You can obtain one at http://mozilla.org/MPL/2.0/.            #
 #######################################################################
 
+""" Plugin to work with external IDs (xml_id) of records.
+
+Resolved external IDs are kept in bidirectional LRU index
+(*XMLIDIndex*), so repeated lookups do not require calls to server.
+To resolve many external IDs at once, use *resolve_many* method::
+
+    records = client.plugins.external_ids.resolve_many([
+        'base.main_partner', 'base.main_company', 'base.user_root'])
+    records['base.main_company'].name
+
+Migration scripts, that look up lot of xml_ids of same modules, could
+preload all xml_ids of these modules at once. Preloaded snapshot could
+be persisted on disk, and will be reused while versions of modules
+are not changed::
+
+    client.plugins.external_ids.preload(
+        ['base', 'product'], path='/var/cache/xmlids.json')
+    client.ref('base.main_company')  # no RPC here
 """
-"""
+
+import os
+import json
+import time
+import itertools
+import threading
+import collections
 
 from ..plugin import Plugin
+from ..utils import chunks
 from ..orm.record import (Record,
                           RecordList)
 
 import six
 
 
+class XMLIDIndex(object):
+    """ Bidirectional LRU index: *xml_id* <-> *(model, res_id)*
+
+        Records without *xml_id* (and *xml_ids* not existing on server)
+        are remembered too, so repeated lookups for them do not require
+        calls to server. Such entries expire after *missing_max_age*
+        seconds, because xml_id could be created later.
+
+        :param int size: max number of entries kept in each direction
+        :param float missing_max_age: time (in seconds) records without
+                                      xml_id and missing xml_ids are
+                                      remembered for
+    """
+
+    def __init__(self, size=100000, missing_max_age=60):
+        self._size = size
+        self._missing_max_age = missing_max_age
+        self._lock = threading.Lock()
+        # xml_id -> (model, id) or time, when xml_id was found
+        # to not exist
+        self._xmlids = collections.OrderedDict()
+        # (model, id) -> xml_id or time, when record was found
+        # to have no xml_id
+        self._records = collections.OrderedDict()
+
+    @property
+    def size(self):
+        """ Max number of entries kept in each direction
+        """
+        return self._size
+
+    def __len__(self):
+        return len(self._xmlids)
+
+    @staticmethod
+    def _touch(lru, key):
+        """ Mark *key* as recently used, and return its value
+        """
+        value = lru.pop(key)
+        lru[key] = value
+        return value
+
+    def _put(self, lru, key, value):
+        lru.pop(key, None)
+        lru[key] = value
+        while len(lru) > self._size:
+            lru.popitem(last=False)
+
+    def _get(self, lru, key, is_found):
+        """ Returns value for *key*, False if *key* is remembered
+            as missing, or None if it is not in index (or missing entry
+            is expired)
+        """
+        with self._lock:
+            if key not in lru:
+                return None
+            value = self._touch(lru, key)
+            if is_found(value):
+                return value
+            if time.time() - value > self._missing_max_age:
+                del lru[key]
+                return None
+            return False
+
+    def get_record(self, xml_id):
+        """ Returns tuple *(model, res_id)* for *xml_id*,
+            False (if xml_id does not exist) or None if it is not in index
+        """
+        return self._get(self._xmlids, xml_id,
+                         lambda value: isinstance(value, tuple))
+
+    def get_xmlid(self, model, res_id):
+        """ Returns *xml_id* for record: string, False (if record
+            has no xml_id) or None, if record is not in index
+        """
+        return self._get(self._records, (model, res_id),
+                         lambda value: isinstance(value, six.string_types))
+
+    def add(self, xml_id, model, res_id):
+        """ Add *xml_id* of record to index.
+            Note, that if record already has xml_id in index,
+            then only *xml_id* -> *(model, res_id)* mapping is updated
+        """
+        with self._lock:
+            self._put(self._xmlids, xml_id, (model, res_id))
+            if not isinstance(self._records.get((model, res_id), None),
+                              six.string_types):
+                self._put(self._records, (model, res_id), xml_id)
+
+    def add_missing(self, model, res_id):
+        """ Remember that record has no xml_id
+        """
+        with self._lock:
+            self._put(self._records, (model, res_id), time.time())
+
+    def add_missing_xmlid(self, xml_id):
+        """ Remember that *xml_id* does not exist
+        """
+        with self._lock:
+            self._put(self._xmlids, xml_id, time.time())
+
+    def clear(self):
+        """ Remove all entries from index
+        """
+        with self._lock:
+            self._xmlids.clear()
+            self._records.clear()
+
+
+class XMLIDSnapshot(object):
+    """ Complete set of xml_ids of some modules.
+
+        Unlike *XMLIDIndex*, snapshot knows all xml_ids of its modules,
+        so if xml_id of such module is not in snapshot, then it does
+        not exist (at time snapshot was created).
+
+        :param str key: key of database snapshot was created for
+        :param dict versions: versions of modules in snapshot
+                              ``{module: version}``
+    """
+
+    def __init__(self, key=None, versions=None):
+        self.key = key
+        self.versions = dict(versions or {})
+        self._models = {}  # used to share model name strings
+        self._xmlids = {}  # xml_id -> (model, res_id)
+        self._records = {}  # (model, res_id) -> xml_id
+
+    def __len__(self):
+        return len(self._xmlids)
+
+    def has_module(self, module):
+        """ Check if xml_ids of *module* are in this snapshot
+        """
+        return module in self.versions
+
+    def add(self, module, name, model, res_id):
+        """ Add xml_id to snapshot
+        """
+        model = self._models.setdefault(model, model)
+        xml_id = "%s.%s" % (module, name)
+        rec = (model, res_id)
+        self._xmlids[xml_id] = rec
+        self._records.setdefault(rec, xml_id)
+
+    def get_record(self, xml_id):
+        """ Returns tuple *(model, res_id)* for *xml_id* or None
+        """
+        return self._xmlids.get(xml_id, None)
+
+    def get_xmlid(self, model, res_id):
+        """ Returns xml_id of record or None
+        """
+        return self._records.get((model, res_id), None)
+
+    def merge(self, other):
+        """ Add all data from *other* snapshot to this one
+        """
+        self.versions.update(other.versions)
+        for xml_id, (model, res_id) in six.iteritems(other._xmlids):
+            module, name = xml_id.split('.', 1)
+            self.add(module, name, model, res_id)
+        return self
+
+    def save(self, path):
+        """ Save snapshot to JSON file
+        """
+        rows = [xml_id.split('.', 1) + [model, res_id]
+                for xml_id, (model, res_id) in six.iteritems(self._xmlids)]
+        tmp_path = '%s.tmp.%s' % (path, os.getpid())
+        with open(tmp_path, 'w') as f:
+            json.dump({'key': self.key,
+                       'versions': self.versions,
+                       'rows': rows}, f)
+        if os.name == 'nt' and os.path.exists(path):  # pragma: no cover
+            os.remove(path)
+        os.rename(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """ Load snapshot from JSON file
+        """
+        with open(path, 'r') as f:
+            data = json.load(f)
+        snapshot = cls(data['key'], data['versions'])
+        for module, name, model, res_id in data['rows']:
+            snapshot.add(module, name, model, res_id)
+        return snapshot
+
+
 class ExternalIDS(Plugin):
     """ This plugin adds aditional methods to work with
         external_ids (xml_id) for Odoo records.
@@ -24,6 +239,216 @@ class ExternalIDS(Plugin):
     class Meta:
         name = "external_ids"
 
+    #: Max number of xml_ids to read by single call
+    batch_size = 1000
+
+    #: Max number of entries in index (in each direction)
+    index_size = 100000
+
+    #: Time (in seconds) records without xml_id are remembered in index
+    missing_max_age = 60
+
+    #: Number of rows read by single call on preload of modules
+    preload_page_size = 10000
+
+    def __init__(self, *args, **kwargs):
+        super(ExternalIDS, self).__init__(*args, **kwargs)
+        self._index = None
+        self._snapshot = None
+
+    @property
+    def index(self):
+        """ Index of already resolved xml_ids
+
+            :rtype: XMLIDIndex
+        """
+        if self._index is None:
+            self._index = XMLIDIndex(self.index_size,
+                                     missing_max_age=self.missing_max_age)
+        return self._index
+
+    @property
+    def snapshot(self):
+        """ Snapshot of preloaded modules (or None)
+
+            :rtype: XMLIDSnapshot
+        """
+        return self._snapshot
+
+    def _get_module_versions(self, modules):
+        rows = self.client['ir.module.module'].search_read(
+            [('name', 'in', list(modules))], ['name', 'latest_version'])
+        versions = dict((m, False) for m in modules)
+        versions.update((r['name'], r['latest_version']) for r in rows)
+        return versions
+
+    def _read_snapshot(self, key, versions):
+        snapshot = XMLIDSnapshot(key, versions)
+        data_obj = self.client['ir.model.data']
+        domain = [('module', 'in', list(versions))]
+        last_id = 0
+        while True:
+            rows = data_obj.search_read(
+                domain + [('id', '>', last_id)],
+                ['module', 'name', 'model', 'res_id'],
+                limit=self.preload_page_size, order='id')
+            for row in rows:
+                snapshot.add(row['module'], row['name'],
+                             row['model'], row['res_id'])
+            if len(rows) < self.preload_page_size:
+                return snapshot
+            last_id = rows[-1]['id']
+
+    def preload(self, modules, path=None):
+        """ Load all xml_ids of *modules* at once, so next lookups
+            of xml_ids (and xml_ids of records) of these modules
+            will not require calls to server.
+
+            Data is read page by page (see *preload_page_size*).
+            If *path* is passed, snapshot is saved to that file,
+            and on next calls it is loaded from that file, if versions
+            of modules were not changed.
+
+            :param list modules: list of names of modules to preload
+            :param str path: path to JSON file to persist snapshot in
+            :return: snapshot of modules
+            :rtype: XMLIDSnapshot
+        """
+        key = self.client.get_url()
+        versions = self._get_module_versions(modules)
+
+        snapshot = None
+        if path is not None and os.path.exists(path):
+            snapshot = XMLIDSnapshot.load(path)
+            if snapshot.key != key or snapshot.versions != versions:
+                snapshot = None
+
+        if snapshot is None:
+            snapshot = self._read_snapshot(key, versions)
+            if path is not None:
+                snapshot.save(path)
+
+        if self._snapshot is None:
+            self._snapshot = snapshot
+        else:
+            self._snapshot.merge(snapshot)
+        return snapshot
+
+    def _lookup_record(self, xml_id):
+        """ Find *(model, res_id)* for *xml_id* without calls to server.
+
+            Returns False, if xml_id is known to not exist,
+            and None if it is unknown
+        """
+        snapshot = self._snapshot
+        if snapshot is not None and \
+                snapshot.has_module(xml_id.partition('.')[0]):
+            return snapshot.get_record(xml_id) or False
+        return self.index.get_record(xml_id)
+
+    def _lookup_xmlid(self, model, res_id):
+        """ Find xml_id for record without calls to server.
+
+            Returns False, if record is known to have no xml_id,
+            and None if it is unknown
+        """
+        if self._snapshot is not None:
+            xml_id = self._snapshot.get_xmlid(model, res_id)
+            if xml_id is not None:
+                return xml_id
+        return self.index.get_xmlid(model, res_id)
+
+    def _split_xmlid(self, xml_id):
+        try:
+            module, name = xml_id.split('.')
+        except ValueError:
+            raise ValueError(
+                "Bad xml_id passed. cannot fetch module name.")
+        return module, name
+
+    def resolve_many(self, xml_ids):
+        """ Resolve many xml_ids at once.
+
+            xml_ids not present in index are read by single
+            *search_read* call per module (and per *batch_size* names).
+            xml_ids not found on server are remembered in index
+            for *missing_max_age* seconds.
+
+            :param list xml_ids: list of fully qualified xml_ids
+            :return: dictionary ``{xml_id: Record or False}``
+            :rtype: dict
+            :raises ValueError: if some of *xml_ids* could not be parsed
+        """
+        xml_ids = list(xml_ids)
+        index = self.index
+
+        # Find which xml_ids have to be read from server, by modules
+        to_read = collections.defaultdict(set)
+        for xml_id in xml_ids:
+            if self._lookup_record(xml_id) is None:
+                module, name = self._split_xmlid(xml_id)
+                to_read[module].add(name)
+
+        data_obj = self.client['ir.model.data']
+        for module, names in six.iteritems(to_read):
+            for batch in chunks(sorted(names), self.batch_size):
+                rows = data_obj.search_read(
+                    [('module', '=', module), ('name', 'in', batch)],
+                    ['module', 'name', 'model', 'res_id'])
+                for row in rows:
+                    index.add("%s.%s" % (row['module'], row['name']),
+                              row['model'], row['res_id'])
+                for name in set(batch) - set(r['name'] for r in rows):
+                    index.add_missing_xmlid("%s.%s" % (module, name))
+
+        # Build records (records of same model share cache)
+        found = {}
+        by_model = collections.defaultdict(list)
+        for xml_id in xml_ids:
+            rec = self._lookup_record(xml_id)
+            if rec:
+                found[xml_id] = rec
+                by_model[rec[0]].append(rec[1])
+        records = {}
+        for model, ids in six.iteritems(by_model):
+            for record in self.client[model].browse(ids):
+                records[(model, record.id)] = record
+
+        return dict((xml_id, records[found[xml_id]] if xml_id in found
+                     else False)
+                    for xml_id in xml_ids)
+
+    def get_xmlids(self, model, ids):
+        """ Get xml_ids for many records of same model at once.
+
+            Records not present in index are read by single
+            *search_read* call per *batch_size* records.
+            Note, that if record have many xml_ids, only one will be
+            returned.
+
+            :param str model: name of model
+            :param list ids: list of IDs of records
+            :return: dictionary ``{res_id: xml_id or False}``
+            :rtype: dict
+        """
+        index = self.index
+        to_read = [i for i in set(ids)
+                   if self._lookup_xmlid(model, i) is None]
+
+        data_obj = self.client['ir.model.data']
+        for batch in chunks(sorted(to_read), self.batch_size):
+            rows = data_obj.search_read(
+                [('model', '=', model), ('res_id', 'in', batch)],
+                ['module', 'name', 'res_id'])
+            for row in rows:
+                index.add("%s.%s" % (row['module'], row['name']),
+                          model, row['res_id'])
+            for res_id in set(batch) - set(r['res_id'] for r in rows):
+                index.add_missing(model, res_id)
+
+        return dict((i, self._lookup_xmlid(model, i) or False)
+                    for i in ids)
+
     def get_for(self, val, module=None):
         """ Return RecordList of 'ir.model.data' for val or False
 
@@ -93,6 +518,16 @@ class ExternalIDS(Plugin):
             Note, that if *module* specified as parametr, then *val*
             supposed to be *name* only
         """
+        if isinstance(val, Record):
+            xml_id = self._lookup_xmlid(val._object.name, val.id)
+        elif isinstance(val, (tuple, list)) and len(val) == 2:
+            xml_id = self._lookup_xmlid(*val)
+        else:
+            xml_id = None
+        if xml_id and (module is None or
+                       xml_id.startswith(module + '.')):
+            return xml_id
+
         e_record = self.get_for(val, module=module)
         if e_record:
             return e_record[0].complete_name
@@ -108,11 +543,9 @@ class ExternalIDS(Plugin):
             :raises ValueError: if *xml_id* argument could not be parsed
         """
         assert isinstance(xml_id, six.string_types), "xml_id must be string"
-        e_record = self.get_for(xml_id, module=module)
-        if e_record:
-            e_record = e_record[0]
-            return self.client[e_record.model].browse(e_record.res_id)
-        return False
+        if module is not None:
+            xml_id = "%s.%s" % (module, xml_id)
+        return self.resolve_many([xml_id])[xml_id]
 
 
 class Record__XMLIDS(Record):
@@ -125,4 +558,37 @@ class Record__XMLIDS(Record):
             :return: xmlid for this record or False
             :rtype: str
         """
-        return self._client.plugins.external_ids.get_xmlid(self, module=module)
+        plugin = self._client.plugins.external_ids
+        if module is not None:
+            return plugin.get_xmlid(self, module=module)
+
+        model = self._object.name
+        xml_id = plugin._lookup_xmlid(model, self.id)
+        if xml_id is None:
+            # Fetch xml_ids for other records in cache too, to avoid
+            # separate call for each record, when iterating over list
+            ids = [self.id] + list(itertools.islice(
+                (i for i in self._lcache
+                 if i != self.id and
+                 plugin._lookup_xmlid(model, i) is None),
+                plugin.batch_size - 1))
+            xml_id = plugin.get_xmlids(model, ids)[self.id]
+        return xml_id
+
+
+class RecordList__XMLIDS(RecordList):
+    """ Simple class to add ability to get xmlids of records in list
+    """
+    def as_xmlids(self, module=None):
+        """ Get xmlids for all records in list
+
+            :param str module: module to search xmlids in
+            :return: list of xmlids (or False for records without xmlid)
+                     in same order as records
+            :rtype: list
+        """
+        if module is not None:
+            return [r.as_xmlid(module=module) for r in self]
+        plugin = self.object.client.plugins.external_ids
+        xml_ids = plugin.get_xmlids(self.object.name, self.ids)
+        return [xml_ids[i] for i in self.ids]
@@ -7,12 +7,134 @@
 # file, You can obtain one at http://mozilla.org/MPL/2.0/.            #
 #######################################################################
 
+""" Plugin to simplify module management.
+
+States of modules are kept in snapshot (*ModuleStates*), shared by all
+clients connected to same database. Snapshot is revalidated cheaply:
+only modules changed since last check (by *write_date*) are read.
+
+Many modules could be installed or upgraded at once::
+
+    module_utils = client.plugins.module_utils
+    module_utils.queue_install('sale', 'purchase')
+    module_utils.queue_upgrade('stock')
+    module_utils.apply_queue()  # single registry update on server
+"""
+
+import time
+import threading
+
 from ..plugin import Plugin
 from ..orm.object import Object
 from ..utils import (stdcall,
                      DirMixIn)
 
 
+class ModuleStates(object):
+    """ Snapshot of states of modules in database.
+
+        First validation reads all modules by single *search_read*
+        call, next validations read only modules changed since last
+        validation (by *write_date*). Note, that modules removed from
+        database are dropped from snapshot only on full resync
+        (see *invalidate*).
+    """
+    #: fields of modules stored in snapshot
+    fields = ['name', 'state', 'latest_version', 'write_date']
+
+    #: number of seconds snapshot is considered valid after validation
+    max_age = 5
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._modules = {}  # module name -> data
+        self._write_date = None
+        self._validated = None
+        self._generation = 0
+
+    @property
+    def modules(self):
+        """ Dictionary ``{module name: data of module}``
+        """
+        return self._modules
+
+    @property
+    def generation(self):
+        """ Number, that is incremented on each change of snapshot.
+
+            Could be used by consumers of snapshot to find out if data
+            built from snapshot is outdated (result of *validate* is
+            not enough for this, because snapshot may be validated
+            by other consumer)
+        """
+        return self._generation
+
+    def invalidate(self, full=False):
+        """ Force revalidation of snapshot on next access
+
+            :param bool full: if True, then all modules will be read
+                              again on next validation
+        """
+        with self._lock:
+            self._validated = None
+            if full:
+                self._write_date = None
+
+    def validate(self, module_obj, force=False):
+        """ Update snapshot from server, if it is older then *max_age*
+
+            :param Object module_obj: object of modules
+                                      (``ir.module.module``)
+            :param bool force: validate snapshot even if it is not too old
+            :return: True if snapshot was changed
+            :rtype: bool
+        """
+        with self._lock:
+            if not force and self._validated is not None and \
+                    time.time() - self._validated < self.max_age:
+                return False
+
+            if self._write_date is None:
+                # Full resync: replace snapshot, so modules removed
+                # on server are dropped from it too
+                modules = dict(
+                    (row['name'], row)
+                    for row in module_obj.search_read([], self.fields))
+                changed = modules != self._modules
+                self._modules = modules
+            else:
+                rows = module_obj.search_read(
+                    [('write_date', '>=', self._write_date)], self.fields)
+                changed = False
+                for row in rows:
+                    if self._modules.get(row['name'], None) != row:
+                        self._modules[row['name']] = row
+                        changed = True
+
+            # If there are no write dates, keep None, so next
+            # validation will be full resync too
+            write_dates = [m['write_date']
+                           for m in self._modules.values()
+                           if m.get('write_date', False)]
+            self._write_date = max(write_dates) if write_dates else None
+            self._validated = time.time()
+            if changed:
+                self._generation += 1
+            return changed
+
+
+# client URL (includes user and database) -> ModuleStates
+_module_states = {}
+
+
+def get_module_states(client):
+    """ Returns snapshot of states of modules for database of *client*
+
+        :rtype: ModuleStates
+    """
+    return _module_states.setdefault(client.get_url(), ModuleStates())
+
+
 # Overriden to add shortcut for module update
 class ModuleObject(Object):
     """ Add shortcut methods to 'ir.module.module' object / model
@@ -33,6 +155,7 @@ class ModuleObject(Object):
         res = self.button_immediate_upgrade(ids, **kwargs)
         # because new models may appear in DB,
         # so registered_objects shoud be refreshed
+        get_module_states(self.client).invalidate()
         self.client.clean_caches()
         return res
 
@@ -44,6 +167,7 @@ class ModuleObject(Object):
         res = self.button_immediate_install(ids, **kwargs)
         # because new models may appear in DB,
         # so registered_objects shoud be refreshed
+        get_module_states(self.client).invalidate()
         self.client.clean_caches()
         return res
 
@@ -80,6 +204,23 @@ class ModuleUtils(Plugin, DirMixIn):
     def __init__(self, *args, **kwargs):
         super(ModuleUtils, self).__init__(*args, **kwargs)
         self._modules = None
+        self._records = None
+        self._generation = None
+        self._install_queue = []
+        self._upgrade_queue = []
+
+    @property
+    def module_states(self):
+        """ Snapshot of states of modules
+
+            :rtype: ModuleStates
+        """
+        return get_module_states(self.client)
+
+    def _validate(self):
+        """ Revalidate states of modules. Returns True if changed
+        """
+        return self.module_states.validate(self.client['ir.module.module'])
 
     @property
     def modules(self):
@@ -89,10 +230,21 @@ class ModuleUtils(Plugin, DirMixIn):
 
             where *module_inst* is *Record* instance for this module
         """
-        if self._modules is None:
-            modules = self.client['ir.module.module'].search_records([])
-            self._modules = {m.name: m
-                             for m in modules}
+        self._validate()
+        module_states = self.module_states
+        if self._modules is None or \
+                self._generation != module_states.generation:
+            # Build records from snapshot, so no reads required to get
+            # data stored in snapshot
+            self._generation = module_states.generation
+            rows = list(module_states.modules.values())
+            records = self.client['ir.module.module'].read_records(
+                [r['id'] for r in rows])
+            lcache = records._lcache
+            for row in rows:
+                lcache[row['id']].update(row)
+            self._records = records
+            self._modules = dict(zip((r['name'] for r in rows), records))
         return self._modules
 
     @property
@@ -101,8 +253,26 @@ class ModuleUtils(Plugin, DirMixIn):
 
             :rtype: RecordList
         """
-        return self.client['ir.module.module'].search_records(
-            [('state', '=', 'installed')])
+        self.modules  # ensure records are up to date
+        return self._records.filter(lambda m: m.state == 'installed')
+
+    def get_states(self, names=None):
+        """ Get states of modules (from snapshot)
+
+            :param list names: names of modules to get states for.
+                               if not passed, states of all modules
+                               will be returned
+            :return: dictionary ``{module name: state}``. State is False
+                     for modules not present in database
+            :rtype: dict
+        """
+        self._validate()
+        modules = self.module_states.modules
+        if names is None:
+            names = list(modules)
+        return dict((name, modules[name]['state'] if name in modules
+                     else False)
+                    for name in names)
 
     def update_module_list(self):
         """ Update module list
@@ -111,8 +281,77 @@ class ModuleUtils(Plugin, DirMixIn):
             update list, to be able to installe them.
         """
         self._modules = None
+        self.module_states.invalidate(full=True)
         return self.client['ir.module.module'].update_list()
 
+    def _check_names(self, names):
+        modules = self.modules
+        unknown = [n for n in names if n not in modules]
+        if unknown:
+            raise ValueError("Unknown modules: %s" % ', '.join(unknown))
+
+    def queue_install(self, *names):
+        """ Add modules to queue of modules to be installed
+            by *apply_queue* method
+
+            :raises ValueError: if some of modules not found
+        """
+        self._check_names(names)
+        self._install_queue.extend(
+            n for n in names if n not in self._install_queue)
+        return self
+
+    def queue_upgrade(self, *names):
+        """ Add modules to queue of modules to be upgraded
+            by *apply_queue* method
+
+            :raises ValueError: if some of modules not found
+        """
+        self._check_names(names)
+        self._upgrade_queue.extend(
+            n for n in names if n not in self._upgrade_queue)
+        return self
+
+    @property
+    def queue(self):
+        """ Modules queued for installation and upgrade:
+            dictionary ``{'install': [names], 'upgrade': [names]}``
+        """
+        return {'install': list(self._install_queue),
+                'upgrade': list(self._upgrade_queue)}
+
+    def apply_queue(self, context=None):
+        """ Install and upgrade queued modules at once.
+
+            Modules to install are only marked for installation,
+            and then all changes are applied by single immediate
+            install / upgrade call, so registry on server is updated
+            only once. Modules already installed are not installed again.
+
+            :param dict context: context to call server methods with
+            :return: result of immediate install / upgrade call or None
+                     if there was nothing to do
+        """
+        modules = self.modules
+        install_ids = [modules[n].id for n in self._install_queue
+                       if modules[n].state != 'installed']
+        upgrade_ids = [modules[n].id for n in self._upgrade_queue]
+        self._install_queue = []
+        self._upgrade_queue = []
+
+        module_obj = self.client['ir.module.module']
+        res = None
+        if install_ids and upgrade_ids:
+            kwargs = {} if context is None else {'context': context}
+            module_obj.button_install(install_ids, **kwargs)
+            res = module_obj.upgrade(upgrade_ids, context=context)
+        elif install_ids:
+            res = module_obj.install(install_ids, context=context)
+        elif upgrade_ids:
+            res = module_obj.upgrade(upgrade_ids, context=context)
+        self._modules = None
+        return res
+
     def __dir__(self):
         res = super(ModuleUtils, self).__dir__()
         res.extend(['m_' + i for i in self.modules.keys()])
@@ -122,8 +361,10 @@ class ModuleUtils(Plugin, DirMixIn):
         return self.modules[name]
 
     def __getattr__(self, name):
-        if name.startswith('m_') and name[2:] in self.modules:
-            return self.modules[name[2:]]
+        if name.startswith('m_'):
+            module = self.modules.get(name[2:], None)
+            if module is not None:
+                return module
         raise AttributeError("No attribute %s in object %s" % (name, self))
 
     def __contains__(self, name):
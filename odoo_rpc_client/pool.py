@@ -0,0 +1,330 @@
+# -*- coding: utf-8 -*-
+# Copyright © 2014-2018 Dmytro Katyukha <dmytro.katyukha@gmail.com>
+
+#######################################################################
+# This Source Code Form is subject to the terms of the Mozilla Public #
+# License, v. 2.0. If a copy of the MPL was not distributed with this #
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.            #
+#######################################################################
+
+""" Pool of clients, useful for services working with many databases
+on same server(s).
+
+Clients in pool:
+
+- share connectors (and thus HTTP connections) per server
+- share information about fields of models (*fields_get*) between
+  databases with same versions of installed modules, if user has same
+  groups and language in these databases
+- are kept in LRU order: when there are more than *max_clients* clients
+  in pool, least recently used ones are removed from pool
+
+Example::
+
+    from odoo_rpc_client.pool import ClientPool
+
+    pool = ClientPool(max_clients=50)
+    for dbname in tenant_databases:
+        client = pool.get_client('odoo.host', dbname=dbname,
+                                 user='admin', pwd='admin',
+                                 protocol='json-rpc')
+        print(client['res.partner'].search_count([]))
+
+Same call could be run against many databases concurrently via *fan_out*
+function (or *ClientPool.fan_out* method). Results are yielded as soon
+as they are ready::
+
+    for res in pool.fan_out(('res.partner', 'search_count', [[]]),
+                            workers=16, per_host=4):
+        if res.ok:
+            print(res.client.dbname, res.result, res.elapsed)
+        else:
+            print(res.client.dbname, 'failed:', res.error)
+"""
+
+import six
+import time
+import hashlib
+import threading
+import collections
+from multiprocessing.pool import ThreadPool
+
+from .client import Client
+from .connection import (get_connector,
+                         DEFAULT_TIMEOUT)
+from .utils import parallel_map
+
+__all__ = ('ClientPool', 'FanOutResult', 'fan_out')
+
+
+class FanOutResult(object):
+    """ Result of task run for single client by *fan_out*
+
+        :param Client client: client task was run for
+        :param result: value returned by task
+        :param Exception error: exception raised by task (if any)
+        :param float elapsed: time spent on task (in seconds)
+    """
+    __slots__ = ('client', 'result', 'error', 'elapsed')
+
+    def __init__(self, client, result=None, error=None, elapsed=0.0):
+        self.client = client
+        self.result = result
+        self.error = error
+        self.elapsed = elapsed
+
+    @property
+    def ok(self):
+        """ True if task completed without errors
+        """
+        return self.error is None
+
+    def get(self):
+        """ Returns result of task, or raises error raised by task
+        """
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+    def __repr__(self):
+        return "<FanOutResult %s: %s (%.3fs)>" % (
+            self.client.get_url(),
+            'ok' if self.ok else 'error: %r' % self.error,
+            self.elapsed)
+
+
+def _make_task(task):
+    """ Convert task spec to function of client
+    """
+    if callable(task):
+        return task
+    model, method = task[0], task[1]
+    args = tuple(task[2]) if len(task) > 2 else ()
+    kwargs = dict(task[3]) if len(task) > 3 else {}
+
+    def run_task(client):
+        return getattr(client[model], method)(*args, **kwargs)
+    return run_task
+
+
+def _host_key(client):
+    return (client.host, client.port)
+
+
+def _fan_out_per_host(run, clients, workers, per_host, ordered):
+    """ Run *run* for each ``(index, client)`` pair in pool of *workers*
+        threads, but not more than *per_host* at once for single server.
+
+        Tasks are submitted to pool only when their server has free slot,
+        so threads of pool are never blocked waiting for busy server,
+        while tasks for other servers are queued.
+    """
+    queues = collections.OrderedDict()
+    for index, client in enumerate(clients):
+        queues.setdefault(_host_key(client), collections.deque()).append(
+            (index, client))
+    running = collections.Counter()
+    done = six.moves.queue.Queue()
+    pool = ThreadPool(workers)
+
+    def submit():
+        # Round-robin over servers, until all workers are busy,
+        # or there is no server with free slot and queued tasks
+        submitted = True
+        while submitted:
+            submitted = False
+            for host, items in queues.items():
+                if sum(running.values()) >= workers:
+                    return
+                if items and running[host] < per_host:
+                    running[host] += 1
+                    pool.apply_async(run, (items.popleft(),),
+                                     callback=done.put)
+                    submitted = True
+
+    try:
+        submit()
+        results, next_index = {}, 0
+        for __ in range(len(clients)):
+            index, result = done.get()
+            running[_host_key(result.client)] -= 1
+            submit()
+            if not ordered:
+                yield result
+                continue
+            results[index] = result
+            while next_index in results:
+                yield results.pop(next_index)
+                next_index += 1
+    finally:
+        pool.terminate()
+
+
+def fan_out(clients, task, workers=8, per_host=None, ordered=False):
+    """ Run *task* for each of *clients* concurrently (in pool of threads)
+
+        Errors raised by task do not stop processing of other clients,
+        they are returned in results instead.
+
+        :param list clients: list of clients to run task for
+        :param task: callable, that receives client as single argument,
+                     or tuple ``(model, method[, args[, kwargs]])``,
+                     that describes method of model to call
+        :param int workers: total number of threads to use
+        :param int per_host: max number of tasks running at the same time
+                             for clients of single server (host and port).
+                             No limit by default
+        :param bool ordered: if True, then results are returned in same
+                             order as *clients*, otherwise as soon as they
+                             are ready (default)
+        :return: generator of FanOutResult instances
+    """
+    clients = list(clients)
+    fn = _make_task(task)
+
+    def run(item):
+        index, client = item
+        start = time.time()
+        try:
+            result = fn(client)
+        except Exception as exc:
+            return index, FanOutResult(client, error=exc,
+                                       elapsed=time.time() - start)
+        return index, FanOutResult(client, result=result,
+                                   elapsed=time.time() - start)
+
+    if per_host:
+        return _fan_out_per_host(run, clients, max(workers or 1, 1),
+                                 per_host, ordered)
+    return (result for __, result in parallel_map(
+        run, enumerate(clients), workers=workers, ordered=ordered))
+
+
+class ClientPool(object):
+    """ Pool of clients, keyed by URL of client
+        (protocol, user, host, port and database name)
+
+        :param int max_clients: max number of clients kept in pool
+        :param bool share_metadata: if True (default), then information
+                                    about fields of models is shared
+                                    between clients connected to databases
+                                    with same versions of installed modules
+                                    (as same user, with same groups
+                                    and language)
+    """
+
+    def __init__(self, max_clients=100, share_metadata=True):
+        self._max_clients = max_clients
+        self._share_metadata = share_metadata
+        self._lock = threading.RLock()
+        self._clients = collections.OrderedDict()  # url -> client
+        self._connectors = {}
+        self._metadata = {}  # metadata key -> {model: columns_info}
+
+    @property
+    def max_clients(self):
+        """ Max number of clients kept in pool
+        """
+        return self._max_clients
+
+    def __len__(self):
+        return len(self._clients)
+
+    def __contains__(self, url):
+        return url in self._clients
+
+    def _get_connector(self, protocol, host, port, timeout, extra_args):
+        """ Returns connector shared by all clients of server
+        """
+        key = (protocol, host, port, timeout,
+               tuple(sorted(extra_args.items())))
+        with self._lock:
+            connector = self._connectors.get(key, None)
+            if connector is None:
+                connector = self._connectors[key] = get_connector(protocol)(
+                    host, port, timeout, dict(extra_args))
+        return connector
+
+    def _get_metadata(self, client):
+        """ Returns metadata storage for *client*, shared with clients
+            connected to databases with same versions of installed modules.
+
+            Result of *fields_get* depends also on access rights and
+            language of user, so groups and language of user are part
+            of key too.
+        """
+        modules = client['ir.module.module'].search_read(
+            [('state', '=', 'installed')], ['name', 'latest_version'])
+        user_data = client['res.users'].read(
+            [client.uid], ['groups_id', 'lang'])[0]
+        digest = hashlib.sha1(repr((
+            sorted((m['name'], m['latest_version']) for m in modules),
+            sorted(user_data['groups_id']),
+            user_data['lang'] or '',
+        )).encode('utf-8')).hexdigest()
+        key = (client.protocol, client.host, client.port,
+               client.username, digest)
+        with self._lock:
+            return self._metadata.setdefault(key, {})
+
+    def get_client(self, host, dbname=None, user=None, pwd=None, port=8069,
+                   protocol='xml-rpc', timeout=DEFAULT_TIMEOUT, **extra_args):
+        """ Returns client from pool, or creates new one.
+
+            Takes same arguments as *Client* constructor.
+
+            :rtype: Client
+        """
+        url = Client.to_url({'protocol': protocol, 'user': user,
+                             'host': host, 'port': port, 'dbname': dbname})
+        with self._lock:
+            client = self._clients.pop(url, None)
+            if client is None or client._pwd != pwd:
+                connector = self._get_connector(protocol, host, port,
+                                                timeout, extra_args)
+                client = Client(host, dbname=dbname, user=user, pwd=pwd,
+                                port=port, protocol=protocol,
+                                timeout=timeout, connection=connector)
+                if self._share_metadata:
+                    client.metadata = self._get_metadata
+            self._clients[url] = client
+
+            while len(self._clients) > self._max_clients:
+                self._clients.popitem(last=False)
+        return client
+
+    @property
+    def clients(self):
+        """ List of clients in pool (least recently used first)
+        """
+        with self._lock:
+            return list(self._clients.values())
+
+    def fan_out(self, task, clients=None, workers=8, per_host=None,
+                ordered=False):
+        """ Run *task* for clients in pool concurrently.
+            See *fan_out* function for details.
+
+            :param list clients: clients to run task for.
+                                 by default all clients in pool
+            :return: generator of FanOutResult instances
+        """
+        return fan_out(self.clients if clients is None else clients,
+                       task, workers=workers, per_host=per_host,
+                       ordered=ordered)
+
+    def remove(self, url):
+        """ Remove client with specified *url* from pool
+
+            :return: removed client or None
+        """
+        with self._lock:
+            return self._clients.pop(url, None)
+
+    def clear(self):
+        """ Remove all clients, connectors and metadata from pool
+        """
+        with self._lock:
+            self._clients.clear()
+            self._connectors.clear()
+            self._metadata.clear()
@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+# Copyright © 2014-2018 Dmytro Katyukha <dmytro.katyukha@gmail.com>
+
+#######################################################################
+# This Source Code Form is subject to the terms of the Mozilla Public #
+# License, v. 2.0. If a copy of the MPL was not distributed with this #
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.            #
+#######################################################################
+
+""" Retry of object service calls on transient errors.
+
+Retries are disabled by default. To enable them, set retry policy
+for client::
+
+    from odoo_rpc_client.retry import RetryPolicy
+
+    client.retry_policy = RetryPolicy(max_retries=5)
+    ...
+    print(client.retry_policy.stats)
+
+Calls are retried only if it is safe:
+
+- methods, that only read data (see *SAFE_METHODS*), are retried on any
+  transient error (connection errors, 502/503/504 responses of proxy,
+  etc)
+- any method is retried if server reported, that transaction was rolled
+  back (serialization failures, deadlocks), because in this case
+  nothing was written to database
+
+Delay between retries grows exponentially (with random jitter), and
+total number of retries is limited by retry budget, so retries will
+not overload server, that is really down.
+"""
+
+import re
+import time
+import socket
+import random
+import logging
+import threading
+
+from six.moves import http_client
+from six.moves import xmlrpc_client
+
+from .utils import ustr
+
+__all__ = (
+    'SAFE_METHODS',
+    'RetryPolicy',
+)
+
+logger = logging.getLogger(__name__)
+
+#: Methods, that do not change data, and thus could be safely retried
+SAFE_METHODS = frozenset([
+    'check_access_rights',
+    'context_get',
+    'default_get',
+    'exists',
+    'export_data',
+    'fields_get',
+    'fields_view_get',
+    'name_get',
+    'name_search',
+    'read',
+    'read_group',
+    'search',
+    'search_count',
+    'search_read',
+])
+
+#: HTTP status codes, that mean temporary unavailability of server
+TRANSIENT_HTTP_CODES = frozenset([429, 502, 503, 504])
+
+#: Errors, that mean that server (or proxy) is temporary unavailable
+TRANSIENT_ERRORS_RE = re.compile(
+    r"Cannot connect to url|Connection (?:reset|refused|aborted)|"
+    r"Bad Gateway|Service Unavailable|Gateway Time-?out",
+    re.IGNORECASE)
+
+#: Errors, after which server rolls back transaction
+ROLLBACK_ERRORS_RE = re.compile(
+    r"could not serialize access|deadlock detected|"
+    r"TransactionRollbackError|could not obtain lock",
+    re.IGNORECASE)
+
+
+def _error_text(exc):
+    """ Text of error (for XML-RPC errors - fault string)
+    """
+    fault = getattr(exc, 'fault', None)
+    if fault is not None:
+        return ustr(fault.faultString)
+    return u' '.join(ustr(a) for a in exc.args
+                     if isinstance(a, (bytes, type(u''))))
+
+
+class RetryPolicy(object):
+    """ Policy of retrying of object service calls.
+
+        :param int max_retries: max number of retries of single call
+        :param float base_delay: delay before first retry (seconds).
+                                 doubled for each next retry
+        :param float max_delay: max delay between retries (seconds)
+        :param safe_methods: names of methods, that could be retried
+                             on any transient error. could contain
+                             names of methods (``'read'``) or names of
+                             methods of specific model
+                             (``'res.partner.my_method'``).
+                             Default: *SAFE_METHODS*
+        :param float budget: max number of retries, that could be done
+                             without successful calls
+        :param float budget_refill: part of retry, that is added to budget
+                                    on each successful call
+    """
+
+    def __init__(self, max_retries=3, base_delay=0.5, max_delay=30.0,
+                 safe_methods=None, budget=10, budget_refill=0.1):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.safe_methods = set(
+            SAFE_METHODS if safe_methods is None else safe_methods)
+        self.budget = budget
+        self.budget_refill = budget_refill
+
+        self._lock = threading.Lock()
+        self._tokens = float(budget)
+        self._stats = {
+            'calls': 0,
+            'retries': 0,
+            'recovered': 0,
+            'failed': 0,
+            'budget_exhausted': 0,
+        }
+
+    @property
+    def stats(self):
+        """ Metrics of retries: dictionary with keys
+
+            - 'calls': number of calls done via this policy
+            - 'retries': number of retries
+            - 'recovered': number of calls succeeded after retries
+            - 'failed': number of calls failed after retries
+            - 'budget_exhausted': number of retries not done,
+              because of exhausted retry budget
+        """
+        with self._lock:
+            return dict(self._stats)
+
+    def _count(self, name):
+        with self._lock:
+            self._stats[name] += 1
+
+    def is_safe(self, model, method):
+        """ Check if *method* of *model* could be retried on any
+            transient error
+        """
+        return (method in self.safe_methods or
+                "%s.%s" % (model, method) in self.safe_methods)
+
+    def is_transient(self, exc):
+        """ Check if *exc* is temporary error of connection or server
+        """
+        if isinstance(exc, xmlrpc_client.ProtocolError):
+            return exc.errcode in TRANSIENT_HTTP_CODES
+        if isinstance(exc, (socket.error, http_client.HTTPException)):
+            return True
+        if getattr(exc, 'code', None) in TRANSIENT_HTTP_CODES:
+            return True
+        return bool(TRANSIENT_ERRORS_RE.search(_error_text(exc)))
+
+    def is_rolled_back(self, exc):
+        """ Check if *exc* means, that transaction was rolled back on server
+            (so call could be retried, even if it writes data)
+        """
+        return bool(ROLLBACK_ERRORS_RE.search(_error_text(exc)))
+
+    def should_retry(self, model, method, exc):
+        """ Check if call of *method* of *model* failed with *exc*
+            could be retried
+        """
+        if self.is_rolled_back(exc):
+            return True
+        return self.is_safe(model, method) and self.is_transient(exc)
+
+    def get_delay(self, attempt):
+        """ Delay before retry number *attempt* (starting from 0)
+            with "full jitter"
+        """
+        return random.uniform(
+            0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def _withdraw(self):
+        """ Take one retry from budget. Returns False if budget exhausted
+        """
+        with self._lock:
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            self._stats['budget_exhausted'] += 1
+            return False
+
+    def _deposit(self):
+        with self._lock:
+            self._tokens = min(float(self.budget),
+                               self._tokens + self.budget_refill)
+
+    def execute(self, fn, model, method, *args, **kwargs):
+        """ Call ``fn(*args, **kwargs)``, that calls *method*
+            of *model* on server, retrying it according to this policy
+
+            :return: result of *fn*
+            :raises: last error raised by *fn*
+        """
+        self._count('calls')
+        attempt = 0
+        while True:
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as exc:
+                if (attempt >= self.max_retries or
+                        not self.should_retry(model, method, exc) or
+                        not self._withdraw()):
+                    if attempt:
+                        self._count('failed')
+                    raise
+                delay = self.get_delay(attempt)
+                attempt += 1
+                self._count('retries')
+                logger.warning("Retrying (%s/%s) call of %s.%s in %.2fs "
+                               "after error: %s", attempt, self.max_retries,
+                               model, method, delay, exc)
+                time.sleep(delay)
+                continue
+
+            if attempt:
+                self._count('recovered')
+            self._deposit()
+            return result
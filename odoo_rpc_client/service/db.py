@@ -7,11 +7,15 @@
 # file, You can obtain one at http://mozilla.org/MPL/2.0/.            #
 #######################################################################
 
+import os
 import six
 import re
+import time
 from pkg_resources import parse_version
 
 from ..service.service import ServiceBase
+from ..connection.connection import Base64Upload
+from ..utils import b64decode_stream
 
 __all__ = ('DBService',)
 
@@ -120,6 +124,85 @@ class DBService(ServiceBase):
 
         return dump_data
 
+    def dump_db_to(self, password, db, dest, format='zip', progress=None,
+                   progress_interval=1.0):
+        """ Dump database directly to file.
+
+            Response of server is read by chunks, and base64-encoded data
+            is decoded on the fly, so memory usage does not depend on
+            size of database.
+
+            Example::
+
+                def show_progress(written, speed):
+                    print("%d bytes written (%.1f MB/s)" % (
+                        written, speed / 1024.0 / 1024.0))
+
+                client.services.db.dump_db_to(
+                    'admin', 'my_db', '/backups/my_db.zip',
+                    progress=show_progress)
+
+            :param str password: super admin password
+            :param str|Client db: name of database or *Client* instance
+                                  with *client.dbname is not None*
+            :param dest: path to file to save dump to, or file-like
+                         object opened in binary mode. Dump is saved
+                         to temporary file first, and renamed to *dest*
+                         when it is completed.
+            :param str format: (only odoo 9.0+) format of dump:
+                               'zip' (default) or 'dump'
+            :param callable progress: function to be called with number
+                                      of bytes written and speed
+                                      (bytes per second) during dump
+            :param float progress_interval: min number of seconds between
+                                            calls of *progress*
+            :raise: `ValueError` (unsupported value of *db* argument)
+            :return: number of bytes written
+            :rtype: int
+        """
+        args = [password, to_dbname(db)]
+        if self.server_base_version() >= parse_version('9.0'):
+            args.append(format)
+
+        chunks = self.client.connection.call_stream(self.name, 'dump', args)
+
+        if not isinstance(dest, six.string_types):
+            return self._write_stream(b64decode_stream(chunks), dest,
+                                      progress, progress_interval)
+
+        tmp_path = '%s.tmp.%s' % (dest, os.getpid())
+        try:
+            with open(tmp_path, 'wb') as f:
+                written = self._write_stream(b64decode_stream(chunks), f,
+                                             progress, progress_interval)
+            if os.name == 'nt' and os.path.exists(dest):  # pragma: no cover
+                os.remove(dest)
+            os.rename(tmp_path, dest)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return written
+
+    def _write_stream(self, chunks, fileobj, progress, progress_interval):
+        """ Write *chunks* to *fileobj*, reporting progress
+
+            :return: number of bytes written
+        """
+        written = 0
+        start = last_report = time.time()
+        for chunk in chunks:
+            fileobj.write(chunk)
+            written += len(chunk)
+
+            now = time.time()
+            if progress is not None and now - last_report >= progress_interval:
+                last_report = now
+                progress(written, written / (now - start))
+
+        if progress is not None:
+            progress(written, written / max(time.time() - start, 1e-6))
+        return written
+
     def restore_db(self, password, dbname, data, **kwargs):
         """ Restore database
 
@@ -150,6 +233,37 @@ class DBService(ServiceBase):
 
         return self.restore(password, dbname, data, *args)
 
+    def restore_db_from(self, password, dbname, src, **kwargs):
+        """ Restore database from file (for example, saved by *dump_db_to*)
+
+            File is read by chunks and base64-encoded on the fly, while
+            request is sent to server, so memory usage does not depend
+            on size of database.
+
+            :param str password: super admin password
+            :param str dbname: name of database
+            :param src: path to file with dump of database, or file-like
+                        object opened in binary mode
+            :param bool copy: (only odoo 8.0+) if set to True,
+                              then new db-uid will be generated.
+                              (default: False)
+            :return: True
+            :rtype: bool
+        """
+        if self.server_base_version() >= parse_version('8.0') and \
+                'copy' in kwargs:
+            extra_args = [kwargs['copy']]
+        else:
+            extra_args = []
+
+        if isinstance(src, six.string_types):
+            with open(src, 'rb') as f:
+                return self.restore_db_from(password, dbname, f, **kwargs)
+
+        return self.client.connection.call_upload(
+            self.name, 'restore',
+            [password, dbname, Base64Upload(src)] + extra_args)
+
     def server_version(self):
         """ Returns server version.
 
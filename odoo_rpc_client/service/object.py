@@ -35,13 +35,16 @@ class ObjectService(ServiceBase):
             kwargs = kwargs.copy()
             del kwargs['context']
 
-        result = self._service.execute_kw(self.client.dbname,
-                                          self.client.uid,
-                                          self.client._pwd,
-                                          obj,
-                                          method,
-                                          args,
-                                          kwargs)
+        call_args = (self.client.dbname, self.client.uid, self.client._pwd,
+                     obj, method, args, kwargs)
+
+        # retry transient errors, if retry policy is set for client
+        policy = self.client.retry_policy
+        if policy is not None:
+            return policy.execute(self._service.execute_kw,
+                                  obj, method, *call_args)
+
+        result = self._service.execute_kw(*call_args)
         return result
 
     def execute_wkf(self, object_name, signal, object_id):
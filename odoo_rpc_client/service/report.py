@@ -26,18 +26,65 @@ where *report* is instance of *ReportResult* and *report.content*
 returns already *base64* decoded content of report,
 which could be directly written to file (or
 just use *report.save(path)* method)
+
+To render reports for many documents concurrently, use
+*ReportService.generate_many*::
+
+    invoices = client['account.invoice'].search_records(
+        [('state', '=', 'open')])
+    for report in client.services.report.generate_many(
+            'account.report_invoice', invoices, concurrency=4):
+        report.save('invoice-%s.pdf' % report.ids[0])
+
+Legacy asynchronous protocol (*report* / *report_get* methods of service)
+is available via futures: reports are submitted to server at once,
+and single scheduler thread polls server for their results::
+
+    futures = client.services.report.submit_many(
+        'account.invoice', invoices)
+    for future in as_completed(futures):
+        report = future.result()
+        report.save('invoice-%s.pdf' % report.ids[0])
 """
 
+import os
+import six
+import json
+import time
+import heapq
+import hashlib
 import numbers
+import itertools
+import tempfile
+import threading
 from extend_me import Extensible
 
 from .service import ServiceBase
 from ..orm import (Record,
                    RecordList)
+from ..utils import (parallel_map,
+                     b64decode_stream)
 
 from ..exceptions import ReportError
 
 
+#: Size of chunks of base64-encoded data decoded at once
+DECODE_CHUNK_SIZE = 4 * 1024 * 1024
+
+
+def iter_b64decode(data, chunk_size=DECODE_CHUNK_SIZE):
+    """ Decode base64-encoded *data* by chunks.
+        Whitespace (line breaks) in data is ignored.
+
+        :param data: base64-encoded data (bytes or text)
+        :param int chunk_size: size of chunks of encoded data
+                               to be decoded at once
+        :return: generator of decoded chunks (bytes)
+    """
+    return b64decode_stream(data[start:start + chunk_size]
+                            for start in range(0, len(data), chunk_size))
+
+
 class ReportResult(Extensible):
     """ Just a simple and extensible wrapper on report result
 
@@ -46,20 +93,28 @@ class ReportResult(Extensible):
 
             ReportResult(report_get(report_id))
 
+        Content of large reports could be saved without keeping decoded
+        content in memory: *save* and *write_to* methods decode base64 data
+        by chunks, computing SHA-256 hash of content on the fly.
     """
 
-    def __init__(self, report, result, path=None):
+    def __init__(self, report, result, path=None, ids=None):
         self._report = report
+        self._ids = ids
         self._orig_result = result
         self._state = result.get('state', False)
         self._result = result.get('result', None)
         self._format = result.get('format', None)
         self._content = None
+        self._sha256 = None
         self._path = path
 
-        # fix result
-        if self._result:
-            self._result = self._result.encode('utf-8')
+    @property
+    def ids(self):
+        """ IDs of documents report was generated for
+            (None if unknown)
+        """
+        return self._ids
 
     @property
     def state(self):
@@ -69,7 +124,7 @@ class ReportResult(Extensible):
 
     @property
     def result(self):
-        """ Base64-encoded report content.
+        """ Base64-encoded report content (bytes).
             To get already decoded report content, use ``.content`` property
 
             :raises ReportError: When .state property is False.
@@ -79,6 +134,8 @@ class ReportResult(Extensible):
         """
         if self.state is False:
             raise ReportError("Report seems to be not ready yet")
+        if self._result and not isinstance(self._result, six.binary_type):
+            return self._result.encode('utf-8')
         return self._result
 
     @property
@@ -87,39 +144,101 @@ class ReportResult(Extensible):
         """
         return self._format
 
+    def iter_content(self, chunk_size=DECODE_CHUNK_SIZE):
+        """ Iterate over report content by chunks (already base64-decoded)
+
+            :param int chunk_size: size of chunks of encoded data
+                                   to be decoded at once
+            :return: generator of chunks of content (bytes)
+        """
+        if self.state is False:
+            raise ReportError("Report seems to be not ready yet")
+        if self._content is not None:
+            yield self._content
+        elif self._result:
+            for chunk in iter_b64decode(self._result, chunk_size):
+                yield chunk
+
     @property
     def content(self):
         """ Report file content. Already base64-decoded
         """
         if self._content is None:
-            import base64
-            self._content = base64.b64decode(self.result)
+            self._content = b''.join(self.iter_content())
         return self._content
 
+    @property
+    def sha256(self):
+        """ SHA-256 hash (hex digest) of report content.
+            Computed by chunks, without decoding whole content at once.
+        """
+        if self._sha256 is None:
+            content_hash = hashlib.sha256()
+            for chunk in self.iter_content():
+                content_hash.update(chunk)
+            self._sha256 = content_hash.hexdigest()
+        return self._sha256
+
     @property
     def path(self):
         """ Path where file is located or will be located on save
         """
         if self._path is None:
-            import hashlib
-            content_hash = hashlib.sha256(self.content)
-            content_hash = content_hash.hexdigest().encode('utf-8')
-            report_name_base = self._report.report_action.name.encode('utf-8')
-            report_name_base = report_name_base.replace(b'/', b'-')\
-                                               .replace(b':', b'-')
-            self._path = str(report_name_base +
-                             content_hash +
-                             b'.' + self.format.encode('utf-8'))
+            report_name_base = self._report.report_action.name
+            report_name_base = report_name_base.replace('/', '-')\
+                                               .replace(':', '-')
+            self._path = u"%s%s.%s" % (report_name_base,
+                                       self.sha256,
+                                       self.format)
         return self._path
 
+    def write_to(self, fileobj, chunk_size=DECODE_CHUNK_SIZE):
+        """ Write report content to file-like object.
+
+            Content is decoded and written by chunks, and SHA-256 hash
+            of content is computed on the fly (see *sha256* property).
+
+            :param fileobj: file-like object opened in binary mode
+            :param int chunk_size: size of chunks of encoded data
+                                   to be decoded at once
+            :return: self
+        """
+        content_hash = hashlib.sha256()
+        for chunk in self.iter_content(chunk_size):
+            content_hash.update(chunk)
+            fileobj.write(chunk)
+        self._sha256 = content_hash.hexdigest()
+        return self
+
     def save(self, path=None):
         """ Save's file by specified path or if no path specified
-            save it in temp dir with automaticly generated name.
+            save it in current dir with automaticly generated name.
+
+            Content is decoded and written by chunks, so whole decoded
+            content is not kept in memory.
         """
         if path is not None:
             self._path = path
-        with open(self.path, 'wb') as f:
-            f.write(self.content)
+
+        if self._path is not None or self._sha256 is not None:
+            with open(self.path, 'wb') as f:
+                self.write_to(f)
+            return self
+
+        # Name of file depends on hash of content, so write content
+        # to temporary file first, and then rename it
+        fd, tmp_path = tempfile.mkstemp(dir='.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                self.write_to(f)
+            if os.name == 'nt' and \
+                    os.path.exists(self.path):  # pragma: no cover
+                os.remove(self.path)
+            os.rename(tmp_path, self.path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
         return self
 
 
@@ -175,6 +294,341 @@ class Report(Extensible):
                                             context=context)
 
 
+class ReportRegistry(object):
+    """ Catalogue of reports available in database.
+
+        Contains data of report actions (only fields required by *Report*).
+        Registry is updated incrementally: only report actions changed
+        since last update (by *write_date*) are read from server.
+        Registries are shared by all clients connected to same database
+        with same user (see *get_registry*), and could be persisted
+        in JSON file, to be reused by next sessions.
+
+        :param str path: path to JSON file to persist registry in.
+                         (optional)
+    """
+    #: fields of report actions stored in registry
+    fields = ['name', 'report_name', 'model', 'write_date']
+
+    #: number of seconds registry is considered up to date after update
+    max_age = 60
+
+    def __init__(self, path=None):
+        self._path = path
+        self._lock = threading.RLock()
+        self._reports = {}  # id -> data of report action
+        self._write_date = None
+        self._updated = None
+        if path is not None and os.path.exists(path):
+            self.load()
+
+    @property
+    def path(self):
+        """ Path to JSON file registry is persisted in (or None)
+        """
+        return self._path
+
+    @property
+    def reports(self):
+        """ List of dictionaries with data of report actions
+        """
+        return list(self._reports.values())
+
+    def load(self):
+        """ Load registry from file
+        """
+        with open(self._path, 'r') as f:
+            data = json.load(f)
+        with self._lock:
+            self._reports = dict((r['id'], r) for r in data['reports'])
+            self._write_date = data['write_date']
+            self._updated = None
+
+    def save(self):
+        """ Save registry to file (if path is set)
+        """
+        if self._path is None:
+            return
+        with self._lock:
+            data = {'write_date': self._write_date,
+                    'reports': self.reports}
+        tmp_path = '%s.tmp.%s' % (self._path, os.getpid())
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f)
+        if os.name == 'nt' and os.path.exists(self._path):  # pragma: no cover
+            os.remove(self._path)
+        os.rename(tmp_path, self._path)
+
+    def update(self, report_obj, force=False):
+        """ Update registry from server.
+
+            First update reads all report actions by single *search_read*
+            call. Next updates read IDs of all report actions (to find
+            removed ones) and data of report actions changed since
+            last update.
+
+            :param Object report_obj: object of report actions
+                                      (``ir.actions.report.xml``)
+            :param bool force: if False, then registry is not updated
+                               if it was updated less then *max_age*
+                               seconds ago.
+            :return: self
+        """
+        with self._lock:
+            if not force and self._updated is not None and \
+                    time.time() - self._updated < self.max_age:
+                return self
+
+            if self._write_date is None:
+                rows = report_obj.search_read([], self.fields)
+                self._reports = {}
+            else:
+                ids = set(report_obj.search([]))
+                for rid in set(self._reports) - ids:
+                    del self._reports[rid]
+                new_ids = list(ids - set(self._reports))
+                domain = [('write_date', '>=', self._write_date)]
+                if new_ids:
+                    domain = ['|', ('id', 'in', new_ids)] + domain
+                rows = report_obj.search_read(domain, self.fields)
+
+            for row in rows:
+                self._reports[row['id']] = row
+            write_dates = [r['write_date'] for r in self._reports.values()
+                           if r.get('write_date', False)]
+            self._write_date = max(write_dates) if write_dates else ''
+            self._updated = time.time()
+            self.save()
+        return self
+
+
+# client URL (includes user and database) -> ReportRegistry
+_registries = {}
+
+
+def get_registry(client, path=None):
+    """ Returns report registry for database (and user) of *client*.
+
+        :param Client client: client to get registry for
+        :param str path: path to JSON file to persist registry in.
+                         If passed, registry persisted in that file
+                         will be used
+        :rtype: ReportRegistry
+    """
+    key = client.get_url()
+    registry = _registries.get(key, None)
+    if registry is None or (path is not None and registry.path != path):
+        registry = _registries[key] = ReportRegistry(path)
+    return registry
+
+
+class ReportFuture(object):
+    """ Result of report submitted to server via *report* method,
+        that will be available later (see *ReportPoller*).
+
+        :param Report report: report that was submitted
+        :param int report_id: ID of report returned by *report* method
+        :param list ids: IDs of documents report generated for
+    """
+
+    def __init__(self, report, report_id, ids):
+        self._report = report
+        self._report_id = report_id
+        self._ids = ids
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks = []
+        self._result = None
+        self._exception = None
+
+    @property
+    def report(self):
+        """ Report this future is for
+        """
+        return self._report
+
+    @property
+    def report_id(self):
+        """ ID of report on server (to be passed to *report_get*)
+        """
+        return self._report_id
+
+    @property
+    def ids(self):
+        """ IDs of documents report generated for
+        """
+        return self._ids
+
+    def done(self):
+        """ Returns True if report is ready (or failed)
+        """
+        return self._event.is_set()
+
+    def _wait(self, timeout):
+        if not self._event.wait(timeout) and not self._event.is_set():
+            raise ReportError("Report %s is not ready after %s seconds"
+                              "" % (self._report_id, timeout))
+
+    def result(self, timeout=None):
+        """ Wait for report and return its result
+
+            :param float timeout: max number of seconds to wait.
+                                  if None, wait without limit
+            :return: generated report
+            :rtype: ReportResult
+            :raises ReportError: if report is not ready after *timeout*
+            :raises: exception raised by server on report generation
+        """
+        self._wait(timeout)
+        if self._exception is not None:
+            raise self._exception
+        return self._result
+
+    def exception(self, timeout=None):
+        """ Wait for report and return exception raised on its generation
+            (or None if report was generated successfully)
+        """
+        self._wait(timeout)
+        return self._exception
+
+    def add_done_callback(self, fn):
+        """ Call *fn(future)* when report is ready.
+            If it is already ready, *fn* is called immediately.
+        """
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(fn)
+                return
+        fn(self)
+
+    def _set_done(self, result=None, exception=None):
+        with self._lock:
+            self._result = result
+            self._exception = exception
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for fn in callbacks:
+            fn(self)
+
+
+def as_completed(futures, timeout=None):
+    """ Yields *futures* as soon as they are done
+
+        :param list futures: list of ReportFuture instances
+        :param float timeout: max number of seconds to wait for
+                              next future. if None, wait without limit
+        :raises ReportError: if no futures done in *timeout* seconds
+    """
+    done = six.moves.queue.Queue()
+    futures = list(futures)
+    for future in futures:
+        future.add_done_callback(done.put)
+    for __ in futures:
+        try:
+            yield done.get(timeout=timeout)
+        except six.moves.queue.Empty:
+            raise ReportError("Reports are not ready after %s seconds"
+                              "" % timeout)
+
+
+class ReportPoller(object):
+    """ Scheduler, that polls server (via *report_get*) for results
+        of submitted reports.
+
+        Single background thread polls all pending reports.
+        Each report is polled with adaptive backoff: interval between
+        polls starts from *min_interval* and is multiplied by *backoff*
+        after each poll, when report is not ready yet (but not more
+        than *max_interval*). Thread is stopped when there are
+        no pending reports.
+
+        :param ReportService service: service to poll reports with
+    """
+    #: Interval before first poll of report (seconds)
+    min_interval = 0.1
+
+    #: Max interval between polls of same report (seconds)
+    max_interval = 5.0
+
+    #: Factor interval between polls is multiplied by
+    backoff = 1.5
+
+    def __init__(self, service):
+        self._service = service
+        self._cond = threading.Condition()
+        self._pending = []  # heap of (time to poll, seq, future, interval)
+        self._seq = itertools.count()
+        self._thread = None
+
+    @property
+    def pending(self):
+        """ Number of reports not ready yet
+        """
+        with self._cond:
+            return len(self._pending)
+
+    def _schedule(self, future, interval):
+        heapq.heappush(self._pending, (time.time() + interval,
+                                       next(self._seq), future, interval))
+
+    def submit(self, report, ids, report_type='pdf', context=None):
+        """ Submit report to server and start polling for its result
+
+            :param Report report: report to generate
+            :param list ids: IDs of documents to generate report for
+            :param str report_type: Type of report to generate.
+            :param dict context: Aditional info. Optional.
+            :rtype: ReportFuture
+        """
+        report_id = self._service.report(report.name,
+                                         report.report_action.model,
+                                         ids,
+                                         report_type=report_type,
+                                         context=context)
+        future = ReportFuture(report, report_id, ids)
+        with self._cond:
+            self._schedule(future, self.min_interval)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run)
+                self._thread.daemon = True
+                self._thread.start()
+            self._cond.notify()
+        return future
+
+    def _next(self):
+        """ Wait for next report to poll.
+            Returns None when there are no pending reports
+        """
+        with self._cond:
+            while self._pending:
+                delay = self._pending[0][0] - time.time()
+                if delay <= 0:
+                    return heapq.heappop(self._pending)
+                self._cond.wait(delay)
+            self._thread = None
+            return None
+
+    def _run(self):
+        while True:
+            item = self._next()
+            if item is None:
+                return
+            __, __, future, interval = item
+            try:
+                result = self._service.report_get(future.report_id)
+            except Exception as exc:
+                future._set_done(exception=exc)
+                continue
+
+            if result.get('state', False):
+                future._set_done(result=ReportResult(
+                    future.report, result, ids=future.ids))
+            else:
+                with self._cond:
+                    self._schedule(future, min(interval * self.backoff,
+                                               self.max_interval))
+
+
 class ReportService(ServiceBase):
     """ Service class to simplify interaction with 'report' service
     """
@@ -184,13 +638,60 @@ class ReportService(ServiceBase):
     def __init__(self, *args, **kwargs):
         super(ReportService, self).__init__(*args, **kwargs)
         self._reports = None
+        self._force_update = False
+        self._render_semaphore = None
+        self._poller = None
+
+    def set_render_limit(self, limit):
+        """ Limit number of reports rendered concurrently by
+            *generate_many* calls of this service (all together).
+            Useful to respect limits of server (for example
+            number of workers)
+
+            :param int limit: max number of concurrent renders.
+                              if None, then limit is removed
+        """
+        self._render_semaphore = (None if limit is None
+                                  else threading.BoundedSemaphore(limit))
 
-    def _get_available_reports(self):
+    @property
+    def registry(self):
+        """ Registry of reports for database of this service's client
+
+            :rtype: ReportRegistry
+        """
+        return get_registry(self.client)
+
+    def set_registry_path(self, path):
+        """ Persist registry of reports in JSON file, to reuse it in next
+            sessions (only changed reports will be read from server).
+
+            :param str path: path to JSON file
+        """
+        get_registry(self.client, path)
+        self._reports = None
+
+    def _get_available_reports(self, force=False):
         """ Returns list of reports registered in system
         """
         report_obj = self.client.get_obj('ir.actions.report.xml')
-        return {r.report_name: Report(self, r)
-                for r in report_obj.search_records([])}
+        rows = self.registry.update(report_obj, force=force).reports
+
+        # Fill cache with data from registry, so no reads will be
+        # required to access it
+        records = report_obj.read_records([r['id'] for r in rows])
+        lcache = records._lcache
+        for row in rows:
+            lcache[row['id']].update(row)
+
+        return {r.report_name: Report(self, r) for r in records}
+
+    def clean_cache(self):
+        """ Clean cached reports. Registry of reports will be updated
+            on next access to reports.
+        """
+        self._reports = None
+        self._force_update = True
 
     @property
     def available_reports(self):
@@ -199,7 +700,9 @@ class ReportService(ServiceBase):
             {<report name> : <Report instance>}
         """
         if self._reports is None:
-            self._reports = self._get_available_reports()
+            self._reports = self._get_available_reports(
+                force=self._force_update)
+            self._force_update = False
         return self._reports
 
     def _prepare_report_data(self, model, ids, report_type):
@@ -217,10 +720,25 @@ class ReportService(ServiceBase):
             'report_type': report_type,
         }
 
+    def _get_data_ids(self, report_data):
+        """ Returns list of IDs of documents from report data
+            (RecordList, Record, ID or list of IDs)
+        """
+        if isinstance(report_data, RecordList):
+            return report_data.ids
+        if isinstance(report_data, Record):
+            return [report_data.id]
+        if isinstance(report_data, numbers.Integral):
+            return [report_data]
+        return list(report_data)
+
     def __getitem__(self, name):
         return self.available_reports[name]
 
     def __getattr__(self, name):
+        if name.startswith('_'):
+            # Do not load reports for private / special attributes
+            raise AttributeError(name)
         try:
             res = self[name]
         except KeyError as exc:
@@ -339,4 +857,122 @@ class ReportService(ServiceBase):
                                            context=context)
 
         return ReportResult(self.available_reports[report_name],
-                            report_result)
+                            report_result, ids=obj_ids)
+
+    def generate_many(self, report_name, report_data, concurrency=4,
+                      per_doc=True, report_type='pdf', context=None,
+                      semaphore=None):
+        """ Generate specified report for many documents concurrently.
+
+            Reports are rendered in pool of *concurrency* threads
+            (each thread uses its own connection to server), and
+            results are yielded as soon as they are ready, so order
+            of results may differ from order of documents.
+            Use *ReportResult.ids* to find documents of each result.
+
+            :param str report_name: string representing name of report service
+            :param report_data: RecordList or list of IDs of documents
+                                to generate report for
+            :param int concurrency: number of reports to render
+                                    at the same time
+            :param bool per_doc: if True (default), then separate report
+                                 is generated for each document,
+                                 otherwise single report is generated
+                                 for all documents
+            :param str report_type: Type of report to generate.
+                                    default is 'pdf'.
+            :param dict context: Aditional info. Optional.
+            :param semaphore: semaphore to acquire for each render.
+                              could be shared by many services to limit
+                              load of server. if not passed, then
+                              semaphore configured by *set_render_limit*
+                              is used (if any).
+            :raises: ReportError
+            :return: generator of ReportResult instances
+        """
+        obj_ids = self._get_data_ids(report_data)
+
+        if semaphore is None:
+            semaphore = self._render_semaphore
+
+        # Resolve report before starting threads
+        report = self[report_name]
+        report_model = report.report_action.model
+
+        def render(ids):
+            if semaphore is not None:
+                semaphore.acquire()
+            try:
+                result = self.render_report(report_name,
+                                            report_model,
+                                            ids,
+                                            report_type=report_type,
+                                            context=context)
+            finally:
+                if semaphore is not None:
+                    semaphore.release()
+            return ReportResult(report, result, ids=ids)
+
+        jobs = [[i] for i in obj_ids] if per_doc else [obj_ids]
+        return parallel_map(render, jobs, workers=concurrency,
+                            ordered=False)
+
+    @property
+    def poller(self):
+        """ Scheduler, that polls results of reports submitted by
+            *submit_report* and *submit_many* methods
+
+            :rtype: ReportPoller
+        """
+        if self._poller is None:
+            self._poller = ReportPoller(self)
+        return self._poller
+
+    def submit_report(self, report_name, report_data, report_type='pdf',
+                      context=None):
+        """ Submit report to server (via legacy *report* method)
+            without waiting for result.
+
+            :param str report_name: string representing name of report service
+            :param report_data: RecordList or Record or list of IDs
+                                of documents to generate report for
+            :param str report_type: Type of report to generate.
+                                    default is 'pdf'.
+            :param dict context: Aditional info. Optional.
+            :return: future, that will contain ReportResult,
+                     when report is ready
+            :rtype: ReportFuture
+        """
+        return self.poller.submit(self[report_name],
+                                  self._get_data_ids(report_data),
+                                  report_type=report_type,
+                                  context=context)
+
+    def submit_many(self, report_name, report_data, per_doc=True,
+                    report_type='pdf', context=None):
+        """ Submit reports for many documents to server at once.
+            Server renders them in parallel, and results are polled
+            by single scheduler thread (see *ReportPoller*).
+            Use *as_completed* function to process reports
+            as soon as they are ready.
+
+            :param str report_name: string representing name of report service
+            :param report_data: RecordList or list of IDs of documents
+                                to generate report for
+            :param bool per_doc: if True (default), then separate report
+                                 is submitted for each document,
+                                 otherwise single report is submitted
+                                 for all documents
+            :param str report_type: Type of report to generate.
+                                    default is 'pdf'.
+            :param dict context: Aditional info. Optional.
+            :return: list of futures
+            :rtype: list of ReportFuture
+        """
+        report = self[report_name]
+        obj_ids = self._get_data_ids(report_data)
+        jobs = [[i] for i in obj_ids] if per_doc else [obj_ids]
+        return [self.poller.submit(report, ids,
+                                   report_type=report_type,
+                                   context=context)
+                for ids in jobs]
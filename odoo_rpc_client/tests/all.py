@@ -14,3 +14,4 @@ from .test_plugins import *         # noqa
 from .test_utils import *           # noqa
 from .test_service_report import *  # noqa
 from .test_db import *              # noqa
+from .test_retry import *           # noqa
@@ -7,6 +7,7 @@
 # file, You can obtain one at http://mozilla.org/MPL/2.0/.            #
 #######################################################################
 
+import time
 import unittest
 import pkg_resources
 from pkg_resources import parse_version as V
@@ -279,3 +280,106 @@ class Test_10_Client_Timeout(BaseTestCase):
     def test_120_username(self):
         self.assertEqual(self.client.username, self.env.user)
         self.assertEqual(self.client.user.login, self.env.user)
+
+
+class Test_11_ClientPool(BaseTestCase):
+
+    def setUp(self):
+        super(self.__class__, self).setUp()
+        from ..pool import ClientPool
+        self.pool = ClientPool(max_clients=2)
+        self.client_kwargs = dict(dbname=self.env.dbname,
+                                  user=self.env.user,
+                                  pwd=self.env.password,
+                                  protocol=self.env.protocol,
+                                  port=self.env.port)
+
+    def test_10_get_client(self):
+        client = self.pool.get_client(self.env.host, **self.client_kwargs)
+        self.assertIsInstance(client, Client)
+        self.assertIn(client.get_url(), self.pool)
+        self.assertIs(
+            self.pool.get_client(self.env.host, **self.client_kwargs),
+            client)
+        self.assertEqual(client.user.login, self.env.user)
+
+    def test_20_shared_connection_and_metadata(self):
+        client = self.pool.get_client(self.env.host, **self.client_kwargs)
+        kwargs = dict(self.client_kwargs, user='demo', pwd='demo')
+        client2 = self.pool.get_client(self.env.host, **kwargs)
+        self.assertIsNot(client, client2)
+        self.assertIs(client.connection, client2.connection)
+
+        columns_info = client['res.partner'].columns_info
+        self.assertIs(client.metadata['res.partner'], columns_info)
+
+        # pooled client stays attached to shared metadata after cleanup
+        client.clean_caches()
+        self.assertIsNotNone(client.metadata)
+        self.assertIs(client.metadata['res.partner'], columns_info)
+
+        # client.connect reuses connection too
+        client3 = client.connect(user='demo', pwd='demo')
+        self.assertIs(client3.connection, client.connection)
+
+    def test_30_lru(self):
+        clients = [
+            self.pool.get_client(self.env.host,
+                                 **dict(self.client_kwargs, user=user))
+            for user in ('u1', 'u2', 'u3')]
+        self.assertEqual(len(self.pool), 2)
+        self.assertNotIn(clients[0].get_url(), self.pool)
+        self.assertIn(clients[2].get_url(), self.pool)
+
+    def test_40_fan_out(self):
+        from ..pool import FanOutResult
+        client = self.pool.get_client(self.env.host, **self.client_kwargs)
+        bad_client = self.pool.get_client(
+            self.env.host, **dict(self.client_kwargs,
+                                  dbname='unexistent_database'))
+
+        results = list(self.pool.fan_out(
+            ('res.users', 'search_count', [[('login', '=', self.env.user)]]),
+            per_host=1, ordered=True))
+        self.assertEqual(len(results), 2)
+        for res in results:
+            self.assertIsInstance(res, FanOutResult)
+            self.assertGreaterEqual(res.elapsed, 0)
+
+        ok, failed = results
+        self.assertIs(ok.client, client)
+        self.assertTrue(ok.ok)
+        self.assertEqual(ok.get(), 1)
+        self.assertIs(failed.client, bad_client)
+        self.assertFalse(failed.ok)
+        with self.assertRaises(Exception):
+            failed.get()
+
+        # callables are supported too
+        res = list(self.pool.fan_out(lambda c: c.dbname,
+                                     clients=[client]))
+        self.assertEqual(res[0].result, self.env.dbname)
+
+    def test_45_fan_out_per_host(self):
+        from ..pool import fan_out
+
+        class FakeClient(object):
+            port = 8069
+
+            def __init__(self, host):
+                self.host = host
+
+        clients = [FakeClient('a') for __ in range(6)] + [FakeClient('b')]
+        start = time.time()
+
+        def task(client):
+            time.sleep(0.1)
+            return time.time() - start
+
+        # threads are not blocked by busy host 'a', so task for host 'b'
+        # is run in first batch
+        results = list(fan_out(clients, task, workers=4, per_host=1,
+                               ordered=True))
+        self.assertEqual(len(results), 7)
+        self.assertLess(results[-1].result, 0.2)
+        self.assertGreater(results[5].result, 0.5)
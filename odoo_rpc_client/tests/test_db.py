@@ -79,3 +79,48 @@ class Test_999_DB(BaseTestCase):
                                self.env.password)
         self.assertIsNotNone(cl.uid)
         self.assertIsNotNone(cl.user)
+
+    def test_30_dump_db_to(self):
+        import zipfile
+        import tempfile
+
+        progress = []
+        fd, path = tempfile.mkstemp(suffix='.zip')
+        os.close(fd)
+        try:
+            written = self.client.services.db.dump_db_to(
+                self.env.super_password, self.env.dbname, path,
+                progress=lambda w, s: progress.append((w, s)))
+            self.assertEqual(os.path.getsize(path), written)
+            self.assertTrue(zipfile.is_zipfile(path))
+
+            # last call of progress reports total size
+            self.assertEqual(progress[-1][0], written)
+            self.assertGreater(progress[-1][1], 0)
+        finally:
+            os.remove(path)
+
+    def test_40_dump_drop_restore_streaming(self):
+        import tempfile
+
+        fd, path = tempfile.mkstemp(suffix='.zip')
+        os.close(fd)
+        try:
+            self.client.services.db.dump_db_to(self.env.super_password,
+                                               self.env.dbname, path)
+
+            self.client.services.db.drop_db(self.env.super_password,
+                                            self.env.dbname)
+            self.assertNotIn(self.env.dbname, self.client.services.db)
+
+            self.client.services.db.restore_db_from(
+                self.env.super_password, self.env.dbname, path)
+            self.assertIn(self.env.dbname, self.client.services.db)
+        finally:
+            os.remove(path)
+
+        time.sleep(2)
+        cl = self.client.login(self.env.dbname,
+                               self.env.user,
+                               self.env.password)
+        self.assertIsNotNone(cl.uid)
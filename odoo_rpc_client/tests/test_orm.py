@@ -8,7 +8,9 @@
 #######################################################################
 
 import six
+import time
 import numbers
+import threading
 import collections
 import unittest
 
@@ -21,9 +23,15 @@ from . import (BaseTestCase,
 from ..client import Client
 from ..orm.record import (Record,
                           RecordList,
+                          RecordGroup,
+                          get_records,
                           get_record_list)
 from ..orm.cache import (empty_cache,
                          ObjectCache,
+                         ThreadSafeCache,
+                         ThreadSafeObjectCache,
+                         CompactCache,
+                         CompactObjectCache,
                          Cache)
 from ..orm.object import Object
 from ..exceptions import ConnectorError
@@ -268,6 +276,72 @@ class Test_20_Object(BaseTestCase):
         contacts.unlink()
         self.assertFalse(contacts.exists())
 
+    def test_create_many(self):
+        country_id = self.client.get_obj('res.country').search(
+            [('code', '=ilike', 'us')], limit=1)[0]
+        vals_list = [{'name': 'Bulk Partner %s' % i,
+                      'country_id': country_id}
+                     for i in range(7)]
+
+        with mock.patch.object(self.object, 'read') as fake_read:
+            partners = self.object.create_many(
+                iter(vals_list), chunk_size=3, parallel=2)
+
+            self.assertIsInstance(partners, RecordList)
+            self.assertEqual(len(partners), 7)
+
+            # submitted values must be available without extra reads
+            self.assertEqual(partners.mapped('name'),
+                             [v['name'] for v in vals_list])
+            self.assertEqual(partners[0].country_id.id, country_id)
+            self.assertFalse(fake_read.called)
+
+        self.assertEqual(
+            self.object.search_count([('id', 'in', partners.ids)]), 7)
+
+        partners.unlink()
+        self.assertFalse(partners.exists())
+
+    def test_group_records(self):
+        groups = self.object.group_records(
+            [('country_id', '!=', False)], ['country_id'], 'country_id')
+        self.assertTrue(groups)
+
+        group = groups[0]
+        self.assertIsInstance(group, RecordGroup)
+        self.assertEqual(group.key, group['country_id'])
+        self.assertIsInstance(group.records, RecordList)
+        self.assertEqual(len(group.records), group.count)
+        self.assertEqual(group.records[0].country_id.id, group.key[0])
+
+        # paged iteration returns same groups
+        paged = list(self.object.iter_group_records(
+            [('country_id', '!=', False)], ['country_id'], 'country_id',
+            page_size=1))
+        self.assertEqual([g.key for g in paged], [g.key for g in groups])
+
+    def test_search_frame(self):
+        domain = [('country_id', '!=', False)]
+        cols = self.object.search_frame(
+            domain, ['name', 'country_id'], page_size=2, output='array')
+        partners = self.object.search_records(domain)
+
+        self.assertEqual(list(cols),
+                         ['id', 'name', 'country_id/.id', 'country_id'])
+        self.assertEqual(list(cols['id']), partners.ids)
+        self.assertEqual(cols['name'], partners.mapped('name'))
+        self.assertEqual(list(cols['country_id/.id']),
+                         partners.mapped('country_id.id'))
+
+        try:
+            import numpy  # noqa
+        except ImportError:
+            raise unittest.SkipTest("NumPy is not installed")
+
+        arrays = partners.to_columns(['name', 'country_id'])
+        self.assertEqual(arrays['id'].dtype, numpy.dtype('int64'))
+        self.assertEqual(arrays['id'].tolist(), partners.ids)
+
 
 class Test_21_Record(BaseTestCase):
 
@@ -288,6 +362,37 @@ class Test_21_Record(BaseTestCase):
 
         self.record = self.object.browse(1)
 
+    def test_get_records(self):
+        ids = self.object.search([], limit=10)
+        cache = empty_cache(self.client)
+        records = get_records(self.object, ids, cache=cache)
+
+        self.assertEqual(len(records), len(ids))
+        self.assertItemsEqual(cache['res.partner'], ids)
+        for rid, record in zip(ids, records):
+            self.assertIsInstance(record, Record)
+            self.assertEqual(record.id, rid)
+            self.assertIs(record._cache, cache)
+        self.assertEqual([r.name for r in records],
+                         self.object.browse(ids).mapped('name'))
+
+        # Record class is memoized per object
+        record_cls = type(self.object.browse(1))
+        self.assertIs(record_cls, self.object._record_class)
+
+        # and resolved again, when new Record extension is registered
+        class RecordTestExtension(Record):
+            class Meta:
+                object_name = 'res.partner'
+
+            def _test_extension_method(self):
+                return self.id
+
+        record = self.object.browse(1)
+        self.assertIsNot(type(record), record_cls)
+        self.assertIs(type(record), self.object._record_class)
+        self.assertEqual(record._test_extension_method(), 1)
+
     def test_dir(self):
         self.assertIn('read', dir(self.record))
         self.assertIn('write', dir(self.record))
@@ -420,6 +525,25 @@ class Test_21_Record(BaseTestCase):
             list(
                 self.record._cache['res.country'].values())[0])
 
+    def test_related_objects_shared(self):
+        records = self.object.search_records([('id', '=', 1)])
+        record = records[0]
+
+        # Related objects are memoized in cache, so they are shared by
+        # all Record instances of same record
+        self.assertIs(records[:1][0].country_id, record.country_id)
+        self.assertIs(record.country_id,
+                      self.object.read_records(
+                          1, cache=record._cache).country_id)
+
+        # refresh invalidates memoized related objects
+        country = record.country_id
+        country.name
+        record.refresh()
+        self.assertNotIn('name', country._data)
+        self.assertIsNot(record.country_id, country)
+        self.assertEqual(record.country_id, country)
+
     def test_record_specific_extension(self):
         class MyProductRecord(Record):
 
@@ -834,6 +958,163 @@ class Test_22_RecordList(BaseTestCase):
         res = self.recordlist.group_by('country_id')
         self.assertIsInstance(res, collections.defaultdict)
 
+    def test_cached_filter_sort_group_by(self):
+        from anyfield import F
+
+        rlist = self.recordlist.copy()
+        rlist.prefetch('name', 'active', 'country_id')
+
+        # all data is cached, so no reads expected
+        with mock.patch.object(self.object, 'read') as fake_read:
+            self.assertEqual(
+                rlist.filter('active').ids,
+                [r.id for r in rlist if r._data['active']])
+            self.assertEqual(
+                rlist.filter(F.name == rlist[0].name).ids,
+                [r.id for r in rlist if r._data['name'] == rlist[0].name])
+
+            groups = rlist.group_by(F.country_id)
+            self.assertIsInstance(groups, collections.defaultdict)
+            self.assertEqual(sum(len(g) for g in groups.values()),
+                             len(rlist))
+            for country, records in groups.items():
+                if country:
+                    self.assertIsInstance(country, Record)
+
+            names = sorted(r._data['name'] for r in rlist
+                           if r._data['name'])
+            rlist.sort('name')
+            self.assertEqual(
+                [r._data['name'] for r in rlist][:len(names)], names)
+            self.assertFalse(fake_read.called)
+
+    def test_sort_by_field(self):
+        from anyfield import F
+
+        def sort_key(value):
+            if isinstance(value, (list, tuple)):
+                value = value[1]
+            return value
+
+        for field in ('name', 'country_id'):
+            for reverse in (False, True):
+                # data not cached
+                rlist = self.recordlist.copy(new_cache=True)
+                rlist.sort(field, reverse=reverse)
+                data = [r._data[field] for r in rlist]
+
+                # empty values are placed last, regardless of *reverse*
+                filled = [v for v in data if v]
+                self.assertEqual(data[:len(filled)], filled)
+                self.assertFalse(any(data[len(filled):]))
+                self.assertEqual(
+                    filled, sorted(filled, key=sort_key, reverse=reverse))
+
+                # data already cached: same result
+                rlist2 = self.recordlist.copy(new_cache=True)
+                rlist2.prefetch(field)
+                with mock.patch.object(self.object, 'read') as fake_read:
+                    rlist2.sort(getattr(F, field), reverse=reverse)
+                    self.assertFalse(fake_read.called)
+                self.assertEqual(rlist2.ids, rlist.ids)
+
+        # many2one values cached as bare IDs are sorted by name too
+        rlist = self.recordlist.copy(new_cache=True)
+        rlist.sort('country_id')
+        expected = rlist.ids
+        rlist3 = self.recordlist.copy(new_cache=True)
+        rlist3.prefetch('country_id')
+        for record in rlist3:
+            value = record._data['country_id']
+            record._data['country_id'] = value[0] if value else False
+        rlist3.sort('country_id')
+        self.assertEqual(rlist3.ids, expected)
+
+        # filter and group_by prefetch field too
+        rlist4 = self.recordlist.copy(new_cache=True)
+        self.assertEqual(rlist4.filter('country_id').ids,
+                         [r.id for r in rlist4 if r.country_id])
+        with mock.patch.object(self.object, 'read') as fake_read:
+            rlist4.group_by('country_id')
+            self.assertFalse(fake_read.called)
+
+    def test_filtered_domain(self):
+        rlist = self.recordlist.copy()
+        domain = ['|', ('country_id.code', '=', 'US'),
+                  ('name', 'ilike', 'a')]
+        expected = self.object.search_records(
+            [('id', 'in', rlist.ids)] + domain)
+
+        res = rlist.filtered_domain(domain)
+        self.assertIsInstance(res, RecordList)
+        self.assertItemsEqual(res.ids, expected.ids)
+
+        # Data is cached now, so no more calls to server expected
+        with mock.patch.object(self.object, 'read') as fake_read:
+            res2 = res.filtered_domain([('country_id', '!=', False)])
+            self.assertFalse(fake_read.called)
+        self.assertItemsEqual(
+            res2.ids, [r.id for r in res if r.country_id])
+
+    def test_filtered_domain_many2one(self):
+        rlist = self.recordlist.copy(new_cache=True)
+        rlist.prefetch('country_id')
+        country_ids = sorted(set(
+            r._data['country_id'][0] for r in rlist if r._data['country_id']))
+        if not country_ids:
+            raise unittest.SkipTest("No partners with country")
+
+        # comparison with integer compares IDs
+        self.assertItemsEqual(
+            rlist.filtered_domain([('country_id', '>', country_ids[0])]).ids,
+            [r.id for r in rlist
+             if r._data['country_id'] and
+             r._data['country_id'][0] > country_ids[0]])
+
+        # many2one values cached as bare IDs are matched by name too
+        name = [r._data['country_id'][1] for r in rlist
+                if r._data['country_id']][0]
+        expected = rlist.filtered_domain([('country_id', '=', name)]).ids
+        for record in rlist:
+            if record._data['country_id']:
+                record._data['country_id'] = record._data['country_id'][0]
+        self.assertItemsEqual(
+            rlist.filtered_domain([('country_id', '=', name)]).ids,
+            expected)
+
+    def test_lazy_domain_list(self):
+        domain = [('id', 'in', self.obj_ids)]
+        rlist = self.object.search_records(domain, lazy=True)
+        self.assertIsInstance(rlist, RecordList)
+        self.assertEqual(rlist.domain, domain)
+        self.assertEqual(len(rlist), len(self.obj_ids))
+        self.assertIn(self.obj_ids[0], rlist)
+        self.assertItemsEqual([r.id for r in rlist], self.obj_ids)
+
+        # derived searches combine domains instead of sending ids
+        with mock.patch.object(self.object, 'search') as fake_method:
+            rlist.search([('id', '!=', 1)], limit=5)
+            fake_method.assert_called_with(domain + [('id', '!=', 1)],
+                                           limit=5)
+        with mock.patch.object(self.object, 'search_read') as fake_method:
+            rlist.search_read([('id', '!=', 1)], ['name'])
+            self.assertEqual(fake_method.call_args[0],
+                             (domain + [('id', '!=', 1)], ['name']))
+
+        # number of records of lazy list is computed on server only once
+        rlist2 = self.object.search_records(domain, lazy=True)
+        with mock.patch.object(self.object, 'search_count',
+                               return_value=len(self.obj_ids)) as fake_count:
+            self.assertEqual(len(rlist2), len(self.obj_ids))
+            self.assertTrue(rlist2)
+            str(rlist2)
+            self.assertEqual(fake_count.call_count, 1)
+
+        # domain is dropped, when list is changed
+        del rlist[0]
+        self.assertIsNone(rlist.domain)
+        self.assertEqual(len(rlist), len(self.obj_ids) - 1)
+
     def test_existing(self):
         # all existing object ids
         all_obj_ids = self.object.search([], limit=False)
@@ -1170,3 +1451,169 @@ class Test_23_Cache(BaseTestCase):
         self.assertIs(cache.context['c'], 78)
         self.assertIn('a', cache.context)
         self.assertNotIn('b', cache.context)
+
+    def test_thread_safe_cache(self):
+        cache = empty_cache(self.client, thread_safe=True)
+        self.assertIsInstance(cache, ThreadSafeCache)
+        self.assertIsInstance(cache['res.partner'], ThreadSafeObjectCache)
+
+        partner_obj = self.client['res.partner']
+        ids = partner_obj.search([], limit=10)
+        obj_cache = cache['res.partner']
+        obj_cache.update_keys(ids)
+
+        real_read = partner_obj.read
+
+        def slow_read(*args, **kwargs):
+            time.sleep(0.2)
+            return real_read(*args, **kwargs)
+
+        results = []
+
+        def worker():
+            obj_cache.fetch_fields(['name'])
+            results.append(obj_cache[ids[0]]['name'])
+
+        # concurrent requests for same data result in single read
+        with mock.patch.object(partner_obj, 'read',
+                               side_effect=slow_read) as fake_read:
+            threads = [threading.Thread(target=worker) for __ in range(5)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            self.assertEqual(fake_read.call_count, 1)
+
+        self.assertEqual(len(results), 5)
+        self.assertEqual(len(set(results)), 1)
+
+        # records being refreshed always have 'id' for concurrent readers
+        errors = []
+
+        def reader():
+            for __ in range(2000):
+                if 'id' not in obj_cache[ids[0]]:
+                    errors.append(ids[0])
+
+        def refresher():
+            for __ in range(2000):
+                obj_cache[ids[0]]['name'] = 'x'
+                obj_cache.refresh_ids([ids[0]])
+
+        threads = [threading.Thread(target=reader),
+                   threading.Thread(target=refresher)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertFalse(errors)
+        self.assertEqual(dict(obj_cache[ids[0]]), {'id': ids[0]})
+
+    def test_compact_cache(self):
+        cache = empty_cache(self.client, compact=True)
+        self.assertIsInstance(cache, CompactCache)
+        self.assertIsInstance(cache['res.partner'], CompactObjectCache)
+
+        with self.assertRaises(ValueError):
+            empty_cache(self.client, thread_safe=True, compact=True)
+
+        partner_obj = self.client['res.partner']
+        ids = partner_obj.search([], limit=10)
+        fields = ['name', 'active', 'country_id', 'child_ids']
+        data = partner_obj.read(ids, fields)
+
+        partners = partner_obj.read_records(ids, cache=cache)
+        partners.prefetch(*fields)
+        for rdata, partner in zip(data, partners):
+            self.assertEqual(partner.as_dict, rdata)
+            self.assertIsInstance(partner.as_dict, dict)
+            self.assertIn('name', partner._data)
+
+        obj_cache = cache['res.partner']
+        self.assertEqual(obj_cache.get_ids_to_read('name'), [])
+        self.assertItemsEqual(obj_cache.get_ids_to_read('name', 'ref'), ids)
+
+        # refresh cleans data of record
+        partners[0].refresh()
+        self.assertEqual(dict(obj_cache[ids[0]]), {'id': ids[0]})
+        self.assertEqual(partners[0].name, data[0]['name'])
+
+    def test_shared_cache(self):
+        import os
+        import tempfile
+        from ..orm.shared_cache import (dump_cache,
+                                        SharedCache,
+                                        SharedObjectCache,
+                                        SnapshotRow)
+
+        partner_obj = self.client['res.partner']
+        partners = partner_obj.search_records(
+            [], limit=10, read_fields=['name', 'country_id'])
+
+        fd, path = tempfile.mkstemp(suffix='.cache')
+        os.close(fd)
+        try:
+            dump_cache(partners._cache, path)
+
+            cache = SharedCache(self.client, path)
+            self.assertIn('res.partner', cache.snapshot.models)
+            self.assertItemsEqual(cache.snapshot.get_ids('res.partner'),
+                                  partners.ids)
+
+            with mock.patch.object(partner_obj, 'read') as fake_read:
+                shared = partner_obj.read_records(partners.ids, cache=cache)
+                self.assertIsInstance(cache['res.partner'],
+                                      SharedObjectCache)
+                self.assertEqual(shared.mapped('name'),
+                                 partners.mapped('name'))
+                self.assertFalse(fake_read.called)
+
+            # data is read from snapshot in place, local changes are
+            # kept in overlay of record and do not change snapshot
+            record = shared[0]
+            self.assertIsInstance(record._data, SnapshotRow)
+            record._data['name'] = 'Local name'
+            self.assertEqual(record.name, 'Local name')
+            record.refresh()
+            self.assertNotIn('name', record._data)
+            self.assertEqual(
+                cache.snapshot.get('res.partner', record.id)['name'],
+                partners[0].name)
+            cache.snapshot.close()
+        finally:
+            os.remove(path)
+
+    def test_persistent_cache(self):
+        import os
+        import tempfile
+        from ..orm.persistent_cache import PersistentCache
+
+        partner_obj = self.client['res.partner']
+        ids = partner_obj.search([], limit=10)
+
+        fd, path = tempfile.mkstemp(suffix='.sqlite')
+        os.close(fd)
+        try:
+            # cold start: all data is read from server
+            cache = PersistentCache(self.client, path)
+            names = partner_obj.read_records(
+                ids, cache=cache).prefetch('name').mapped('name')
+            self.assertEqual(cache.hit_ratio, 0.0)
+            cache.close()
+
+            # warm start: only write_date is read from server
+            cache = PersistentCache(self.client, path)
+            real_read = partner_obj.read
+            with mock.patch.object(partner_obj, 'read',
+                                   side_effect=real_read) as fake_read:
+                partners = partner_obj.read_records(ids, cache=cache)
+                partners.prefetch('name')
+                fake_read.assert_called_once_with(
+                    ids, ['write_date'], context=None)
+            self.assertEqual(partners.mapped('name'), names)
+            self.assertEqual(cache.hit_ratio, 1.0)
+            self.assertIn('res.partner', cache.report())
+            cache.close()
+        finally:
+            os.remove(path)
@@ -7,11 +7,14 @@
 # file, You can obtain one at http://mozilla.org/MPL/2.0/.            #
 #######################################################################
 
-from . import BaseTestCase
+from . import (BaseTestCase,
+               mock)
 from .. import Client
 from ..orm import (Record,
                    RecordList)
 
+import os
+import six
 import unittest
 
 
@@ -114,6 +117,52 @@ class Test_25_Plugin_ModuleUtils(BaseTestCase):
             [('state', '=', 'installed')])
         self.assertItemsEqual(modules, modules2)
 
+    def test_60_module_states(self):
+        module_utils = self.client.plugins.module_utils
+        states = module_utils.get_states(['sale', 'unexistent_module'])
+        self.assertEqual(states['sale'], 'installed')
+        self.assertFalse(states['unexistent_module'])
+
+        # snapshot is shared by plugin instances of same database
+        from odoo_rpc_client.plugins.module_utils import get_module_states
+        self.assertIs(module_utils.module_states,
+                      get_module_states(self.client))
+        self.assertIn('sale', module_utils.module_states.modules)
+
+        # full resync replaces snapshot, dropping unknown modules
+        module_states = module_utils.module_states
+        module_states.modules['removed_module'] = {'name': 'removed_module'}
+        module_states.invalidate(full=True)
+        self.assertTrue(module_states.validate(
+            self.client['ir.module.module']))
+        self.assertNotIn('removed_module', module_states.modules)
+        self.assertIsNotNone(module_states._write_date)
+
+        # records of plugin are rebuilt after change of snapshot,
+        # even if snapshot was validated by someone else
+        module_utils.modules
+        module_states.modules['sale'] = dict(
+            module_states.modules['sale'], state='to upgrade')
+        module_states._generation += 1
+        self.assertEqual(module_utils.modules['sale'].state, 'to upgrade')
+        module_states.invalidate(full=True)
+
+    def test_65_module_queue(self):
+        module_utils = self.client.plugins.module_utils
+
+        with self.assertRaises(ValueError):
+            module_utils.queue_install('unexistent_module')
+
+        module_utils.queue_upgrade('sale')
+        module_utils.queue_install('sale')  # already installed
+        self.assertEqual(module_utils.queue,
+                         {'install': ['sale'], 'upgrade': ['sale']})
+        module_utils.apply_queue()
+        self.assertEqual(module_utils.queue,
+                         {'install': [], 'upgrade': []})
+        self.assertEqual(module_utils.get_states(['sale'])['sale'],
+                         'installed')
+
 
 class Test_26_Plugin_ExternalIDS(BaseTestCase):
 
@@ -252,3 +301,168 @@ class Test_26_Plugin_ExternalIDS(BaseTestCase):
 
         # Cleanup, remove created partner
         new_partner.unlink()
+
+    def test_45_resolve_many(self):
+        plugin = self.client.plugins.external_ids
+        plugin.index.clear()
+
+        res = plugin.resolve_many(['base.main_partner',
+                                   'base.main_company',
+                                   'base.unexisting_xml_id'])
+        self.assertEqual(res['base.main_partner'], self.main_partner)
+        self.assertEqual(res['base.main_company']._object.name,
+                         'res.company')
+        self.assertFalse(res['base.unexisting_xml_id'])
+
+        # resolved xml_ids are indexed in both directions
+        self.assertEqual(plugin.index.get_record('base.main_partner'),
+                         ('res.partner', self.main_partner.id))
+        self.assertEqual(
+            plugin.index.get_xmlid('res.partner', self.main_partner.id),
+            'base.main_partner')
+        # missing xml_ids are remembered too
+        self.assertIs(plugin.index.get_record('base.unexisting_xml_id'),
+                      False)
+
+        with self.assertRaises(ValueError):
+            plugin.resolve_many(['bad_xml_id'])
+
+    def test_50_recordlist_as_xmlids(self):
+        self.client.plugins.external_ids.index.clear()
+        new_partner_id = self.client[
+            'res.partner'].create({'name': 'Test partner'})
+        partners = self.client['res.partner'].browse(
+            [self.main_partner.id, new_partner_id])
+
+        self.assertEqual(partners.as_xmlids(), ['base.main_partner', False])
+        self.assertEqual(partners[0].as_xmlid(), 'base.main_partner')
+        self.assertFalse(partners[1].as_xmlid())
+
+        # records without xml_id are remembered only for limited time
+        index = self.client.plugins.external_ids.index
+        self.assertFalse(index.get_xmlid('res.partner', new_partner_id))
+        index._missing_max_age = 0
+        self.assertIsNone(index.get_xmlid('res.partner', new_partner_id))
+
+        # Cleanup, remove created partner
+        partners[1].unlink()
+
+    def test_55_preload(self):
+        import tempfile
+        from odoo_rpc_client.plugins.external_ids import XMLIDSnapshot
+
+        tmp_dir = tempfile.mkdtemp()
+        path = os.path.join(tmp_dir, 'xmlids.json')
+        plugin = self.client.plugins.external_ids
+
+        snapshot = plugin.preload(['base'], path=path)
+        self.assertIsInstance(snapshot, XMLIDSnapshot)
+        self.assertTrue(snapshot.has_module('base'))
+        self.assertEqual(snapshot.get_record('base.main_partner'),
+                         ('res.partner', self.main_partner.id))
+        self.assertTrue(os.path.exists(path))
+
+        # lookups of preloaded modules are done without calls to server
+        object_service = self.client.services.object
+        with mock.patch.object(object_service, 'execute',
+                               wraps=object_service.execute) as fake_exec:
+            self.assertEqual(self.client.ref('base.main_partner').id,
+                             self.main_partner.id)
+            self.assertFalse(self.client.ref('base.unexisting_xml_id'))
+            self.assertEqual(plugin.get_xmlid(self.main_partner),
+                             'base.main_partner')
+            self.assertFalse(fake_exec.called)
+
+        # Snapshot is loaded from file if versions of modules not changed
+        loaded = XMLIDSnapshot.load(path)
+        self.assertEqual(loaded.versions, snapshot.versions)
+        self.assertEqual(len(loaded), len(snapshot))
+
+        os.unlink(path)
+        os.rmdir(tmp_dir)
+
+
+class Test_27_Plugin_BulkImport(BaseTestCase):
+
+    def setUp(self):
+        super(self.__class__, self).setUp()
+        self.client = Client(self.env.host,
+                             dbname=self.env.dbname,
+                             user=self.env.user,
+                             pwd=self.env.password,
+                             protocol=self.env.protocol,
+                             port=self.env.port)
+        self.partner_obj = self.client['res.partner']
+
+    def test_10_init_bulk_import(self):
+        import odoo_rpc_client.plugins.bulk_import  # noqa
+
+        self.assertIn('bulk_import', self.client.plugins)
+
+    def test_20_load(self):
+        from odoo_rpc_client.plugins.bulk_import import ImportResult
+
+        rows = (['Bulk Import Partner %s' % i, 'base.us']
+                for i in range(25))
+        res = self.client.plugins.bulk_import.load(
+            'res.partner', ['name', 'country_id/id'], rows,
+            chunk_size=10, parallel=2)
+
+        self.assertIsInstance(res, ImportResult)
+        self.assertTrue(res.success)
+        self.assertEqual(res.rows, 25)
+        self.assertEqual(len(res.ids), 25)
+        self.assertGreater(res.rows_per_second, 0)
+
+        partners = self.partner_obj.read_records(res.ids)
+        self.assertEqual(partners[0].name, 'Bulk Import Partner 0')
+        self.assertEqual(partners[0].country_id.code, 'US')
+        partners.unlink()
+
+    def test_30_load_errors(self):
+        rows = [['Bulk Import Partner %s' % i, 'base.us']
+                for i in range(6)]
+        rows[4][1] = 'base.some_unexistent_country'
+        res = self.client.plugins.bulk_import.load(
+            'res.partner', ['name', 'country_id/id'], rows, chunk_size=3)
+
+        self.assertFalse(res.success)
+        self.assertEqual(res.rows, 6)
+        self.assertEqual(res.failed_rows, 3)
+        self.assertEqual(len(res.ids), 3)
+        self.assertEqual(res.errors[0].row, 4)
+
+        self.partner_obj.unlink(res.ids)
+
+    def test_40_load_csv(self):
+        csv_file = six.StringIO(
+            u"name,country_id/id\n"
+            u"Bulk CSV Partner 1,base.us\n"
+            u"Bulk CSV Partner 2,base.ua\n")
+        res = self.client.plugins.bulk_import.load_csv('res.partner',
+                                                       csv_file)
+
+        self.assertTrue(res.success)
+        self.assertEqual(res.rows, 2)
+        self.assertEqual(len(res.ids), 2)
+        self.partner_obj.unlink(res.ids)
+
+    def test_50_load_warnings(self):
+        load_res = {
+            'ids': [1, 2],
+            'messages': [{'type': 'warning',
+                          'message': 'Some warning',
+                          'rows': {'from': 1, 'to': 1}}],
+        }
+        with mock.patch.object(self.partner_obj, 'load',
+                               return_value=load_res):
+            res = self.client.plugins.bulk_import.load(
+                'res.partner', ['name'], [['Partner 1'], ['Partner 2']])
+
+        self.assertTrue(res.success)
+        self.assertFalse(res.errors)
+        self.assertEqual(len(res.warnings), 1)
+        self.assertEqual(res.warnings[0].row, 1)
+        self.assertEqual(res.warnings[0].type, 'warning')
+        self.assertEqual(res.failed_rows, 0)
+        self.assertEqual(res.ids, [1, 2])
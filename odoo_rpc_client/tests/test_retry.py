@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+# Copyright © 2014-2018 Dmytro Katyukha <dmytro.katyukha@gmail.com>
+
+#######################################################################
+# This Source Code Form is subject to the terms of the Mozilla Public #
+# License, v. 2.0. If a copy of the MPL was not distributed with this #
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.            #
+#######################################################################
+
+from six.moves import xmlrpc_client
+
+from . import BaseTestCase
+from ..client import Client
+from ..retry import RetryPolicy
+from ..connection.jsonrpc import JSONRPCError
+
+
+class FailingCall(object):
+    """ Callable, that fails *fails* times with *error*
+    """
+
+    def __init__(self, error, fails):
+        self.error = error
+        self.fails = fails
+        self.calls = 0
+
+    def __call__(self, *args):
+        self.calls += 1
+        if self.calls <= self.fails:
+            raise self.error
+        return args
+
+
+class Test_110_RetryPolicy(BaseTestCase):
+
+    def setUp(self):
+        super(self.__class__, self).setUp()
+        self.policy = RetryPolicy(max_retries=3, base_delay=0.0)
+
+    def test_10_classification(self):
+        self.assertTrue(self.policy.is_safe('res.partner', 'read'))
+        self.assertFalse(self.policy.is_safe('res.partner', 'write'))
+
+        policy = RetryPolicy(safe_methods=['res.partner.my_method'])
+        self.assertTrue(policy.is_safe('res.partner', 'my_method'))
+        self.assertFalse(policy.is_safe('res.users', 'my_method'))
+        self.assertFalse(policy.is_safe('res.partner', 'read'))
+
+        self.assertTrue(self.policy.is_transient(
+            xmlrpc_client.ProtocolError('url', 502, 'Bad Gateway', {})))
+        self.assertTrue(self.policy.is_transient(
+            JSONRPCError('Cannot decode JSON', code=503)))
+        self.assertTrue(self.policy.is_transient(
+            JSONRPCError('Cannot connect to url http://localhost')))
+        self.assertFalse(self.policy.is_transient(
+            JSONRPCError('Access denied', code=200)))
+        self.assertTrue(self.policy.is_rolled_back(
+            JSONRPCError('Odoo Server Error', code=200, data={
+                'message': 'could not serialize access due to '
+                           'concurrent update',
+                'debug': 'Traceback...'})))
+
+    def test_20_retry_safe_method(self):
+        fn = FailingCall(JSONRPCError('Cannot decode JSON', code=502), 2)
+        self.assertEqual(
+            self.policy.execute(fn, 'res.partner', 'read', 1, 2), (1, 2))
+        self.assertEqual(fn.calls, 3)
+        self.assertEqual(self.policy.stats['retries'], 2)
+        self.assertEqual(self.policy.stats['recovered'], 1)
+
+    def test_30_no_retry_unsafe_method(self):
+        fn = FailingCall(JSONRPCError('Cannot decode JSON', code=502), 1)
+        with self.assertRaises(JSONRPCError):
+            self.policy.execute(fn, 'res.partner', 'write', 1)
+        self.assertEqual(fn.calls, 1)
+        self.assertEqual(self.policy.stats['retries'], 0)
+
+        # but retry if transaction was rolled back
+        fn = FailingCall(JSONRPCError(
+            'could not serialize access due to concurrent update'), 1)
+        self.policy.execute(fn, 'res.partner', 'write', 1)
+        self.assertEqual(fn.calls, 2)
+
+    def test_40_max_retries_and_budget(self):
+        fn = FailingCall(JSONRPCError('Cannot decode JSON', code=502), 10)
+        with self.assertRaises(JSONRPCError):
+            self.policy.execute(fn, 'res.partner', 'read', 1)
+        self.assertEqual(fn.calls, 4)
+        self.assertEqual(self.policy.stats['failed'], 1)
+
+        policy = RetryPolicy(max_retries=5, base_delay=0.0, budget=2)
+        fn = FailingCall(JSONRPCError('Cannot decode JSON', code=502), 10)
+        with self.assertRaises(JSONRPCError):
+            policy.execute(fn, 'res.partner', 'read', 1)
+        self.assertEqual(fn.calls, 3)
+        self.assertEqual(policy.stats['budget_exhausted'], 1)
+
+    def test_50_client_retry_policy(self):
+        client = Client(self.env.host,
+                        dbname=self.env.dbname,
+                        user=self.env.user,
+                        pwd=self.env.password,
+                        protocol=self.env.protocol,
+                        port=self.env.port)
+        self.assertIsNone(client.retry_policy)
+        client.retry_policy = self.policy
+        self.assertEqual(client['res.users'].search_count(
+            [('login', '=', self.env.user)]), 1)
+        self.assertEqual(self.policy.stats['calls'], 1)
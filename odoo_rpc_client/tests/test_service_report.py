@@ -96,3 +96,117 @@ class Test_Service_Report(BaseTestCase):
         result.save(my_path)
         self.assertTrue(os.path.exists(my_path))
         os.unlink(result.path)
+
+    def test_report_generate_many(self):
+        so_ids = self.client['sale.order'].search([], limit=4)
+        report_service = self.client.services.report
+        report_service.set_render_limit(2)
+
+        results = list(report_service.generate_many(
+            self.report_name, so_ids, concurrency=3))
+
+        self.assertEqual(len(results), len(so_ids))
+        self.assertItemsEqual([r.ids for r in results],
+                              [[so_id] for so_id in so_ids])
+        for result in results:
+            self.assertIsInstance(result, ReportResult)
+            self.assertTrue(result.state)
+            self.assertIsInstance(result.content, six.binary_type)
+
+        # single report for all documents
+        results = list(report_service.generate_many(
+            self.report_name, so_ids, per_doc=False))
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0].ids, so_ids)
+
+    def test_report_result_streaming(self):
+        import io
+        import hashlib
+
+        so = self.client['sale.order'].search_records([], limit=1)[0]
+        result = self.client.services.report[self.report_name].generate(so)
+
+        # content is decoded by chunks, without decoding it at once
+        fileobj = io.BytesIO()
+        result.write_to(fileobj, chunk_size=1024)
+        self.assertIsNone(result._content)
+        self.assertEqual(result.sha256,
+                         hashlib.sha256(fileobj.getvalue()).hexdigest())
+        self.assertEqual(fileobj.getvalue(), result.content)
+
+        # default path contains hash of content
+        self.assertIn(result.sha256, result.path)
+        self.assertFalse(os.path.exists(result.path))
+        result.save()
+        self.assertTrue(os.path.exists(result.path))
+        with open(result.path, 'rb') as f:
+            self.assertEqual(f.read(), result.content)
+        os.unlink(result.path)
+
+    def test_report_registry(self):
+        import tempfile
+        from ..service.report import ReportRegistry, get_registry
+
+        tmp_dir = tempfile.mkdtemp()
+        path = os.path.join(tmp_dir, 'reports.json')
+        service = self.client.services.report
+        service.set_registry_path(path)
+
+        # Registry is shared by clients connected to same database
+        registry = service.registry
+        self.assertIsInstance(registry, ReportRegistry)
+        self.assertIs(get_registry(self.client), registry)
+
+        # Reports are loaded and registry is persisted
+        reports = service.available_reports
+        self.assertIn(self.report_name, reports)
+        self.assertTrue(os.path.exists(path))
+
+        # Registry loaded from file contains same reports
+        loaded = ReportRegistry(path)
+        self.assertItemsEqual(
+            [r['report_name'] for r in loaded.reports],
+            list(reports))
+
+        # Incremental update picks up changes
+        report_obj = self.client['ir.actions.report.xml']
+        action = reports[self.report_name].report_action
+        old_name = action.name
+        try:
+            action.write({'name': 'Changed report name'})
+            loaded.update(report_obj)
+            self.assertIn('Changed report name',
+                          [r['name'] for r in loaded.reports])
+        finally:
+            action.write({'name': old_name})
+
+        # private attributes do not trigger loading of reports
+        service.clean_cache()
+        with self.assertRaises(AttributeError):
+            getattr(service, '_some_private_attr')
+        self.assertIsNone(service._reports)
+
+        os.unlink(path)
+        os.rmdir(tmp_dir)
+
+    def test_report_submit_many(self):
+        from ..service.report import ReportFuture, as_completed
+
+        so = self.client['sale.order'].search_records([], limit=3)
+        service = self.client.services.report
+
+        futures = service.submit_many(self.report_name, so)
+        self.assertEqual(len(futures), len(so))
+        for future in futures:
+            self.assertIsInstance(future, ReportFuture)
+
+        done_ids = []
+        for future in as_completed(futures, timeout=120):
+            self.assertTrue(future.done())
+            result = future.result()
+            self.assertIsInstance(result, ReportResult)
+            self.assertEqual(result.ids, future.ids)
+            self.assertTrue(result.content)
+            done_ids.extend(future.ids)
+        self.assertItemsEqual(done_ids, so.ids)
+        self.assertEqual(service.poller.pending, 0)
@@ -7,14 +7,22 @@
 # file, You can obtain one at http://mozilla.org/MPL/2.0/.            #
 #######################################################################
 
+import sys
 import six
+import base64
+import itertools
 import functools
+import collections
+from multiprocessing.pool import ThreadPool
 
 __all__ = ('ustr',
            'AttrDict',
            'DirMixIn',
            'UConverter',
            'wpartial',
+           'chunks',
+           'parallel_map',
+           'b64decode_stream',
            )
 
 # Check if anyfield is installed
@@ -25,6 +33,10 @@ except ImportError:
     def normalizeSField(fn):
         return fn
 
+# Typecode of arrays of (64-bit) integers.
+# 'q' typecode is not available on Python 2
+INT_TYPECODE = 'q' if six.PY3 else 'l'
+
 
 def wpartial(func, *args, **kwargs):
     """Wrapped partial, same as functools.partial decorator,
@@ -52,6 +64,127 @@ def preprocess_args(*args, **kwargs):
     return xargs, kwargs
 
 
+def chunks(iterable, size):
+    """ Split *iterable* into lists of at most *size* elements.
+
+        Items are consumed lazily, so this function is safe to use
+        with generators or other large streams of data::
+
+            >>> list(chunks([1, 2, 3, 4, 5], 2))
+            [[1, 2], [3, 4], [5]]
+
+        :param iterable: iterable to split
+        :param int size: max size of each chunk
+        :return: generator of lists
+    """
+    it = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _call_safe(fn, item):
+    """ Call ``fn(item)`` and return tuple ``(ok, result_or_exc_info)``
+
+        Used internaly by *parallel_map*
+    """
+    try:
+        return True, fn(item)
+    except Exception:
+        return False, sys.exc_info()
+
+
+def _unwrap_result(res):
+    """ Unwrap result returned by *_call_safe*,
+        reraising exception if any
+    """
+    ok, value = res
+    if not ok:
+        six.reraise(*value)
+    return value
+
+
+def parallel_map(fn, iterable, workers=None, ordered=True):
+    """ Same as ``map(fn, iterable)``, but calls *fn* in pool of *workers*
+        threads. Returns generator of results.
+
+        Items of *iterable* are consumed lazily: not more than
+        ``2 * workers`` items are submitted to pool at the same time, so
+        it is safe to pass large streams of data here.
+
+        If *workers* is None or less then 2, then *fn* is called
+        sequentialy in current thread.
+
+        :param callable fn: function of one argument to call for each item
+        :param iterable: items to call *fn* for
+        :param int workers: number of threads to use
+        :param bool ordered: if set to True (default), results will be
+                             returned in same order as items in *iterable*,
+                             otherwise results are returned as soon as
+                             they are ready.
+        :return: generator of results of *fn* calls
+        :raises: first exception raised by *fn*
+    """
+    if not workers or workers < 2:
+        for item in iterable:
+            yield fn(item)
+        return
+
+    max_pending = workers * 2
+    pool = ThreadPool(workers)
+    try:
+        if ordered:
+            pending = collections.deque()
+            for item in iterable:
+                pending.append(pool.apply_async(_call_safe, (fn, item)))
+                if len(pending) >= max_pending:
+                    yield _unwrap_result(pending.popleft().get())
+            while pending:
+                yield _unwrap_result(pending.popleft().get())
+        else:
+            results = six.moves.queue.Queue()
+            pending = 0
+            for item in iterable:
+                pool.apply_async(_call_safe, (fn, item),
+                                 callback=results.put)
+                pending += 1
+                if pending >= max_pending:
+                    pending -= 1
+                    yield _unwrap_result(results.get())
+            while pending:
+                pending -= 1
+                yield _unwrap_result(results.get())
+    finally:
+        pool.terminate()
+
+
+def b64decode_stream(chunks):
+    """ Decode base64-encoded data given by chunks.
+
+        Chunks may have any size, and whitespace (line breaks)
+        in data is ignored. Only small part of data is kept in memory.
+
+        :param chunks: iterable of chunks of base64-encoded data
+                       (bytes or text)
+        :return: generator of decoded chunks (bytes)
+    """
+    tail = b''
+    for chunk in chunks:
+        if not isinstance(chunk, six.binary_type):
+            chunk = chunk.encode('ascii')
+        chunk = tail + b''.join(chunk.split())
+
+        # decode only complete 4-character groups
+        size = len(chunk) - len(chunk) % 4
+        tail = chunk[size:]
+        if size:
+            yield base64.b64decode(chunk[:size])
+    if tail:
+        yield base64.b64decode(tail)
+
+
 def stdcall(fn):
     """ Simple decorator for server methods, that supports standard call
 
@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+""" Measure memory taken by record caches.
+
+Fills usual cache (*Cache*) and compact cache (*CompactCache*) with
+same data and prints memory allocated for each of them.
+No connection to Odoo server is required. Requires Python 3
+(uses *tracemalloc* module).
+
+Usage::
+
+    python scripts/bench_cache_memory.py [count]
+"""
+
+import sys
+import gc
+import tracemalloc
+
+from odoo_rpc_client import Client
+from odoo_rpc_client.utils import AttrDict
+from odoo_rpc_client.orm.cache import empty_cache
+from odoo_rpc_client.orm.object import get_object
+
+FIELDS = {
+    'name': {'type': 'char'},
+    'active': {'type': 'boolean'},
+    'credit': {'type': 'float'},
+    'color': {'type': 'integer'},
+    'country_id': {'type': 'many2one', 'relation': 'res.country'},
+}
+
+
+def make_data(count):
+    return [{'id': rid,
+             'name': u'Partner %d' % rid,
+             'active': bool(rid % 2),
+             'credit': rid * 1.5,
+             'color': rid % 10,
+             'country_id': [rid % 200 + 1, u'Country %d' % (rid % 200)]}
+            for rid in range(1, count + 1)]
+
+
+def make_cache(client, objects, compact):
+    cache = empty_cache(client, compact=compact)
+    # Add object caches directly, to avoid check of objects on server
+    for obj in objects:
+        cache[obj.name] = cache._create_object_cache(obj)
+    return cache
+
+
+def measure(client, objects, count, compact):
+    """ Memory retained by cache after filling it with data
+        (data is generated while tracing, as read results would be)
+    """
+    gc.collect()
+    tracemalloc.start()
+    cache = make_cache(client, objects, compact)
+    cache['res.partner'].cache_data(make_data(count))
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del cache
+    return size
+
+
+def main(count):
+    client = Client('localhost')
+    partner_obj = get_object(client.services['object'], 'res.partner')
+    partner_obj._columns_info = AttrDict(FIELDS)
+    country_obj = get_object(client.services['object'], 'res.country')
+    country_obj._columns_info = AttrDict({'name': {'type': 'char'}})
+    objects = (partner_obj, country_obj)
+
+    sizes = {}
+    for name, compact in (('Cache', False), ('CompactCache', True)):
+        sizes[name] = measure(client, objects, count, compact)
+        print("%-14s %d records: %8.1f MiB (%.0f bytes/record)" % (
+            name, count, sizes[name] / 1048576.0,
+            float(sizes[name]) / count))
+    print("Compact cache takes %.1f times less memory" % (
+        float(sizes['Cache']) / sizes['CompactCache']))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,50 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+""" Micro-benchmark of Record construction.
+
+Creates records via *get_record* (one by one) and via *get_records*
+(bulk factory) and prints time taken by each way.
+No connection to Odoo server is required.
+
+Usage::
+
+    python scripts/bench_records.py [count]
+"""
+
+import sys
+import timeit
+
+from odoo_rpc_client import Client
+from odoo_rpc_client.orm.cache import empty_cache
+from odoo_rpc_client.orm.object import get_object
+from odoo_rpc_client.orm.record import (get_record,
+                                        get_records)
+
+
+def make_cache(client, obj):
+    cache = empty_cache(client)
+    # Add object cache directly, to avoid check of object on server
+    cache[obj.name] = cache._create_object_cache(obj)
+    return cache
+
+
+def main(count):
+    client = Client('localhost')
+    obj = get_object(client.services['object'], 'res.partner')
+    ids = list(range(1, count + 1))
+
+    def one_by_one():
+        cache = make_cache(client, obj)
+        return [get_record(obj, rid, cache=cache) for rid in ids]
+
+    def bulk():
+        return get_records(obj, ids, cache=make_cache(client, obj))
+
+    for name, func in (('get_record', one_by_one), ('get_records', bulk)):
+        best = min(timeit.repeat(func, number=1, repeat=3))
+        print("%-12s %d records: %.3f sec (%.0f records/sec)" % (
+            name, count, best, count / best))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
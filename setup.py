@@ -78,6 +78,7 @@ setup(
         'xml-rpc', 'json-rpc', 'jsonrpc', 'odoo-client', 'openerp'],
     extras_require={
         'all': ['anyfield'],
+        'frame': ['numpy', 'pandas', 'pyarrow'],
     },
     install_requires=requirements,
     tests_require=test_requirements,